@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+from dollo_parsimony.Simulation import SimulateFamily
+from dollo_parsimony.ParsInsertionsScore import ParsInsertionsScore
+from dollo_parsimony.WeightedParsInsertionScore import WeightedParsWithInsertionScore
+from dollo_parsimony.ParsAlign import ParsAlign
+from dollo_parsimony.ParsAlignFreeGapExtension import ParsAlignFreeGapE
+from dollo_parsimony.WeightedParsAlign import WeightedParsAlign, cost_matrix
+from dollo_parsimony.WeightedParsAlignFreeGapExtension import WeightedParsAlignFreeGapE
+from dollo_parsimony.Strategies import STRATEGIES
+
+# name: function returning the score of a tree, the aligners take the 
+# strategy as their second argument
+ALGORITHMS = {
+    'ParsInsertionsScore': lambda tree, strategy: ParsInsertionsScore(tree),
+    'WeightedParsWithInsertionScore':
+        lambda tree, strategy: WeightedParsWithInsertionScore(tree, cost_matrix),
+    'ParsAlign': lambda tree, strategy: ParsAlign(tree, strategy)[0],
+    'ParsAlignFreeGapE': lambda tree, strategy: ParsAlignFreeGapE(tree, strategy)[0],
+    'WeightedParsAlign': lambda tree, strategy: WeightedParsAlign(tree, strategy)[0],
+    'WeightedParsAlignFreeGapE':
+        lambda tree, strategy: WeightedParsAlignFreeGapE(tree, strategy)[0],
+}
+
+
+def TimeAlgorithm(name, taxa, length, gap_rate, seed, repeats,
+                  strategy='full'):
+    '''
+    Times an algorithm on a simulated family. Every run gets a new copy of
+    the family, the simulation is not timed.
+
+    Parameters
+    ----------
+    name : str
+        Algorithm in ALGORITHMS.
+    taxa : int
+        Number of leaves.
+    length : int
+        Length of the root sequence.
+    gap_rate : float
+        Rate of insertions and deletions of the simulation.
+    seed : int
+        Seed of the simulation.
+    repeats : int
+        Number of runs.
+    strategy : str, optional
+        Memory strategy of the aligners, see MemoryPlanner.
+
+    Returns
+    -------
+    result : dict
+        Parameters, length of the simulated alignment, score and the
+        fastest time in seconds.
+
+    '''
+
+    times = []
+    for k in range(repeats):
+        tree = SimulateFamily(taxa, length, gap_rate, seed=seed)
+        start = time.perf_counter()
+        score = ALGORITHMS[name](tree, strategy)
+        times.append(time.perf_counter() - start)
+
+    return {'algorithm': name, 'taxa': taxa, 'length': length,
+            'gap_rate': gap_rate, 'seed': seed, 'strategy': strategy,
+            'columns': len(next(tree.iter_leaves()).sequence),
+            'score': float(score), 'seconds': min(times)}
+
+
+def RunBenchmarks(algorithms, taxa, lengths, gap_rates, seed=0, repeats=3,
+                  log=None, strategy='full'):
+    '''
+    Times the algorithms on simulated families for all combinations of the
+    numbers of taxa, lengths and gap rates.
+
+    Parameters
+    ----------
+    algorithms : list
+        Algorithms in ALGORITHMS.
+    taxa : list
+        Numbers of leaves.
+    lengths : list
+        Lengths of the root sequences.
+    gap_rates : list
+        Rates of insertions and deletions.
+    seed : int, optional
+        Seed of the simulations.
+    repeats : int, optional
+        Number of runs of every benchmark, the fastest is kept.
+    log : file, optional
+        Open text file for the progress.
+    strategy : str, optional
+        Memory strategy of the aligners, see MemoryPlanner.
+
+    Returns
+    -------
+    report : dict
+        Environment, parameters and the results of the benchmarks.
+
+    '''
+
+    results = []
+    for number_of_taxa in taxa:
+        for length in lengths:
+            for gap_rate in gap_rates:
+                for name in algorithms:
+                    result = TimeAlgorithm(name, number_of_taxa, length,
+                                           gap_rate, seed, repeats, strategy)
+                    results.append(result)
+                    if log is not None:
+                        print('%-32s taxa %5d length %6d gap rate %.3f '
+                              '%9.4f s' % (name, number_of_taxa, length,
+                                           gap_rate, result['seconds']),
+                              file=log)
+
+    environment = {'python': platform.python_version(),
+                   'numpy': np.__version__, 'platform': platform.platform(),
+                   'cpus': os.cpu_count()}
+    parameters = {'seed': seed, 'repeats': repeats, 'strategy': strategy}
+
+    return {'environment': environment, 'parameters': parameters,
+            'results': results}
+
+
+def CompareResults(results, previous, threshold=1.25, minimum=0.01):
+    '''
+    Compares the results of two runs of the benchmarks. A benchmark is a
+    regression if it is slower than threshold times its previous time, or
+    if its score changed. Benchmarks faster than minimum seconds in both
+    runs are not compared, their times are mostly noise.
+
+    Parameters
+    ----------
+    results : list
+        Results of the new run.
+    previous : list
+        Results of the previous run.
+    threshold : float, optional
+        Allowed ratio of the new to the previous time.
+    minimum : float, optional
+        Shortest time in seconds which is compared.
+
+    Returns
+    -------
+    regressions : list
+        Messages of the regressions.
+
+    '''
+
+    def Key(result):
+        #reports without a strategy were run with the full matrices
+        return (result['algorithm'], result['taxa'], result['length'],
+                result['gap_rate'], result['seed'],
+                result.get('strategy', 'full'))
+
+    old_results = {Key(result): result for result in previous}
+    regressions = []
+    for result in results:
+        old = old_results.get(Key(result))
+        if old is None:
+            continue
+        name = '%s taxa %d length %d gap rate %g' % Key(result)[:4]
+        if result['score'] != old['score']:
+            regressions.append('%s: score %g instead of %g'
+                               % (name, result['score'], old['score']))
+        if max(result['seconds'], old['seconds']) < minimum:
+            continue
+        if result['seconds'] > threshold * old['seconds']:
+            regressions.append('%s: %.4f s instead of %.4f s'
+                               % (name, result['seconds'], old['seconds']))
+
+    return regressions
+
+
+def Main(argv=None):
+    '''
+    Runs the benchmarks from the command line, writes the report as JSON
+    and compares it to a previous report.
+
+    Parameters
+    ----------
+    argv : list, optional
+        Command line arguments, by default sys.argv[1:].
+
+    Returns
+    -------
+    status : int
+        Exit status, 1 if there are regressions.
+
+    '''
+
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.RunBenchmarks',
+        description='Times the algorithms on simulated trees and sequences.')
+    parser.add_argument('--algorithms', nargs='+', choices=list(ALGORITHMS),
+                        default=list(ALGORITHMS))
+    parser.add_argument('--taxa', nargs='+', type=int, default=[8, 16, 32])
+    parser.add_argument('--lengths', nargs='+', type=int,
+                        default=[100, 200, 400])
+    parser.add_argument('--gap-rates', nargs='+', type=float, default=[0.1])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--strategy', choices=STRATEGIES, default='full',
+                        help='memory strategy of the aligners')
+    parser.add_argument('-o', '--output', default='benchmarks.json',
+                        help='file of the report')
+    parser.add_argument('--compare', default=None,
+                        help='previous report to compare with')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='allowed ratio of the new to the previous time')
+    args = parser.parse_args(argv)
+
+    report = RunBenchmarks(args.algorithms, args.taxa, args.lengths,
+                           args.gap_rates, args.seed, args.repeats,
+                           log=sys.stderr, strategy=args.strategy)
+    with open(args.output, 'w') as handle:
+        json.dump(report, handle, indent=1)
+
+    if args.compare is None:
+        return 0
+
+    with open(args.compare) as handle:
+        previous = json.load(handle)
+    regressions = CompareResults(report['results'], previous['results'],
+                                 args.threshold)
+    for regression in regressions:
+        print(regression)
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(Main())
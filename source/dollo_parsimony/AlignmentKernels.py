@@ -0,0 +1,795 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from dollo_parsimony.ParsimonySets import characters, NUMBER_OF_CODES, GAP_BYTE
+
+# moves of a trace back matrix stored in one byte, two bits per move
+MOVES_PER_BYTE = 4
+
+# integer types of the score matrix S from the narrowest to the widest
+SCORE_DTYPES = [np.int8, np.int16, np.int32, np.int64]
+
+
+class AlignmentScheme:
+    '''
+    Scoring scheme of a progressive aligner. Collects the costs of the moves
+    in the matrices S and T and how ties between the moves are broken.
+
+    Parameters
+    ----------
+    match_cost : function
+        Cost of matching two arrays of set codes element by element.
+    gap_cost : function
+        Cost of putting a gap against an array of set codes. The horizontal
+        move uses the gap cost of the left set and the vertical move the gap
+        cost of the right set.
+    boundary : function
+        Scores in the first column (row) of S for an array of left (right)
+        set codes, without the origin.
+    free_gap_extension : bool
+        Extending a gap with the same move again costs nothing.
+    vertical_first : bool
+        Favor the vertical over the horizontal move for equal scores, the
+        diagonal move is always favored.
+    dtype : type
+        Data type of the scores.
+    edit_distance : bool
+        The scores are the unit cost edit distance of the sets, so that
+        adjacent cells of S differ by at most one.
+
+    '''
+
+    def __init__(self, match_cost, gap_cost, boundary,
+                 free_gap_extension=False, vertical_first=False, dtype=int,
+                 edit_distance=False):
+        self.match_cost = match_cost
+        self.gap_cost = gap_cost
+        self.boundary = boundary
+        self.free_gap_extension = free_gap_extension
+        self.vertical_first = vertical_first
+        self.dtype = dtype
+        self.edit_distance = edit_distance
+
+
+def UnitCostScheme(free_gap_extension=False):
+    '''
+    Scoring scheme with cost 0 for matching sets with a non empty
+    intersection, cost 1 for matching sets with an empty intersection and
+    gap penalty 1.
+
+    Parameters
+    ----------
+    free_gap_extension : bool
+        Gap penalty 1 only for opening a gap, the first row and column of S
+        are 1 as well. Ties are then broken in favor of the vertical move.
+
+    Returns
+    -------
+    scheme : AlignmentScheme
+        Unit cost scoring scheme.
+
+    '''
+
+    def match_cost(left_sets, right_sets):
+        return ((left_sets & right_sets) == 0).astype(int)
+
+    def gap_cost(sets):
+        return np.ones(len(sets), dtype=int)
+
+    if free_gap_extension:
+        boundary = gap_cost
+    else:
+        def boundary(sets):
+            return np.arange(1, len(sets)+1)
+
+    return AlignmentScheme(match_cost, gap_cost, boundary, free_gap_extension,
+                           vertical_first=free_gap_extension, dtype=int,
+                           edit_distance=not free_gap_extension)
+
+
+class CostTables:
+    '''
+    Cost matrix compiled into lookup tables indexed by set codes.
+
+    Parameters
+    ----------
+    pair_cost : numpy.ndarray
+        Cost of matching two sets, shape (NUMBER_OF_CODES, NUMBER_OF_CODES).
+    gap_cost : numpy.ndarray
+        Cost of putting a gap against a set.
+    boundary_cost : numpy.ndarray
+        Cost of a set in the first row or column of S.
+
+    '''
+
+    def __init__(self, pair_cost, gap_cost, boundary_cost):
+        self.pair_cost = pair_cost
+        self.gap_cost = gap_cost
+        self.boundary_cost = boundary_cost
+
+
+#compiled cost tables by cost matrix
+_cost_tables = {}
+
+
+def CompileCostMatrix(cost_matrix):
+    '''
+    Compiles the cost matrix into lookup tables for all pairs of set codes.
+    Matching sets with a non empty intersection costs the minimal cost
+    between characters of the intersection, otherwise the minimal cost
+    between characters of the two sets. A gap costs the minimal cost between
+    the characters of the set and the gap, the first row and column the
+    minimal cost between the gap and the characters of the set. The tables
+    are compiled once for every distinct cost matrix.
+
+    Parameters
+    ----------
+    cost_matrix : double dictionary
+        cost matrix specifying the cost of substitutions, insertions and
+        deletions.
+
+    Returns
+    -------
+    tables : CostTables
+        Lookup tables of the cost matrix.
+
+    '''
+
+    key = tuple(sorted((a, tuple(sorted(row.items())))
+                       for a, row in cost_matrix.items()))
+    if key in _cost_tables:
+        return _cost_tables[key]
+
+    costs = np.array([[cost_matrix.get(a, {}).get(b, np.inf)
+                       for b in characters] for a in characters], dtype=float)
+    codes = np.arange(NUMBER_OF_CODES)
+    members = ((codes[:, None] >> np.arange(len(characters))) & 1).astype(bool)
+
+    left_sets = codes[:, None]
+    right_sets = codes[None, :]
+    intersection = left_sets & right_sets
+    left = np.where(intersection != 0, intersection, left_sets)
+    right = np.where(intersection != 0, intersection, right_sets)
+    pairs = members[left][:, :, :, None] & members[right][:, :, None, :]
+    pair_cost = np.where(pairs, costs, np.inf).min(axis=(2, 3))
+
+    gap = characters.index('-')
+    gap_cost = np.where(members, costs[:, gap], np.inf).min(axis=1)
+    boundary_cost = np.where(members, costs[gap, :], np.inf).min(axis=1)
+
+    tables = CostTables(pair_cost, gap_cost, boundary_cost)
+    _cost_tables[key] = tables
+
+    return tables
+
+
+def WeightedScheme(cost_matrix, free_gap_extension=False):
+    '''
+    Scoring scheme with the costs of the cost matrix, looked up in the
+    compiled tables of CompileCostMatrix. Ties are broken in favor of the 
+    vertical move.
+
+    Parameters
+    ----------
+    cost_matrix : double dictionary
+        cost matrix specifying the cost of substitutions, insertions and
+        deletions.
+    free_gap_extension : bool
+        Extending a gap with the same move again costs nothing.
+
+    Returns
+    -------
+    scheme : AlignmentScheme
+        Weighted scoring scheme.
+
+    '''
+
+    tables = CompileCostMatrix(cost_matrix)
+
+    def match_cost(left_sets, right_sets):
+        return tables.pair_cost[left_sets, right_sets]
+
+    def gap_cost(sets):
+        return tables.gap_cost[sets]
+
+    def boundary(sets):
+        return tables.boundary_cost[sets]
+
+    return AlignmentScheme(match_cost, gap_cost, boundary, free_gap_extension,
+                           vertical_first=True, dtype=float)
+
+
+def WavefrontMatrices(left_sets, right_sets, scheme, top=None, left=None):
+    '''
+    Fills the score matrix S and the trace back matrix T one anti-diagonal
+    at a time. The cells of an anti-diagonal only depend on the two previous
+    anti-diagonals and are computed together with array operations.
+
+    Parameters
+    ----------
+    left_sets : numpy.ndarray
+        Set codes of the left alignment.
+    right_sets : numpy.ndarray
+        Set codes of the right alignment.
+    scheme : AlignmentScheme
+        Scoring scheme of the aligner.
+    top : tuple, optional
+        Scores and moves of the first row, by default from the scheme.
+    left : tuple, optional
+        Scores and moves of the first column, by default from the scheme.
+
+    Returns
+    -------
+    S : numpy.ndarray
+        Score matrix with the narrowest type which holds the scores, see 
+        ScoreDtype.
+    T : numpy.ndarray
+        Trace back matrix packed with two bits per move, see PackedMoves.
+
+    '''
+
+    left_sets = np.asarray(left_sets, dtype=np.uint8)
+    right_sets = np.asarray(right_sets, dtype=np.uint8)
+    n = len(left_sets)
+    m = len(right_sets)
+    top, left = Boundaries(left_sets, right_sets, scheme, top, left)
+
+    left_gaps = scheme.gap_cost(left_sets)
+    right_gaps = scheme.gap_cost(right_sets)
+
+    S = np.zeros((n+1, m+1), dtype=ScoreDtype(scheme, top, left, left_gaps,
+                                                right_gaps))
+    T = PackedMoves(n, m)
+
+    #first column - move vertical, first row - move horizontal
+    S[0, :] = top[0]
+    S[:, 0] = left[0]
+    T[0, :] = PackRow(top[1])
+    StoreMoves(T, np.arange(1, n+1), 0, left[1][1:])
+
+    #the moves of the last two anti-diagonals by row, the neighbours in the
+    #packed T can not be read as views
+    T1, T0 = [np.zeros(n+1, dtype=np.uint8) for k in range(2)]
+
+    for d in range(1, n+m+1):
+        lo = max(1, d-m)
+        hi = min(n, d-1)
+
+        if lo <= hi:
+            score, moves = DiagonalStep(
+                scheme, DiagonalView(S, d-2, lo-1, hi-1),
+                DiagonalView(S, d-1, lo, hi), DiagonalView(S, d-1, lo-1, hi-1),
+                T1[lo:hi+1], T1[lo-1:hi],
+                left_sets[lo-1:hi], right_sets[d-hi-1:d-lo][::-1],
+                left_gaps[lo-1:hi], right_gaps[d-hi-1:d-lo][::-1])
+
+            DiagonalView(S, d, lo, hi)[:] = score
+            T0[lo:hi+1] = moves
+            rows = np.arange(lo, hi+1)
+            StoreMoves(T, rows, d-rows, moves)
+
+        if d <= m:
+            T0[0] = top[1][d]
+        if d <= n:
+            T0[d] = left[1][d]
+
+        T1, T0 = T0, T1
+
+    return S, T
+
+
+def ScoreDtype(scheme, top, left, left_gaps, right_gaps):
+    '''
+    Narrowest integer type which holds every score of S. A cell scores at
+    most the score of the path along the first row or column followed by
+    gaps only, so the scores are bounded by the largest boundary score plus
+    n+m times the largest gap cost. Schemes with float scores keep their
+    type.
+
+    Parameters
+    ----------
+    scheme : AlignmentScheme
+        Scoring scheme of the aligner.
+    top : tuple
+        Scores and moves of the first row.
+    left : tuple
+        Scores and moves of the first column.
+    left_gaps : numpy.ndarray
+        Gap costs of the left sets.
+    right_gaps : numpy.ndarray
+        Gap costs of the right sets.
+
+    Returns
+    -------
+    dtype : type
+        Data type of S.
+
+    '''
+
+    if not np.issubdtype(scheme.dtype, np.integer):
+        return scheme.dtype
+
+    #python integers do not overflow
+    bound = max(int(np.abs(top[0]).max()), int(np.abs(left[0]).max()))
+    gaps = np.concatenate((left_gaps, right_gaps))
+    if len(gaps):
+        bound = bound + len(gaps) * int(np.abs(gaps).max())
+
+    for dtype in SCORE_DTYPES:
+        if bound <= np.iinfo(dtype).max:
+            return dtype
+
+    raise OverflowError('scores up to %d do not fit into %s' 
+                        % (bound, np.dtype(SCORE_DTYPES[-1]).name))
+
+
+def WideScore(score):
+    '''
+    Converts a score of the narrow matrix S to a 64 bit number, so that the
+    sum of the scores of many nodes does not overflow.
+
+    Parameters
+    ----------
+    score : numpy.number
+        Score of a cell of S.
+
+    Returns
+    -------
+    score : numpy.int64 or numpy.float64
+        The same score as a 64 bit number.
+
+    '''
+
+    return np.asarray(score).astype(np.result_type(score, np.int64))[()]
+
+
+def PackedMoves(n, m):
+    '''
+    Empty trace back matrix of two alignments of lengths n and m. The moves
+    0 to 3 take two bits, the move of the cell (i, j) is stored in the byte
+    [i, j // 4] at the bits 2*(j % 4) and 2*(j % 4)+1.
+
+    Parameters
+    ----------
+    n : int
+        Length of the left alignment.
+    m : int
+        Length of the right alignment.
+
+    Returns
+    -------
+    T : numpy.ndarray
+        Packed trace back matrix of shape (n+1, m//4+1) with no moves.
+
+    '''
+
+    return np.zeros((n+1, m // MOVES_PER_BYTE + 1), dtype=np.uint8)
+
+
+def PackRow(moves):
+    '''
+    Packs the moves of a whole row of a trace back matrix.
+
+    Parameters
+    ----------
+    moves : numpy.ndarray
+        Moves of the cells of the row.
+
+    Returns
+    -------
+    packed : numpy.ndarray
+        Row of the packed trace back matrix.
+
+    '''
+
+    #a row of m+1 moves takes m//4+1 bytes
+    padded = np.zeros((len(moves) + MOVES_PER_BYTE-1) // MOVES_PER_BYTE * 
+                      MOVES_PER_BYTE, dtype=np.uint8)
+    padded[:len(moves)] = moves
+    shifts = 2 * np.arange(MOVES_PER_BYTE, dtype=np.uint8)
+
+    return np.bitwise_or.reduce(padded.reshape(-1, MOVES_PER_BYTE) << shifts,
+                                axis=1)
+
+
+def StoreMoves(T, rows, columns, moves):
+    '''
+    Stores moves in a packed trace back matrix. The cells must be in 
+    different rows, as the cells of an anti-diagonal, or in one column.
+
+    Parameters
+    ----------
+    T : numpy.ndarray
+        Packed trace back matrix, see PackedMoves.
+    rows : numpy.ndarray
+        Rows of the cells.
+    columns : numpy.ndarray or int
+        Columns of the cells.
+    moves : numpy.ndarray
+        Moves of the cells.
+
+    Returns
+    -------
+    None.
+
+    '''
+
+    shifts = (2 * (np.asarray(columns) % MOVES_PER_BYTE)).astype(np.uint8)
+    columns = np.asarray(columns) // MOVES_PER_BYTE
+    moves = np.asarray(moves).astype(np.uint8)
+
+    #the two bits of the cells are cleared before the moves are set
+    T[rows, columns] = ((T[rows, columns] & ~(np.uint8(3) << shifts)) | 
+                        (moves << shifts))
+
+
+def MoveAt(T, i, j):
+    '''
+    Move of the cell (i, j) of a packed trace back matrix.
+
+    Parameters
+    ----------
+    T : numpy.ndarray
+        Packed trace back matrix, see PackedMoves.
+    i : int
+        Row of the cell.
+    j : int
+        Column of the cell.
+
+    Returns
+    -------
+    move : int
+        0 for the origin, 1 for diagonal, 2 for horizontal and 3 for 
+        vertical moves.
+
+    '''
+
+    return (int(T[i, j // MOVES_PER_BYTE]) >> (2 * (j % MOVES_PER_BYTE))) & 3
+
+
+def PackMoves(moves):
+    '''
+    Packs a trace back matrix with one move per element.
+
+    Parameters
+    ----------
+    moves : numpy.ndarray or list
+        Trace back matrix of shape (n+1, m+1).
+
+    Returns
+    -------
+    T : numpy.ndarray
+        Packed trace back matrix, see PackedMoves.
+
+    '''
+
+    return np.array([PackRow(row) for row in np.asarray(moves)],
+                    dtype=np.uint8)
+
+
+def UnpackMoves(T, n, m):
+    '''
+    Unpacks a packed trace back matrix into one move per element.
+
+    Parameters
+    ----------
+    T : numpy.ndarray
+        Packed trace back matrix, see PackedMoves.
+    n : int
+        Length of the left alignment.
+    m : int
+        Length of the right alignment.
+
+    Returns
+    -------
+    moves : numpy.ndarray
+        Trace back matrix of shape (n+1, m+1) with one uint8 per move.
+
+    '''
+
+    shifts = 2 * np.arange(MOVES_PER_BYTE, dtype=np.uint8)
+    moves = (T[:, :, np.newaxis] >> shifts) & 3
+
+    return moves.reshape(n+1, -1)[:, :m+1]
+
+
+def Boundaries(left_sets, right_sets, scheme, top=None, left=None):
+    '''
+    Scores and moves of the first row and the first column. Missing
+    boundaries are taken from the scheme, the first column moves vertical 
+    and the first row moves horizontal.
+
+    Parameters
+    ----------
+    left_sets : numpy.ndarray
+        Set codes of the left alignment.
+    right_sets : numpy.ndarray
+        Set codes of the right alignment.
+    scheme : AlignmentScheme
+        Scoring scheme of the aligner.
+    top : tuple, optional
+        Scores and moves of the first row.
+    left : tuple, optional
+        Scores and moves of the first column.
+
+    Returns
+    -------
+    top : tuple
+        Scores and moves of the first row.
+    left : tuple
+        Scores and moves of the first column.
+
+    '''
+
+    if top is None:
+        top_scores = np.zeros(len(right_sets)+1, dtype=scheme.dtype)
+        top_scores[1:] = scheme.boundary(right_sets)
+        top_moves = np.full(len(right_sets)+1, 2, dtype=scheme.dtype)
+        top_moves[0] = 0
+        top = (top_scores, top_moves)
+
+    if left is None:
+        left_scores = np.zeros(len(left_sets)+1, dtype=scheme.dtype)
+        left_scores[1:] = scheme.boundary(left_sets)
+        left_moves = np.full(len(left_sets)+1, 3, dtype=scheme.dtype)
+        left_moves[0] = 0
+        left = (left_scores, left_moves)
+
+    return top, left
+
+
+def DiagonalView(M, d, lo, hi):
+    '''
+    View of the cells (i, d-i) of a matrix for the rows i from lo to hi.
+
+    Parameters
+    ----------
+    M : numpy.ndarray
+        Contiguous two dimensional matrix.
+    d : int
+        Index of the anti-diagonal.
+    lo : int
+        First row.
+    hi : int
+        Last row.
+
+    Returns
+    -------
+    view : numpy.ndarray
+        Strided view of the cells.
+
+    '''
+
+    stride = max(M.shape[1]-1, 1)
+    start = lo*(M.shape[1]-1) + d
+
+    return M.reshape(-1)[start:start + (hi-lo)*stride + 1:stride]
+
+
+def DiagonalStep(scheme, S_diagonal, S_left, S_up, T_left, T_up, left_sets,
+                 right_sets, gap_left, gap_right):
+    '''
+    Computes the scores and moves of cells whose diagonal, left and upper
+    neighbours are known.
+
+    Parameters
+    ----------
+    scheme : AlignmentScheme
+        Scoring scheme of the aligner.
+    S_diagonal, S_left, S_up : numpy.ndarray
+        Scores of the diagonal, left and upper neighbours of the cells.
+    T_left, T_up : numpy.ndarray
+        Moves of the left and upper neighbours of the cells.
+    left_sets, right_sets : numpy.ndarray
+        Set codes matched in the cells.
+    gap_left, gap_right : numpy.ndarray
+        Gap costs of the left and the right sets of the cells.
+
+    Returns
+    -------
+    score : numpy.ndarray
+        Minimal scores of the cells.
+    moves : numpy.ndarray
+        Moves of the cells.
+
+    '''
+
+    score_intersection = S_diagonal + scheme.match_cost(left_sets, right_sets)
+    if scheme.free_gap_extension:
+        gap_left = np.where(T_left == 2, 0, gap_left)
+        gap_right = np.where(T_up == 3, 0, gap_right)
+    score_gap_left = S_left + gap_left
+    score_gap_right = S_up + gap_right
+
+    score = np.minimum(np.minimum(score_intersection, score_gap_left),
+                       score_gap_right)
+    moves = TieBreak(score, score_intersection, score_gap_left,
+                     score_gap_right, scheme.vertical_first)
+
+    return score, moves
+
+
+def TieBreak(score, score_intersection, score_gap_left, score_gap_right,
+             vertical_first):
+    '''
+    Chooses the moves for cells with the given minimal scores. If the path
+    is not unique the diagonal move is favored.
+
+    Parameters
+    ----------
+    score : numpy.ndarray
+        Minimal scores of the cells.
+    score_intersection : numpy.ndarray
+        Scores of the diagonal moves.
+    score_gap_left : numpy.ndarray
+        Scores of the horizontal moves.
+    score_gap_right : numpy.ndarray
+        Scores of the vertical moves.
+    vertical_first : bool
+        Favor the vertical over the horizontal move.
+
+    Returns
+    -------
+    moves : numpy.ndarray
+        1 for diagonal, 2 for horizontal and 3 for vertical moves.
+
+    '''
+
+    if vertical_first:
+        moves = np.where(score == score_gap_right, 3, 2)
+    else:
+        moves = np.where(score == score_gap_left, 2, 3)
+
+    return np.where(score == score_intersection, 1, moves)
+
+
+def TraceBackMoves(T, n, m):
+    '''
+    Follows the trace back matrix from the cell (n, m) back to the origin.
+
+    Parameters
+    ----------
+    T : numpy.ndarray
+        Packed trace back matrix, see PackedMoves.
+    n : int
+        Length of the left alignment.
+    m : int
+        Length of the right alignment.
+
+    Returns
+    -------
+    moves : numpy.ndarray
+        Moves of the optimal path from the origin to (n, m), 1 for diagonal,
+        2 for horizontal and 3 for vertical moves.
+
+    '''
+
+    moves = np.empty(n+m, dtype=np.uint8)
+    k = n+m
+    i = n
+    j = m
+
+    while i > 0 or j > 0:
+        move = MoveAt(T, i, j)
+        k = k-1
+        moves[k] = move
+
+        if move == 1:
+            i = i-1
+            j = j-1
+        elif move == 2:
+            j = j-1
+        elif move == 3:
+            i = i-1
+        else:
+            raise ValueError('no move recorded in the trace back matrix at ' +
+                             str((i, j)))
+
+    return moves[k:]
+
+
+def ChildColumns(moves):
+    '''
+    Columns of the left and the right alignment used by each column of the
+    merged alignment. Diagonal moves match a column of the left with a
+    column of the right alignment, horizontal moves put a gap column in the
+    left alignment and vertical moves put a gap column in the right
+    alignment.
+
+    Parameters
+    ----------
+    moves : numpy.ndarray
+        Moves of the optimal path.
+
+    Returns
+    -------
+    left_index : numpy.ndarray
+        Column of the left alignment, -1 for gap columns.
+    right_index : numpy.ndarray
+        Column of the right alignment, -1 for gap columns.
+
+    '''
+
+    left_step = moves != 2
+    right_step = moves != 3
+    left_index = np.where(left_step, np.cumsum(left_step) - 1, -1)
+    right_index = np.where(right_step, np.cumsum(right_step) - 1, -1)
+
+    return left_index, right_index
+
+
+def MergeSets(moves, left_sets, right_sets):
+    '''
+    Builds the nucleotide sets of the parent from the moves of the optimal
+    path. Matched sets give their intersection if it is not empty and their
+    union otherwise, sets matched with a gap column are kept.
+
+    Parameters
+    ----------
+    moves : numpy.ndarray
+        Moves of the optimal path.
+    left_sets : numpy.ndarray
+        Set codes of the left alignment.
+    right_sets : numpy.ndarray
+        Set codes of the right alignment.
+
+    Returns
+    -------
+    pars_sets : numpy.ndarray
+        Set codes of the merged alignment.
+
+    '''
+
+    left_sets = np.asarray(left_sets, dtype=np.uint8)
+    right_sets = np.asarray(right_sets, dtype=np.uint8)
+    left_index, right_index = ChildColumns(moves)
+
+    pars_sets = np.empty(len(moves), dtype=np.uint8)
+    diagonal = moves == 1
+    matched_left = left_sets[left_index[diagonal]]
+    matched_right = right_sets[right_index[diagonal]]
+    intersection = matched_left & matched_right
+    pars_sets[diagonal] = np.where(intersection != 0, intersection,
+                                   matched_left | matched_right)
+    pars_sets[moves == 2] = right_sets[right_index[moves == 2]]
+    pars_sets[moves == 3] = left_sets[left_index[moves == 3]]
+
+    return pars_sets
+
+
+def MergeAlignments(moves, left_alignment, right_alignment):
+    '''
+    Builds the alignment of the parent from the moves of the optimal path
+    in one gather from the alignments of the children.
+
+    Parameters
+    ----------
+    moves : numpy.ndarray
+        Moves of the optimal path.
+    left_alignment : numpy.ndarray
+        Left alignment as a uint8 matrix of characters.
+    right_alignment : numpy.ndarray
+        Right alignment as a uint8 matrix of characters.
+
+    Returns
+    -------
+    align : numpy.ndarray
+        Merged alignment as a uint8 matrix of characters.
+
+    '''
+
+    left_index, right_index = ChildColumns(moves)
+    left_step = left_index >= 0
+    right_step = right_index >= 0
+
+    number_of_left_rows = len(left_alignment)
+    number_of_rows = number_of_left_rows + len(right_alignment)
+    align = np.full((number_of_rows, len(moves)), GAP_BYTE, dtype=np.uint8)
+    align[:number_of_left_rows, left_step] = \
+        left_alignment[:, left_index[left_step]]
+    align[number_of_left_rows:, right_step] = \
+        right_alignment[:, right_index[right_step]]
+
+    return align
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+
+class ArrayTree:
+    '''
+    Compact representation of a binary tree by index arrays. The nodes are
+    numbered in preorder, so the root is node 0 and the subtree of node k
+    are the nodes k to subtree_end[k]-1. Data of the nodes is kept in
+    arrays with one row per node instead of ete3 features. Built once from
+    a PhyloNode, the tree itself is not changed.
+
+    Parameters
+    ----------
+    tree : PhyloNode or PhyloTree
+        Input tree.
+
+    Attributes
+    ----------
+    nodes : list
+        Nodes of the tree in preorder, None after pickling.
+    parent : numpy.ndarray
+        Parent of every node, -1 for the root.
+    children : numpy.ndarray
+        Left and right child of every node, -1 for leaves.
+    is_leaf : numpy.ndarray
+        True for the leaves.
+    leaves : numpy.ndarray
+        Leaves in the order of tree.iter_leaves().
+    postorder : numpy.ndarray
+        Nodes in the order of tree.traverse('postorder').
+    internal_postorder : numpy.ndarray
+        Internal nodes in postorder.
+    subtree_end : numpy.ndarray
+        Node after the last node of the subtree of every node.
+
+    '''
+
+    def __init__(self, tree):
+        nodes = list(tree.traverse('preorder'))
+        index = {node: k for k, node in enumerate(nodes)}
+        number_of_nodes = len(nodes)
+
+        self.nodes = nodes
+        self.parent = np.full(number_of_nodes, -1, dtype=np.intp)
+        self.children = np.full((number_of_nodes, 2), -1, dtype=np.intp)
+        for k, node in enumerate(nodes):
+            for c, child in enumerate(node.children):
+                self.children[k, c] = index[child]
+                self.parent[index[child]] = k
+
+        self.is_leaf = self.children[:, 0] < 0
+        self.leaves = np.flatnonzero(self.is_leaf)
+        self.postorder = np.array([index[node] for node in
+                                   tree.traverse('postorder')], dtype=np.intp)
+        self.internal_postorder = self.postorder[~self.is_leaf[self.postorder]]
+
+        #children come before their parent in the reversed preorder
+        self.subtree_end = np.arange(1, number_of_nodes+1)
+        for k in range(number_of_nodes-1, -1, -1):
+            if not self.is_leaf[k]:
+                self.subtree_end[k] = self.subtree_end[self.children[k, 1]]
+
+    def __len__(self):
+        return len(self.parent)
+
+    def __getstate__(self):
+        #the ete3 nodes are not sent to other processes
+        state = self.__dict__.copy()
+        state['nodes'] = None
+        return state
+
+    def LeafMatrix(self):
+        '''
+        Aligned sequences of the leaves as a matrix of characters.
+
+        Returns
+        -------
+        msa : numpy.ndarray
+            uint8 matrix with one row per leaf and one column per site.
+
+        '''
+
+        rows = [np.frombuffer(''.join(self.nodes[k].sequence).encode('latin-1'),
+                              dtype=np.uint8) for k in self.leaves]
+        if len(set(len(row) for row in rows)) > 1:
+            raise ValueError('the sequences of the leaves are not aligned')
+
+        return np.array(rows)
+
+    def AddFeatures(self, **arrays):
+        '''
+        Adds a row of each array as a feature to every node of the tree.
+
+        Parameters
+        ----------
+        **arrays : numpy.ndarray
+            Arrays with one row per node.
+
+        Returns
+        -------
+        None.
+
+        '''
+
+        for name, data in arrays.items():
+            for node, row in zip(self.nodes, data):
+                node.add_feature(name, row)
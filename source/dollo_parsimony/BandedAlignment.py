@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from dollo_parsimony.AlignmentKernels import Boundaries, DiagonalStep
+from dollo_parsimony.AlignmentKernels import PackedMoves, StoreMoves, MoveAt
+from dollo_parsimony.LinearSpace import LinearSpaceMoves
+
+# diagonals added on both sides of the main diagonals in the first band
+BAND_WIDTH = 16
+
+
+def OutsideScore(dtype):
+    '''
+    Score of the cells outside of the band. It is larger than any score of
+    an alignment and adding a gap cost to it does not overflow.
+
+    Parameters
+    ----------
+    dtype : type
+        Data type of the scores.
+
+    Returns
+    -------
+    outside : number
+        Score of the cells outside of the band.
+
+    '''
+
+    if np.issubdtype(dtype, np.integer):
+        return np.iinfo(dtype).max // 4
+
+    return np.inf
+
+
+def BandedPass(left_sets, right_sets, scheme, top, left, lo_k, hi_k):
+    '''
+    Forward phase restricted to the cells (i, j) with lo_k <= j-i <= hi_k.
+    S is kept as the last two anti-diagonals, indexed by the row, the cells
+    outside of the band score OutsideScore. The moves are stored in a band
+    shaped packed trace back matrix with the cell (i, j) at the column 
+    j-i-lo_k, see PackedMoves.
+
+    Parameters
+    ----------
+    left_sets : numpy.ndarray
+        Set codes of the left alignment.
+    right_sets : numpy.ndarray
+        Set codes of the right alignment.
+    scheme : AlignmentScheme
+        Scoring scheme of the aligner.
+    top : tuple
+        Scores and moves of the first row.
+    left : tuple
+        Scores and moves of the first column.
+    lo_k : int
+        Lowest diagonal of the band, at most min(0, m-n).
+    hi_k : int
+        Highest diagonal of the band, at least max(0, m-n).
+
+    Returns
+    -------
+    score : numpy.float64
+        Score of the last cell.
+    T : numpy.ndarray
+        Band shaped packed trace back matrix with hi_k-lo_k+1 columns.
+    upper : tuple
+        Scores and moves of the cells on the diagonal hi_k by row.
+    lower : tuple
+        Scores and moves of the cells on the diagonal lo_k by row.
+
+    '''
+
+    h = len(left_sets)
+    w = len(right_sets)
+    left_gaps = scheme.gap_cost(left_sets)
+    right_gaps = scheme.gap_cost(right_sets)
+    outside = OutsideScore(scheme.dtype)
+
+    S2, S1, S0 = [np.full(h+1, outside, dtype=scheme.dtype) for k in range(3)]
+    T1, T0 = [np.zeros(h+1, dtype=scheme.dtype) for k in range(2)]
+    #rows written on the anti-diagonals of S2, S1 and S0
+    W2, W1, W0 = [(0, 0)] * 3
+
+    T = PackedMoves(h, hi_k-lo_k)
+    upper = (np.full(h+1, outside, dtype=scheme.dtype),
+             np.zeros(h+1, dtype=np.uint8))
+    lower = (np.full(h+1, outside, dtype=scheme.dtype),
+             np.zeros(h+1, dtype=np.uint8))
+
+    for d in range(h+w+1):
+        #rows of the band on the anti-diagonal without the first row and column
+        lo = max(1, d-w, (d-hi_k+1) // 2)
+        hi = min(h, d-1, (d-lo_k) // 2)
+
+        #the buffer still holds the anti-diagonal d-3
+        S0[W0[0]:W0[1]] = outside
+        first, last = (lo, hi+1) if lo <= hi else (d+1, 0)
+
+        if lo <= hi:
+            score, moves = DiagonalStep(
+                scheme, S2[lo-1:hi], S1[lo:hi+1], S1[lo-1:hi],
+                T1[lo:hi+1], T1[lo-1:hi],
+                left_sets[lo-1:hi], right_sets[d-hi-1:d-lo][::-1],
+                left_gaps[lo-1:hi], right_gaps[d-hi-1:d-lo][::-1])
+            S0[lo:hi+1] = score
+            T0[lo:hi+1] = moves
+            rows = np.arange(lo, hi+1)
+            StoreMoves(T, rows, d - 2*rows - lo_k, moves)
+
+        #cells on the first row and the first column inside of the band
+        if d <= w and lo_k <= d <= hi_k:
+            S0[0] = top[0][d]
+            T0[0] = top[1][d]
+            StoreMoves(T, 0, d-lo_k, top[1][d])
+            first, last = 0, max(last, 1)
+        if 0 < d <= h and lo_k <= -d <= hi_k:
+            S0[d] = left[0][d]
+            T0[d] = left[1][d]
+            StoreMoves(T, d, -d-lo_k, left[1][d])
+            first, last = min(first, d), d+1
+        W0 = (first, last)
+
+        #cells on the edges of the band
+        for k, edge in [(hi_k, upper), (lo_k, lower)]:
+            if (d-k) % 2 == 0 and 0 <= (d-k) // 2 <= h and 0 <= (d+k) // 2 <= w:
+                edge[0][(d-k) // 2] = S0[(d-k) // 2]
+                edge[1][(d-k) // 2] = T0[(d-k) // 2]
+
+        S2, S1, S0 = S1, S0, S2
+        W2, W1, W0 = W1, W0, W2
+        T1, T0 = T0, T1
+
+    return S1[h], T, upper, lower
+
+
+def BandIsExact(left_sets, right_sets, scheme, top, left, lo_k, hi_k, score,
+                upper, lower):
+    '''
+    Checks that the band gives the same score and path as the full
+    matrices: every path through a cell outside of the band costs more than
+    the score of the band (Ukkonen's bound). Such a path leaves the band
+    from a cell on its edge, or starts in the first row or column outside of
+    the band, and needs one gap per diagonal to come back to the last cell.
+    A path which costs more can neither give a lower score nor a tie to the
+    cells on the path found in the band, so they have the scores and the
+    moves of the full matrices. With the free gap extension the costs of a
+    path do not add up and the band is never exact.
+
+    Parameters
+    ----------
+    left_sets : numpy.ndarray
+        Set codes of the left alignment.
+    right_sets : numpy.ndarray
+        Set codes of the right alignment.
+    scheme : AlignmentScheme
+        Scoring scheme of the aligner, with non negative costs.
+    top : tuple
+        Scores and moves of the first row.
+    left : tuple
+        Scores and moves of the first column.
+    lo_k : int
+        Lowest diagonal of the band.
+    hi_k : int
+        Highest diagonal of the band.
+    score : number
+        Score of the last cell in the band.
+    upper : tuple
+        Scores and moves of the cells on the diagonal hi_k by row.
+    lower : tuple
+        Scores and moves of the cells on the diagonal lo_k by row.
+
+    Returns
+    -------
+    exact : bool
+        True if the band gives the result of the full matrices.
+
+    '''
+
+    if scheme.free_gap_extension:
+        return False
+
+    h = len(left_sets)
+    w = len(right_sets)
+    left_gaps = np.asarray(scheme.gap_cost(left_sets), dtype=float)
+    right_gaps = np.asarray(scheme.gap_cost(right_sets), dtype=float)
+    bound = np.inf
+
+    if hi_k < w:
+        #leave with a horizontal move from (r, r+hi_k), come back vertically
+        rows = np.arange(1, min(h, w-hi_k-1) + 1)
+        leave = min(top[0][hi_k+1:].min(),
+                    (upper[0][rows] + left_gaps[rows-1]).min(initial=np.inf))
+        bound = min(bound, leave + right_gaps.min() * (hi_k - (w-h) + 1))
+
+    if -lo_k < h:
+        #leave with a vertical move from (r-1, r-1+lo_k), come back
+        #horizontally
+        rows = np.arange(2-lo_k, min(h, w-lo_k+1) + 1)
+        leave = min(left[0][1-lo_k:].min(),
+                    (lower[0][rows-1] + right_gaps[rows+lo_k-2]).min(
+                        initial=np.inf))
+        bound = min(bound, leave + left_gaps.min() * ((w-h) - lo_k + 1))
+
+    return score < bound
+
+
+def BandTraceBackMoves(T, lo_k, n, m):
+    '''
+    Follows a band shaped trace back matrix from the cell (n, m) back to the
+    origin.
+
+    Parameters
+    ----------
+    T : numpy.ndarray
+        Band shaped packed trace back matrix of BandedPass.
+    lo_k : int
+        Lowest diagonal of the band.
+    n : int
+        Length of the left alignment.
+    m : int
+        Length of the right alignment.
+
+    Returns
+    -------
+    moves : numpy.ndarray
+        Moves of the optimal path from the origin to (n, m), 1 for diagonal,
+        2 for horizontal and 3 for vertical moves.
+
+    '''
+
+    moves = np.empty(n+m, dtype=np.uint8)
+    k = n+m
+    i = n
+    j = m
+
+    while i > 0 or j > 0:
+        move = MoveAt(T, i, j-i-lo_k)
+        k = k-1
+        moves[k] = move
+
+        if move == 1:
+            i = i-1
+            j = j-1
+        elif move == 2:
+            j = j-1
+        elif move == 3:
+            i = i-1
+        else:
+            raise ValueError('no move recorded in the band at ' + str((i, j)))
+
+    return moves[k:]
+
+
+def BandedMoves(left_sets, right_sets, scheme, max_cells=None,
+                width=BAND_WIDTH):
+    '''
+    Finds the parsimony score and the moves of the optimal path by filling
+    only a band of diagonals around the main diagonals of the matrix. The
+    band is doubled until BandIsExact holds, so the path is the same as the
+    one of the full matrices. Once the band would not be smaller than the
+    whole matrix, or would exceed max_cells, the matrix is solved with
+    LinearSpaceMoves instead. Long gaps cost as much as short ones with the
+    free gap extension, so such schemes are always solved without a band.
+
+    Parameters
+    ----------
+    left_sets : numpy.ndarray
+        Set codes of the left alignment.
+    right_sets : numpy.ndarray
+        Set codes of the right alignment.
+    scheme : AlignmentScheme
+        Scoring scheme of the aligner.
+    max_cells : int, optional
+        Largest band, and largest block of LinearSpaceMoves, in cells.
+    width : int, optional
+        Diagonals on both sides of the main diagonals in the first band,
+        0 starts with the main diagonals only.
+
+    Returns
+    -------
+    parsimony_score : numpy.float64
+        parsimony score of the alignment
+    moves : numpy.ndarray
+        Moves of the optimal path.
+    band : tuple
+        Lowest and highest diagonal of the exact band, None if the matrix
+        was solved without a band.
+
+    '''
+
+    left_sets = np.asarray(left_sets, dtype=np.uint8)
+    right_sets = np.asarray(right_sets, dtype=np.uint8)
+    n = len(left_sets)
+    m = len(right_sets)
+    cells = (n+1) * (m+1)
+    if max_cells is None:
+        max_cells = cells
+    top, left = Boundaries(left_sets, right_sets, scheme)
+
+    while True:
+        lo_k = max(min(0, m-n) - width, -n)
+        hi_k = min(max(0, m-n) + width, m)
+        band_cells = (n+1) * (hi_k-lo_k+1)
+        if (scheme.free_gap_extension or band_cells >= cells or
+                band_cells > max_cells):
+            parsimony_score, moves = LinearSpaceMoves(left_sets, right_sets,
+                                                      scheme,
+                                                      min(cells, max_cells))
+            return parsimony_score, moves, None
+
+        parsimony_score, T, upper, lower = BandedPass(
+            left_sets, right_sets, scheme, top, left, lo_k, hi_k)
+        if BandIsExact(left_sets, right_sets, scheme, top, left, lo_k, hi_k,
+                       parsimony_score, upper, lower):
+            return (parsimony_score, BandTraceBackMoves(T, lo_k, n, m),
+                    (lo_k, hi_k))
+
+        #a band of width 0 is widened as well
+        width = max(1, 2 * width)
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import contextlib
+import json
+import os
+import sys
+
+from dollo_parsimony.CommandLine import ALGORITHMS, ReadFasta, ReadTree
+from dollo_parsimony.CommandLine import AlgorithmOptions, RunAlgorithm
+from dollo_parsimony.ParsimonySets import AlignmentStrings
+
+
+def FindPairs(directory):
+    '''
+    Pairs the tree and sequence files of a directory. The sequences of a
+    tree file are in the file with 'tree' replaced by 'sequence' in its
+    name, e.g. test_MSA_tree1 and test_MSA_sequence1.
+
+    Parameters
+    ----------
+    directory : str
+        Directory with the tree and sequence files.
+
+    Returns
+    -------
+    pairs : list
+        Paths of the tree and sequence files of every family, sorted by the
+        name of the tree file.
+
+    '''
+
+    pairs = []
+    for name in sorted(os.listdir(directory)):
+        if 'tree' not in name:
+            continue
+        sequences = os.path.join(directory, name.replace('tree', 'sequence'))
+        if os.path.isfile(sequences):
+            pairs.append((os.path.join(directory, name), sequences))
+
+    return pairs
+
+
+def ReadManifest(path):
+    '''
+    Reads the tree and sequence files of the families from a manifest with
+    one family per line. Empty lines and lines starting with # are skipped,
+    relative paths are relative to the directory of the manifest.
+
+    Parameters
+    ----------
+    path : str
+        Path of the manifest.
+
+    Returns
+    -------
+    pairs : list
+        Paths of the tree and sequence files of every family.
+
+    '''
+
+    directory = os.path.dirname(path)
+    pairs = []
+    with open(path) as handle:
+        for number, line in enumerate(handle, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            fields = line.split()
+            if len(fields) != 2:
+                raise ValueError('line %d of %s is not a tree and a sequence '
+                                 'file' % (number, path))
+            pairs.append(tuple(os.path.join(directory, field)
+                               for field in fields))
+
+    return pairs
+
+
+def RunFamily(job):
+    '''
+    Runs an algorithm on one family. Errors of a family are returned with
+    the result instead of stopping the batch.
+
+    Parameters
+    ----------
+    job : tuple
+        Paths of the tree and sequence files, the sub command of the
+        algorithm and its keyword arguments.
+
+    Returns
+    -------
+    result : dict
+        Tree and sequence files with the score and, for the aligners, the
+        alignment by leaf name, or with the error.
+
+    '''
+
+    tree_path, sequence_path, command, options = job
+    result = {'tree': tree_path, 'sequences': sequence_path}
+
+    try:
+        tree = ReadTree(tree_path, ReadFasta(sequence_path))
+        score, alignment = RunAlgorithm(command, tree, options)
+    except (OSError, ValueError, MemoryError) as error:
+        result['error'] = str(error)
+        return result
+
+    #numpy numbers are converted to python numbers for json
+    result['score'] = score.item() if hasattr(score, 'item') else score
+    if alignment is not None:
+        result['alignment'] = dict(zip([leaf.name for leaf in tree.iter_leaves()],
+                                       AlignmentStrings(alignment)))
+
+    return result
+
+
+def RunBatch(pairs, command, options, output, workers=None, chunksize=None):
+    '''
+    Runs an algorithm on many families in a process pool. The families are
+    sent to the workers in chunks and every result is written to the output
+    as one line of JSON as soon as its family is done, so the results are
+    not in the order of the pairs.
+
+    Parameters
+    ----------
+    pairs : list
+        Paths of the tree and sequence files of every family.
+    command : str
+        Sub command of the algorithm in ALGORITHMS.
+    options : dict
+        Keyword arguments of the algorithm, besides workers.
+    output : file
+        Open text file for the results.
+    workers : int, optional
+        Number of worker processes, by default the number of cores. With
+        one worker the families are run in this process.
+    chunksize : int, optional
+        Number of families sent to a worker at once, by default about four
+        chunks per worker.
+
+    Returns
+    -------
+    failed : int
+        Number of families with an error.
+
+    '''
+
+    if workers is None:
+        workers = os.cpu_count()
+
+    #every family is run by one worker, the workers of a pool can not start
+    #their own processes
+    options = dict(options, workers=1)
+    jobs = [(tree, sequences, command, options) for tree, sequences in pairs]
+
+    if chunksize is None:
+        chunksize = max(1, len(jobs) // (4 * workers))
+
+    failed = 0
+    with contextlib.ExitStack() as stack:
+        if workers == 1:
+            results = map(RunFamily, jobs)
+        else:
+            #the process pool is only loaded when it is used
+            from multiprocessing import Pool
+            pool = stack.enter_context(Pool(workers))
+            results = pool.imap_unordered(RunFamily, jobs, chunksize)
+
+        for result in results:
+            failed = failed + ('error' in result)
+            output.write(json.dumps(result) + '\n')
+            output.flush()
+
+    return failed
+
+
+def BatchMain(parser, args):
+    '''
+    Runs the batch sub command of the command line.
+
+    Parameters
+    ----------
+    parser : argparse.ArgumentParser
+        Parser of the command line arguments, for the errors.
+    args : argparse.Namespace
+        Command line arguments of the batch sub command.
+
+    Returns
+    -------
+    status : int
+        Exit status, 1 if any family failed.
+
+    '''
+
+    kind = ALGORITHMS[args.algorithm][2]
+    if args.compress and kind != 'score':
+        parser.error('--compress only applies to the scores')
+    if args.score_only and kind == 'score':
+        parser.error('--score-only only applies to the aligners')
+    if args.strategy != 'full' and kind == 'score':
+        parser.error('--strategy only applies to the aligners')
+    if args.memory_budget is not None and kind == 'score':
+        parser.error('--memory-budget only applies to the aligners')
+
+    options = AlgorithmOptions(kind, args)
+
+    try:
+        if os.path.isdir(args.pairs):
+            pairs = FindPairs(args.pairs)
+        else:
+            pairs = ReadManifest(args.pairs)
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+
+    with contextlib.ExitStack() as stack:
+        if args.output == '-':
+            output = sys.stdout
+        else:
+            output = stack.enter_context(open(args.output, 'w'))
+        failed = RunBatch(pairs, args.algorithm, options, output,
+                          args.workers or None, args.chunksize)
+
+    if failed:
+        print('%d of %d families failed' % (failed, len(pairs)),
+              file=sys.stderr)
+        return 1
+
+    return 0
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from dollo_parsimony.ParsimonySets import NUMBER_OF_CODES
+
+
+def MatchVectors(sets):
+    '''
+    Bit vectors of the sets which match every set code. Bit i of the vector
+    of a code is set if sets[i] and the code have a non empty intersection.
+
+    Parameters
+    ----------
+    sets : numpy.ndarray
+        Set codes of an alignment.
+
+    Returns
+    -------
+    vectors : list
+        Python integer for every set code.
+
+    '''
+
+    sets = np.asarray(sets, dtype=np.uint8)
+
+    #one vector per bit of the codes, a code matches if it shares a bit
+    bits = [int.from_bytes(np.packbits((sets >> b) & 1,
+                                       bitorder='little').tobytes(), 'little')
+            for b in range(NUMBER_OF_CODES.bit_length() - 1)]
+    vectors = [0] * NUMBER_OF_CODES
+    for code in range(NUMBER_OF_CODES):
+        for b, vector in enumerate(bits):
+            if code >> b & 1:
+                vectors[code] |= vector
+
+    return vectors
+
+
+def BitParallelScore(left_sets, right_sets):
+    '''
+    Unit cost score of aligning two alignments without gap extension, the
+    last cell of S for UnitCostScheme(). Adjacent cells of S differ by at
+    most one, so a column of S is kept as two bit vectors of the vertical
+    differences +1 and -1, and a whole column is computed with a few
+    operations on Python integers (Myers' bit-vector algorithm with
+    Hyyro's global boundaries). The longer alignment runs along the bit
+    vectors, as the score is symmetric.
+
+    Parameters
+    ----------
+    left_sets : numpy.ndarray
+        Set codes of the left alignment.
+    right_sets : numpy.ndarray
+        Set codes of the right alignment.
+
+    Returns
+    -------
+    score : numpy.int64
+        Score of the last cell of S.
+
+    '''
+
+    if len(left_sets) < len(right_sets):
+        left_sets, right_sets = right_sets, left_sets
+    n = len(left_sets)
+    if n == 0:
+        return np.int64(0)
+
+    vectors = MatchVectors(left_sets)
+    mask = (1 << n) - 1
+    last = 1 << (n-1)
+
+    #the first column of S is 0, 1, ..., n
+    plus = mask
+    minus = 0
+    score = n
+    for code in np.asarray(right_sets, dtype=np.uint8).tolist():
+        match = vectors[code]
+        vertical = match | minus
+        horizontal = (((match & plus) + plus) ^ plus) | match
+        horizontal_plus = minus | (~(horizontal | plus) & mask)
+        horizontal_minus = plus & horizontal
+
+        #difference in the last row
+        if horizontal_plus & last:
+            score = score + 1
+        elif horizontal_minus & last:
+            score = score - 1
+
+        #the first row of S grows by one per column
+        horizontal_plus = ((horizontal_plus << 1) | 1) & mask
+        horizontal_minus = (horizontal_minus << 1) & mask
+        plus = horizontal_minus | (~(vertical | horizontal_plus) & mask)
+        minus = horizontal_plus & vertical
+
+    return np.int64(score)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+
+import numpy as np
+
+from dollo_parsimony.Instrumentation import RECORDERS
+
+#state of a worker process, set once by StartWorker
+_worker = {}
+
+
+def StartWorker(name, shape, array_tree, site_scores, args):
+    '''
+    Attaches a worker process to the shared alignment.
+
+    Parameters
+    ----------
+    name : str
+        Name of the shared memory block.
+    shape : tuple
+        Number of leaves and columns of the alignment.
+    array_tree : ArrayTree
+        Input tree without its ete3 nodes.
+    site_scores : function
+        Scores the columns of an alignment on an ArrayTree.
+    args : tuple
+        Further arguments of site_scores.
+
+    Returns
+    -------
+    None.
+
+    '''
+
+    from multiprocessing.shared_memory import SharedMemory
+
+    #recorders copied from the parent process by fork would get the events
+    #of the shards, which have no ete3 nodes
+    RECORDERS.clear()
+    block = SharedMemory(name=name)
+    _worker.update(block=block, shape=shape, array_tree=array_tree,
+                   site_scores=site_scores, args=args)
+
+
+def ScoreShard(start, stop):
+    '''
+    Scores the columns start to stop of the shared alignment in a worker
+    process.
+
+    Parameters
+    ----------
+    start : int
+        First column of the shard.
+    stop : int
+        Column after the last column of the shard.
+
+    Returns
+    -------
+    scores : numpy.ndarray
+        Scores of the columns of the shard.
+
+    '''
+
+    msa = np.ndarray(_worker['shape'], dtype=np.uint8,
+                     buffer=_worker['block'].buf)
+    shard = np.ascontiguousarray(msa[:, start:stop])
+
+    return _worker['site_scores'](_worker['array_tree'], shard, *_worker['args'])
+
+
+def ShardedSiteScores(array_tree, msa, site_scores, args=(), workers=None,
+                      shards=None):
+    '''
+    Scores the columns of the alignment in shards of columns in a process
+    pool. The alignment is placed once in shared memory, the workers only
+    receive the index arrays of the tree once and the column range of a
+    shard. The columns are independent given the tree, so the scores are
+    the same as for the whole alignment.
+
+    Parameters
+    ----------
+    array_tree : ArrayTree
+        Input tree.
+    msa : numpy.ndarray
+        Alignment as a matrix of characters with one row per leaf.
+    site_scores : function
+        Scores the columns of an alignment on an ArrayTree, needs to be
+        defined at module level.
+    args : tuple, optional
+        Further arguments of site_scores.
+    workers : int, optional
+        Number of worker processes, by default the number of cores.
+    shards : int, optional
+        Number of shards, by default four per worker.
+
+    Returns
+    -------
+    scores : numpy.ndarray
+        Scores of all columns.
+
+    '''
+
+    #the process pool is only loaded when it is used
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing.shared_memory import SharedMemory
+
+    if workers is None:
+        workers = os.cpu_count()
+
+    length_MSA = msa.shape[1]
+    if length_MSA == 0:
+        return site_scores(array_tree, msa, *args)
+    if shards is None:
+        shards = 4*workers
+    bounds = np.linspace(0, length_MSA, min(shards, length_MSA)+1).astype(int)
+
+    block = SharedMemory(create=True, size=msa.size)
+    try:
+        shared = np.ndarray(msa.shape, dtype=np.uint8, buffer=block.buf)
+        shared[:] = msa
+        del shared
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=StartWorker,
+                                 initargs=(block.name, msa.shape, array_tree,
+                                           site_scores, args)) as pool:
+            scores = list(pool.map(ScoreShard, bounds[:-1], bounds[1:]))
+    finally:
+        block.close()
+        block.unlink()
+
+    return np.concatenate(scores)
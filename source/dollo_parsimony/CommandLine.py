@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import contextlib
+import importlib
+import sys
+
+from dollo_parsimony.Newick import ReadNewick, NewickError
+from dollo_parsimony.Instrumentation import Recorder
+from dollo_parsimony.Strategies import STRATEGIES
+
+# suffixes of the memory sizes
+MEMORY_UNITS = 'KMGT'
+
+# command: module, function, kind of algorithm
+ALGORITHMS = {
+    'insertions': ('ParsInsertionsScore', 'ParsInsertionsScore', 'score'),
+    'weighted-insertions': ('WeightedParsInsertionScore',
+                            'WeightedParsWithInsertionScore', 'score'),
+    'align': ('ParsAlign', 'ParsAlign', 'align'),
+    'align-free-gap-extension': ('ParsAlignFreeGapExtension',
+                                 'ParsAlignFreeGapE', 'align'),
+    'weighted-align': ('WeightedParsAlign', 'WeightedParsAlign', 'align'),
+    'weighted-align-free-gap-extension': ('WeightedParsAlignFreeGapExtension',
+                                          'WeightedParsAlignFreeGapE',
+                                          'align'),
+}
+
+
+def MemorySize(text):
+    '''
+    Reads a number of bytes with an optional suffix K, M, G or T for powers
+    of 1024.
+
+    Parameters
+    ----------
+    text : str
+        Number of bytes, e.g. 4096, 512M or 1.5G.
+
+    Returns
+    -------
+    size : int
+        Number of bytes.
+
+    '''
+
+    text = text.strip().upper().rstrip('B')
+    factor = 1
+    if text[-1:] in MEMORY_UNITS:
+        factor = 1024 ** (MEMORY_UNITS.index(text[-1]) + 1)
+        text = text[:-1]
+
+    size = int(float(text) * factor)
+    if size <= 0:
+        raise ValueError('the memory size must be positive')
+
+    return size
+
+
+def ArgumentParser():
+    '''
+    Builds the parser of the command line arguments with one sub command
+    per algorithm.
+
+    Returns
+    -------
+    parser : argparse.ArgumentParser
+        Parser of the command line arguments.
+
+    '''
+
+    parser = argparse.ArgumentParser(
+        prog='dollo-parsimony',
+        description='Parsimony scores and progressive alignments under '
+                    "Dollo's law on a phylogenetic tree.")
+    commands = parser.add_subparsers(dest='command', metavar='command',
+                                     required=True)
+
+    for command, (module, function, kind) in ALGORITHMS.items():
+        sub = commands.add_parser(command, help='run ' + function)
+        sub.add_argument('tree', help='tree in Newick format')
+        sub.add_argument('sequences', help='sequences of the leaves in '
+                         'FASTA format, aligned for the scores')
+        sub.add_argument('--workers', type=int, default=1,
+                         help='number of worker processes, 0 for one per '
+                              'core')
+        if kind == 'score':
+            sub.add_argument('--compress', action='store_true',
+                             help='only score the unique columns')
+        else:
+            sub.add_argument('--score-only', action='store_true',
+                             help='only print the score, not the alignment')
+        sub.add_argument('--profile', action='store_true',
+                         help='print the times, cells and matrix bytes of '
+                              'the algorithm to stderr')
+        if kind != 'score':
+            sub.add_argument('--strategy', choices=STRATEGIES,
+                             default='full',
+                             help='memory strategy of the alignments, the '
+                                  'fastest one with --memory-budget')
+            sub.add_argument('--memory-budget', type=MemorySize,
+                             default=None,
+                             help='largest memory of the alignment at a '
+                                  'node, e.g. 512M or 4G, the plan is '
+                                  'printed to stderr')
+
+    batch = commands.add_parser('batch', help='run an algorithm on many '
+                                'trees and sequences in a process pool')
+    batch.add_argument('algorithm', choices=list(ALGORITHMS),
+                       help='sub command of the algorithm')
+    batch.add_argument('pairs', help='directory with files *tree* and '
+                       '*sequence*, or a manifest with a tree and a sequence '
+                       'file per line')
+    batch.add_argument('-o', '--output', default='-',
+                       help='file of the results in JSON lines, by default '
+                            'stdout')
+    batch.add_argument('--workers', type=int, default=0,
+                       help='number of worker processes, 0 for one per core')
+    batch.add_argument('--chunksize', type=int, default=None,
+                       help='number of families sent to a worker at once')
+    batch.add_argument('--compress', action='store_true',
+                       help='only score the unique columns')
+    batch.add_argument('--score-only', action='store_true',
+                       help='do not write the alignments')
+    batch.add_argument('--strategy', choices=STRATEGIES,
+                       default='full', help='memory strategy of the '
+                                            'alignments')
+    batch.add_argument('--memory-budget', type=MemorySize, default=None,
+                       help='largest memory of the alignment at a node of '
+                            'a family, e.g. 512M or 4G')
+
+    return parser
+
+
+def ReadFasta(path):
+    '''
+    Reads the sequences of a FASTA file.
+
+    Parameters
+    ----------
+    path : str
+        Path of the FASTA file.
+
+    Returns
+    -------
+    sequences : dict
+        Sequence by name, the name is the first word of the header.
+
+    '''
+
+    sequences = {}
+    name = None
+    with open(path) as handle:
+        for line in handle:
+            line = line.strip()
+            if line.startswith('>'):
+                header = line[1:].split()
+                name = header[0] if header else ''
+                sequences[name] = []
+            elif line:
+                if name is None:
+                    raise ValueError(path + ' is not in FASTA format')
+                sequences[name].append(line)
+
+    return {name: ''.join(lines) for name, lines in sequences.items()}
+
+
+def ReadTree(path, sequences):
+    '''
+    Reads a binary tree and adds the sequences to its leaves. The tree is
+    read without ete3 unless the minimal Newick reader fails. A tree which
+    neither can read raises a NewickError, which is a ValueError.
+
+    Parameters
+    ----------
+    path : str
+        Path of the Newick file.
+    sequences : dict
+        Sequence by leaf name.
+
+    Returns
+    -------
+    tree : TreeNode or PhyloTree
+        Tree with the sequences at the leaves.
+
+    '''
+
+    with open(path) as handle:
+        newick = handle.read().strip()
+
+    try:
+        tree = ReadNewick(newick)
+    except NewickError:
+        from ete3 import PhyloTree
+        from ete3.parser.newick import NewickError as Ete3NewickError
+        #ete3 errors are not ValueErrors, the first line is the reason and
+        #the rest are hints about the ete3 flags
+        try:
+            tree = PhyloTree(newick, format=1)
+        except Ete3NewickError as error:
+            raise NewickError(str(error).split('\n')[0]) from error
+
+    for node in tree.traverse('preorder'):
+        if node.is_leaf():
+            if node.name not in sequences:
+                raise ValueError('no sequence for leaf ' + repr(node.name))
+            node.sequence = sequences[node.name]
+        elif len(node.children) != 2:
+            raise ValueError('the tree is not binary')
+
+    return tree
+
+
+def AlgorithmOptions(kind, args):
+    '''
+    Keyword arguments of an algorithm from the command line arguments.
+
+    Parameters
+    ----------
+    kind : str
+        Kind of the algorithm in ALGORITHMS.
+    args : argparse.Namespace
+        Command line arguments.
+
+    Returns
+    -------
+    options : dict
+        Keyword arguments of the algorithm.
+
+    '''
+
+    options = {'workers': args.workers or None}
+    if kind == 'score':
+        options['compress'] = args.compress
+    else:
+        options['score_only'] = args.score_only
+    if kind != 'score':
+        options['strategy'] = args.strategy
+        options['memory_budget'] = args.memory_budget
+
+    return options
+
+
+def RunAlgorithm(command, tree, options):
+    '''
+    Runs the algorithm of a sub command on a tree. The algorithm is only
+    imported when it is run.
+
+    Parameters
+    ----------
+    command : str
+        Sub command in ALGORITHMS.
+    tree : TreeNode or PhyloTree
+        Tree with the sequences at the leaves.
+    options : dict
+        Keyword arguments of the algorithm.
+
+    Returns
+    -------
+    score : number
+        Score of the algorithm.
+    alignment : numpy.ndarray
+        Alignment of the aligners, None for the scores and in score only
+        mode.
+
+    '''
+
+    module, function, kind = ALGORITHMS[command]
+    algorithm = getattr(importlib.import_module('dollo_parsimony.' + module),
+                        function)
+
+    if command == 'weighted-insertions':
+        from dollo_parsimony.WeightedParsAlign import cost_matrix
+        return algorithm(tree, cost_matrix, **options), None
+    if kind == 'score':
+        return algorithm(tree, **options), None
+
+    return algorithm(tree, **options)
+
+
+def Main(argv=None):
+    '''
+    Runs an algorithm from the command line. Prints the score and, for the
+    aligners, the alignment in FASTA format.
+
+    Parameters
+    ----------
+    argv : list, optional
+        Command line arguments, by default sys.argv[1:].
+
+    Returns
+    -------
+    status : int
+        Exit status.
+
+    '''
+
+    parser = ArgumentParser()
+    args = parser.parse_args(argv)
+    if args.command == 'batch':
+        from dollo_parsimony.BatchMode import BatchMain
+        return BatchMain(parser, args)
+
+    try:
+        tree = ReadTree(args.tree, ReadFasta(args.sequences))
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+
+    options = AlgorithmOptions(ALGORITHMS[args.command][2], args)
+
+    plan = []
+    with contextlib.ExitStack() as stack:
+        if args.profile:
+            recorder = stack.enter_context(Recorder())
+        if options.get('memory_budget') is not None:
+            stack.enter_context(Recorder(
+                lambda event, data: event == 'PlanNode' and plan.append(data),
+                keep=False))
+        try:
+            parsimony_score, alignment = RunAlgorithm(args.command, tree,
+                                                      options)
+        except (ValueError, MemoryError) as error:
+            parser.error(str(error))
+
+    if args.profile:
+        for event, totals in recorder.Summary().items():
+            print(event, ' '.join(['%s=%g' % item for item in totals.items()]),
+                  file=sys.stderr)
+    if options.get('memory_budget') is not None:
+        from dollo_parsimony.MemoryPlanner import PlanSummary
+        print('plan', ' '.join(['%s=%d' % item
+                                for item in PlanSummary(plan).items()]),
+              file=sys.stderr)
+
+    print(parsimony_score)
+    if alignment is not None:
+        from dollo_parsimony.ParsimonySets import AlignmentStrings
+        for leaf, row in zip(tree.iter_leaves(), AlignmentStrings(alignment)):
+            print('>' + leaf.name)
+            print(row)
+
+    return 0
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from dollo_parsimony.InsertionPoints import ResidueMask
+from dollo_parsimony.ParsInsertionsScore import ParsInsertionsLeaf
+from dollo_parsimony.ParsInsertionsScore import ParsInsertionsInternalColumns
+
+
+def UpdateNode(node, total):
+    '''
+    Recomputes the state of a node from the state of its children. Counts
+    the residues below the node at every site, the node is the insertion
+    point of a site if its subtree contains all residues of the site and
+    both of its children have residues. The insertion flags of an internal
+    node mark the insertion points of its children. Adds missing features
+    to nodes created by a move.
+
+    Parameters
+    ----------
+    node : PhyloNode
+        Node of the tree.
+    total : numpy.ndarray
+        Number of residues at every site.
+
+    Returns
+    -------
+    None.
+
+    '''
+
+    length_MSA = len(total)
+    if not hasattr(node, 'parsimony_sets'):
+        node.add_features(parsimony_sets = np.zeros(length_MSA, dtype=np.uint8))
+        node.add_features(parsimony_scores = np.zeros(length_MSA, dtype=int))
+        node.add_features(insertion_flags = np.zeros(length_MSA, dtype=bool))
+
+    if node.is_leaf():
+        residue_counts = ResidueMask(node.sequence).astype(total.dtype)
+        ins_points = (residue_counts == total) & (residue_counts > 0)
+    else:
+        left, right = node.children
+        residue_counts = left.residue_counts + right.residue_counts
+        ins_points = ((residue_counts == total) & (left.residue_counts > 0) &
+                      (right.residue_counts > 0))
+        node.insertion_flags[:] = left.insertion_points | right.insertion_points
+
+    node.add_features(residue_counts = residue_counts)
+    node.add_features(has_residue = residue_counts > 0)
+    node.add_features(insertion_points = ins_points)
+
+    if not node.is_leaf():
+        ParsInsertionsInternalColumns(node)
+
+
+def IncrementalParsScore(tree):
+    '''
+    Calculates the parsimony score with insertions like ParsInsertionsScore
+    and keeps the state of every node for RescoreAfterMove. Adds the residue
+    counts to every node besides the features of ParsInsertionsScore.
+
+    Parameters
+    ----------
+    tree : PhyloNode or PhyloTree
+        Input tree with the alignment.
+
+    Returns
+    -------
+    tree_score : int
+        parsimony score with insertions for the whole tree.
+
+    '''
+
+    leaves = tree.get_leaves()
+    #number of residues at every site, does not change with the tree
+    total = np.zeros(len(leaves[0].sequence),
+                     dtype=np.min_scalar_type(len(leaves)))
+    for leaf in leaves:
+        total += ResidueMask(leaf.sequence)
+    tree.add_features(residue_total = total)
+
+    for leaf in leaves:
+        ParsInsertionsLeaf(leaf)
+        leaf.add_features(insertion_flags = np.zeros(len(total), dtype=bool))
+
+    for node in tree.traverse('postorder'):
+        UpdateNode(node, tree.residue_total)
+
+    return int(tree.parsimony_scores.sum())
+
+
+def RescoreAfterMove(tree, changed_nodes):
+    '''
+    Rescores the tree after a local rearrangement such as an NNI or SPR
+    move. Only the changed nodes and their ancestors are recomputed, the
+    state of all other nodes is still valid as their subtrees did not
+    change. The number of residues per site does not depend on the tree, so
+    the insertion points of the other nodes stay the same as well.
+    Requires IncrementalParsScore to be called on the tree first, the move
+    has to keep the root of the tree.
+
+    Parameters
+    ----------
+    tree : PhyloNode or PhyloTree
+        Root of the rearranged tree.
+    changed_nodes : list
+        Nodes whose children were changed by the move.
+
+    Returns
+    -------
+    tree_score : int
+        parsimony score with insertions for the whole tree.
+
+    '''
+
+    #changed nodes and their ancestors up to the root
+    dirty = set()
+    for node in changed_nodes:
+        while node not in dirty:
+            dirty.add(node)
+            if node is tree:
+                break
+            node = node.up
+
+    #children before their parents
+    depth = {node: len(node.get_ancestors()) for node in dirty}
+    for node in sorted(dirty, key=depth.get, reverse=True):
+        UpdateNode(node, tree.residue_total)
+
+    return int(tree.parsimony_scores.sum())
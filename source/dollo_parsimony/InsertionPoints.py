@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+
+def ResidueMask(sequence):
+    '''
+    Marks the sites of an aligned sequence which contain a residue.
+
+    Parameters
+    ----------
+    sequence : str or list
+        Aligned sequence with gaps.
+
+    Returns
+    -------
+    residues : numpy.ndarray
+        Boolean array, True where the sequence has no gap.
+
+    '''
+
+    raw = np.frombuffer(''.join(sequence).encode('latin-1'), dtype=np.uint8)
+
+    return raw != ord('-')
+
+
+def InsertionPointArrays(array_tree, residues):
+    '''
+    Finds the most parsimonious insertion point for every site of the
+    alignment, i.e. the lowest node whose subtree contains all residues of
+    the site. Sites without residues have no insertion point.
+
+    Parameters
+    ----------
+    array_tree : ArrayTree
+        Input tree.
+    residues : numpy.ndarray
+        Boolean matrix with one row per leaf, True where the leaf has a 
+        residue.
+
+    Returns
+    -------
+    has_residue : numpy.ndarray
+        One row per node, True where some leaf below the node has a residue.
+    insertion_points : numpy.ndarray
+        One row per node, True where the node is the insertion point.
+
+    '''
+
+    children = array_tree.children
+    has_residue = np.zeros((len(array_tree), residues.shape[1]), dtype=bool)
+    has_residue[array_tree.leaves] = residues
+
+    #residues below each node
+    for k in array_tree.internal_postorder:
+        left, right = children[k]
+        np.logical_or(has_residue[left], has_residue[right],
+                      out=has_residue[k])
+
+    #residues outside the subtree of each node, the insertion point is the
+    #lowest node with all residues in its subtree
+    outside = np.zeros(has_residue.shape, dtype=bool)
+    insertion_points = np.zeros(has_residue.shape, dtype=bool)
+    for k in range(len(array_tree)):
+        insertion_points[k] = has_residue[k] & ~outside[k]
+        if not array_tree.is_leaf[k]:
+            left, right = children[k]
+            insertion_points[k] &= has_residue[left] & has_residue[right]
+            outside[left] = outside[k] | has_residue[right]
+            outside[right] = outside[k] | has_residue[left]
+
+    return has_residue, insertion_points
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import time
+
+#active recorders, the instrumented functions only measure anything while
+#this list is not empty
+RECORDERS = []
+
+
+def Record(event, **data):
+    '''
+    Sends an event to all active recorders. Callers check RECORDERS first,
+    so that nothing is measured without a recorder.
+
+    Parameters
+    ----------
+    event : str
+        Name of the event.
+    **data
+        Measurements of the event.
+
+    Returns
+    -------
+    None.
+
+    '''
+
+    for recorder in RECORDERS:
+        recorder(event, data)
+
+
+class Recorder:
+    '''
+    Context manager which collects the events of the instrumented functions
+    while it is active. The events are
+
+    - 'AlignNode': node, generate_seconds and traceback_seconds of
+      GenerateMatrices and TraceBack, the number of cells and the bytes of
+      the matrices S and T.
+    - 'PlanNode': node, strategy chosen by the memory planner, the number of
+      cells and the estimated bytes of the alignment.
+    - 'BandedAlign': node, the lowest and highest diagonal of the exact band,
+      None without a band, and the number of cells of the whole matrix.
+    - 'ParsInsertionsScore': seconds of the phases initialisation,
+      insertion_points and internal_pass, the numbers of nodes and sites.
+    - 'WeightedLeafScores' and 'WeightedInternalScores': node, site and
+      w_parsimony_scores of the weighted parsimony scores.
+
+    Parameters
+    ----------
+    callback : function, optional
+        Called with the name and the data of every event as it happens.
+    keep : bool, optional
+        Keep the events in the attribute events.
+
+    '''
+
+    def __init__(self, callback=None, keep=True):
+        self.callback = callback
+        self.keep = keep
+        self.events = []
+
+    def __call__(self, event, data):
+        if self.keep:
+            self.events.append((event, data))
+        if self.callback is not None:
+            self.callback(event, data)
+
+    def __enter__(self):
+        RECORDERS.append(self)
+        return self
+
+    def __exit__(self, *exception):
+        RECORDERS.remove(self)
+
+    def Summary(self):
+        '''
+        Sums the measurements of the events by their name. Times and cells
+        are added up, the bytes are the peak over all events.
+
+        Returns
+        -------
+        summary : dict
+            Number of events and the summed measurements by event name.
+
+        '''
+
+        summary = {}
+        for event, data in self.events:
+            totals = summary.setdefault(event, {'count': 0})
+            totals['count'] += 1
+            for key, value in data.items():
+                if key == 'bytes':
+                    totals[key] = max(totals.get(key, 0), value)
+                elif key.endswith('seconds') or key == 'cells':
+                    totals[key] = totals.get(key, 0) + value
+
+        return summary
+
+
+class Phases:
+    '''
+    Measures the wall time of consecutive phases of a function. Does nothing
+    if no recorder is active when it is created.
+
+    Parameters
+    ----------
+    event : str
+        Name of the event recorded by Done.
+
+    '''
+
+    def __init__(self, event):
+        self.event = event
+        self.enabled = bool(RECORDERS)
+        self.seconds = {}
+        if self.enabled:
+            self.last = time.perf_counter()
+
+    def __call__(self, phase):
+        '''
+        Ends a phase, the next phase starts now.
+        '''
+
+        if self.enabled:
+            now = time.perf_counter()
+            self.seconds[phase + '_seconds'] = now - self.last
+            self.last = now
+
+    def Done(self, **data):
+        '''
+        Records the times of the phases with further data.
+        '''
+
+        if self.enabled:
+            Record(self.event, **self.seconds, **data)
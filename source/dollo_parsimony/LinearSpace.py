@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from dollo_parsimony.AlignmentKernels import Boundaries, DiagonalStep
+from dollo_parsimony.AlignmentKernels import PackedMoves, PackRow, StoreMoves
+from dollo_parsimony.AlignmentKernels import TraceBackMoves
+from dollo_parsimony.BitParallel import BitParallelScore
+
+# largest (sub-)problem in cells which is solved with a full trace back
+# matrix of two bits per cell
+BLOCK_CELLS = 1 << 24
+
+
+def ForwardPass(left_sets, right_sets, scheme, top, left, mid=None,
+                column=None, trace=None):
+    '''
+    Runs the forward phase over the whole matrix while keeping only the
+    last two anti-diagonals of S and T, indexed by the row. Optionally
+    records the row mid and a column, follows the trace back pointers
+    of the cells below row mid to the column where their path enters row
+    mid and stores the moves of all cells in a trace back matrix.
+
+    Parameters
+    ----------
+    left_sets : numpy.ndarray
+        Set codes of the left alignment.
+    right_sets : numpy.ndarray
+        Set codes of the right alignment.
+    scheme : AlignmentScheme
+        Scoring scheme of the aligner.
+    top : tuple
+        Scores and moves of the first row.
+    left : tuple
+        Scores and moves of the first column.
+    mid : int, optional
+        Row to record and to follow the paths to, at least 1.
+    column : int, optional
+        Column to record.
+    trace : numpy.ndarray, optional
+        Packed trace back matrix of PackedMoves(len(left_sets), 
+        len(right_sets)) which is filled with the moves.
+
+    Returns
+    -------
+    score : numpy.float64
+        Score of the last cell.
+    row : tuple
+        Scores and moves of the row mid.
+    crossing : int
+        Column where the path of the last cell enters row mid.
+    col : tuple
+        Scores and moves of the column.
+
+    '''
+
+    h = len(left_sets)
+    w = len(right_sets)
+    left_gaps = scheme.gap_cost(left_sets)
+    right_gaps = scheme.gap_cost(right_sets)
+
+    S2, S1, S0 = [np.zeros(h+1, dtype=scheme.dtype) for k in range(3)]
+    T1, T0 = [np.zeros(h+1, dtype=scheme.dtype) for k in range(2)]
+    C2, C1, C0 = [np.zeros(h+1, dtype=int) for k in range(3)]
+
+    row = (np.zeros(w+1, dtype=scheme.dtype), np.zeros(w+1, dtype=scheme.dtype))
+    col = (np.zeros(h+1, dtype=scheme.dtype), np.zeros(h+1, dtype=scheme.dtype))
+
+    for d in range(h+w+1):
+        lo = max(1, d-w)
+        hi = min(h, d-1)
+
+        if lo <= hi:
+            score, moves = DiagonalStep(
+                scheme, S2[lo-1:hi], S1[lo:hi+1], S1[lo-1:hi],
+                T1[lo:hi+1], T1[lo-1:hi],
+                left_sets[lo-1:hi], right_sets[d-hi-1:d-lo][::-1],
+                left_gaps[lo-1:hi], right_gaps[d-hi-1:d-lo][::-1])
+            S0[lo:hi+1] = score
+            T0[lo:hi+1] = moves
+
+            #column of row mid reached by following the moves
+            if mid is not None:
+                C0[lo:hi+1] = np.where(moves == 1, C2[lo-1:hi],
+                                       np.where(moves == 2, C1[lo:hi+1],
+                                                C1[lo-1:hi]))
+
+        #cells on the first row and the first column
+        if d <= w:
+            S0[0] = top[0][d]
+            T0[0] = top[1][d]
+        if d <= h:
+            S0[d] = left[0][d]
+            T0[d] = left[1][d]
+            C0[d] = 0
+
+        if mid is not None and d-w <= mid <= d:
+            C0[mid] = d-mid
+            row[0][d-mid] = S0[mid]
+            row[1][d-mid] = T0[mid]
+
+        if column is not None and column <= d <= column+h:
+            col[0][d-column] = S0[d-column]
+            col[1][d-column] = T0[d-column]
+
+        if trace is not None:
+            rows = np.arange(max(0, d-w), min(h, d)+1)
+            StoreMoves(trace, rows, d-rows, T0[rows])
+
+        S2, S1, S0 = S1, S0, S2
+        T1, T0 = T0, T1
+        C2, C1, C0 = C1, C0, C2
+
+    return S1[h], row, C1[h], col
+
+
+def ForwardScore(left_sets, right_sets, scheme):
+    '''
+    Score of the last cell of S without the trace back. Unit cost edit
+    distances are found with the bit-parallel algorithm, other schemes with
+    a forward pass over the anti-diagonals.
+
+    Parameters
+    ----------
+    left_sets : numpy.ndarray
+        Set codes of the left alignment.
+    right_sets : numpy.ndarray
+        Set codes of the right alignment.
+    scheme : AlignmentScheme
+        Scoring scheme of the aligner.
+
+    Returns
+    -------
+    score : numpy.float64
+        Score of the last cell.
+
+    '''
+
+    if scheme.edit_distance:
+        return BitParallelScore(left_sets, right_sets)
+
+    top, left = Boundaries(left_sets, right_sets, scheme)
+
+    return ForwardPass(left_sets, right_sets, scheme, top, left)[0]
+
+
+def SubproblemMoves(left_sets, right_sets, scheme, top, left, block_cells):
+    '''
+    Finds the moves of the path from the last cell of a (sub-)matrix back
+    to its first cell, given the first row and column of the (sub-)matrix.
+    Large matrices are split at the middle row into the part above and the
+    part below the cell where the path enters the middle row.
+
+    Parameters
+    ----------
+    left_sets : numpy.ndarray
+        Set codes of the left alignment.
+    right_sets : numpy.ndarray
+        Set codes of the right alignment.
+    scheme : AlignmentScheme
+        Scoring scheme of the aligner.
+    top : tuple
+        Scores and moves of the first row.
+    left : tuple
+        Scores and moves of the first column.
+    block_cells : int
+        Largest matrix which is solved with a full trace back matrix.
+
+    Returns
+    -------
+    score : numpy.float64
+        Score of the last cell.
+    moves : numpy.ndarray
+        Moves of the path.
+
+    '''
+
+    h = len(left_sets)
+    w = len(right_sets)
+
+    if h < 2 or (h+1)*(w+1) <= block_cells:
+        T = PackedMoves(h, w)
+        score = ForwardPass(left_sets, right_sets, scheme, top, left,
+                            trace=T)[0]
+        #the path runs along the first row and column to the first cell
+        T[0, :] = PackRow(np.append(0, np.full(w, 2)))
+        StoreMoves(T, np.arange(1, h+1), 0, 3)
+        return score, TraceBackMoves(T, h, w)
+
+    mid = h // 2
+    score, row, crossing = ForwardPass(left_sets, right_sets, scheme, top,
+                                       left, mid=mid)[:3]
+
+    #first column of the part below the middle row
+    below_top = (row[0][:crossing+1], row[1][:crossing+1])
+    below_left = (left[0][mid:], left[1][mid:])
+    col = ForwardPass(left_sets[mid:], right_sets[:crossing], scheme,
+                      below_top, below_left, column=crossing)[3]
+
+    upper = SubproblemMoves(left_sets[:mid], right_sets[:crossing], scheme,
+                            (top[0][:crossing+1], top[1][:crossing+1]),
+                            (left[0][:mid+1], left[1][:mid+1]), block_cells)[1]
+    lower = SubproblemMoves(left_sets[mid:], right_sets[crossing:], scheme,
+                            (row[0][crossing:], row[1][crossing:]), col,
+                            block_cells)[1]
+
+    return score, np.concatenate((upper, lower))
+
+
+def LinearSpaceMoves(left_sets, right_sets, scheme, block_cells=BLOCK_CELLS):
+    '''
+    Finds the parsimony score and the moves of the optimal path with memory
+    linear in the lengths of the alignments. The path is the same as the
+    one recorded in the full trace back matrix.
+
+    Parameters
+    ----------
+    left_sets : numpy.ndarray
+        Set codes of the left alignment.
+    right_sets : numpy.ndarray
+        Set codes of the right alignment.
+    scheme : AlignmentScheme
+        Scoring scheme of the aligner.
+    block_cells : int, optional
+        Largest matrix which is solved with a full trace back matrix.
+
+    Returns
+    -------
+    parsimony_score : numpy.float64
+        parsimony score of the alignment
+    moves : numpy.ndarray
+        Moves of the optimal path.
+
+    '''
+
+    left_sets = np.asarray(left_sets, dtype=np.uint8)
+    right_sets = np.asarray(right_sets, dtype=np.uint8)
+    top, left = Boundaries(left_sets, right_sets, scheme)
+
+    return SubproblemMoves(left_sets, right_sets, scheme, top, left,
+                           block_cells)
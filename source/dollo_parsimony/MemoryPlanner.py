@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from dollo_parsimony.AlignmentKernels import MOVES_PER_BYTE
+from dollo_parsimony.LinearSpace import BLOCK_CELLS
+from dollo_parsimony.ParsimonySets import GAP_BYTE
+from dollo_parsimony.Strategies import PLANNED_STRATEGIES, STRATEGIES
+
+
+def VectorBytes(n, m, itemsize=8):
+    '''
+    Bytes of the anti-diagonals, rows and columns kept by a forward pass
+    over the matrix of two alignments of lengths n and m.
+
+    Parameters
+    ----------
+    n : int
+        Length of the left alignment.
+    m : int
+        Length of the right alignment.
+    itemsize : int, optional
+        Bytes of a score.
+
+    Returns
+    -------
+    vector_bytes : int
+        Estimated bytes of the vectors.
+
+    '''
+
+    #five anti-diagonals of S and T, three of the crossing columns and the
+    #recorded column, the recorded row and the moves of the path
+    return ((7*itemsize + 24) * (n+1) + 2*itemsize * (m+1) + (n+m))
+
+
+def StrategyBytes(n, m, strategy, itemsize=8, block_cells=BLOCK_CELLS):
+    '''
+    Estimates the peak memory of aligning two alignments of lengths n and m
+    with a strategy.
+
+    Parameters
+    ----------
+    n : int
+        Length of the left alignment.
+    m : int
+        Length of the right alignment.
+    strategy : str
+        'full' fills the matrices S and T, 'compressed' keeps a trace back
+        matrix of two bits per cell and two anti-diagonals of S, 'linear'
+        splits the matrix into blocks of at most block_cells cells and
+        'banded' fills a band of at most block_cells cells.
+    itemsize : int, optional
+        Bytes of a score, of S may be narrower, see ScoreDtype.
+    block_cells : int, optional
+        Largest block of the linear and the banded strategy.
+
+    Returns
+    -------
+    strategy_bytes : int
+        Estimated bytes of the alignment of the two profiles.
+
+    '''
+
+    cells = (n+1) * (m+1)
+    #the packed trace back matrix has one byte more per row
+    packed = (n+1) * (m // MOVES_PER_BYTE + 1)
+
+    if strategy == 'full':
+        return itemsize * cells + packed
+    if strategy == 'compressed':
+        return packed + VectorBytes(n, m, itemsize)
+    if strategy in ['linear', 'banded']:
+        return (min(packed, min(cells, block_cells) // MOVES_PER_BYTE + n+1) + 
+                VectorBytes(n, m, itemsize))
+
+    raise ValueError('unknown alignment strategy ' + repr(strategy) +
+                     ', expected one of ' + ', '.join(STRATEGIES))
+
+
+def ChooseStrategy(n, m, memory_budget=None, itemsize=8, strategy='full'):
+    '''
+    Chooses the fastest strategy which aligns two alignments of lengths n
+    and m within the memory budget. Strategies faster than the given one
+    are never chosen. The linear strategy shrinks its blocks to fit the
+    budget. The banded strategy is kept, its band and its fall back get the
+    cells of the compressed or the linear strategy.
+
+    Parameters
+    ----------
+    n : int
+        Length of the left alignment.
+    m : int
+        Length of the right alignment.
+    memory_budget : int, optional
+        Largest number of bytes of the alignment, None for no limit.
+    itemsize : int, optional
+        Bytes of a score.
+    strategy : str, optional
+        Fastest strategy which may be chosen.
+
+    Returns
+    -------
+    strategy : str
+        'full', 'banded', 'compressed' or 'linear'.
+    block_cells : int
+        Largest block of a full trace back matrix, the whole matrix unless
+        the strategy is 'linear' or 'banded'.
+    strategy_bytes : int
+        Estimated bytes of the alignment.
+
+    '''
+
+    if strategy not in STRATEGIES:
+        raise ValueError('unknown alignment strategy ' + repr(strategy) +
+                         ', expected one of ' + ', '.join(STRATEGIES))
+    if strategy == 'banded':
+        block_cells, strategy_bytes = ChooseStrategy(n, m, memory_budget,
+                                                     itemsize, 'compressed')[1:]
+        return strategy, block_cells, strategy_bytes
+
+    cells = (n+1) * (m+1)
+
+    for candidate in PLANNED_STRATEGIES[PLANNED_STRATEGIES.index(strategy):]:
+        block_cells = BLOCK_CELLS if candidate == 'linear' else cells
+        if memory_budget is not None and candidate == 'linear':
+            #blocks of two rows are always solved with a trace back matrix
+            block_cells = max(min(block_cells, MOVES_PER_BYTE * (
+                memory_budget - VectorBytes(n, m, itemsize) - (n+1))),
+                              2 * (m+1))
+        strategy_bytes = StrategyBytes(n, m, candidate, itemsize, block_cells)
+        if memory_budget is None or strategy_bytes <= memory_budget:
+            return candidate, block_cells, strategy_bytes
+
+    raise MemoryError('aligning profiles of lengths %d and %d needs about %d '
+                      'bytes, more than the memory budget of %d bytes'
+                      % (n, m, strategy_bytes, memory_budget))
+
+
+def PlanAlignment(tree, memory_budget=None, itemsize=8, strategy='full'):
+    '''
+    Plans the strategies of a progressive alignment before it is run. The
+    length of the alignment at an internal node is bounded by the sum of
+    the lengths of its children, so the plan holds for any alignment of the
+    leaves. The aligners choose again with the actual lengths, which stay
+    within the budget as well.
+
+    Parameters
+    ----------
+    tree : PhyloTree or PhyloNode
+        Phylogenetic Tree with ungapped sequences at the leaves
+    memory_budget : int, optional
+        Largest number of bytes of the alignment at a node, None for no
+        limit.
+    itemsize : int, optional
+        Bytes of a score.
+    strategy : str, optional
+        Fastest strategy which may be chosen.
+
+    Returns
+    -------
+    plan : list
+        Dictionary with the node, the number of cells, the strategy and its
+        estimated bytes for every internal node in postorder.
+
+    '''
+
+    lengths = {}
+    plan = []
+    for node in tree.traverse('postorder'):
+        if node.is_leaf():
+            sequence = np.frombuffer(''.join(node.sequence).encode('latin-1'),
+                                     dtype=np.uint8)
+            lengths[node] = int(np.count_nonzero(sequence != GAP_BYTE))
+        else:
+            n, m = [lengths[child] for child in node.children]
+            lengths[node] = n + m
+            chosen, block_cells, strategy_bytes = ChooseStrategy(
+                n, m, memory_budget, itemsize, strategy)
+            plan.append({'node': node, 'cells': (n+1) * (m+1),
+                         'strategy': chosen, 'bytes': strategy_bytes})
+
+    return plan
+
+
+def PlanSummary(plan):
+    '''
+    Counts the nodes of every strategy of a plan and finds its peak bytes.
+
+    Parameters
+    ----------
+    plan : list
+        Plan of PlanAlignment or the data of the 'PlanNode' events.
+
+    Returns
+    -------
+    summary : dict
+        Number of nodes by strategy and the peak bytes over all nodes.
+
+    '''
+
+    summary = {strategy: 0 for strategy in STRATEGIES}
+    summary['bytes'] = 0
+    for entry in plan:
+        summary[entry['strategy']] += 1
+        summary['bytes'] = max(summary['bytes'], entry['bytes'])
+
+    return summary
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+class NewickError(ValueError):
+    '''
+    Raised for Newick strings which can not be read by ReadNewick.
+    '''
+
+
+class TreeNode:
+    '''
+    Minimal tree node with the part of the ete3 PhyloNode interface used by
+    the scoring and alignment algorithms. Loading it does not import ete3.
+
+    Parameters
+    ----------
+    name : str, optional
+        Name of the node.
+    dist : float, optional
+        Length of the branch above the node.
+
+    '''
+
+    def __init__(self, name='', dist=1.0):
+        self.name = name
+        self.dist = dist
+        self.children = []
+        self.up = None
+
+    def __len__(self):
+        return len(self.get_leaves())
+
+    def __repr__(self):
+        return 'TreeNode(%r)' % self.name
+
+    def add_child(self, child=None, name='', dist=1.0):
+        if child is None:
+            child = TreeNode(name, dist)
+        child.up = self
+        self.children.append(child)
+        return child
+
+    def add_feature(self, name, value):
+        setattr(self, name, value)
+
+    def add_features(self, **features):
+        for name, value in features.items():
+            setattr(self, name, value)
+
+    def is_leaf(self):
+        return not self.children
+
+    def is_root(self):
+        return self.up is None
+
+    def traverse(self, strategy='preorder'):
+        '''
+        Iterates over the nodes of the subtree in preorder or postorder, in
+        the same order as ete3.
+        '''
+
+        if strategy == 'preorder':
+            stack = [self]
+            while stack:
+                node = stack.pop()
+                yield node
+                stack.extend(reversed(node.children))
+        elif strategy == 'postorder':
+            stack = [(self, False)]
+            while stack:
+                node, expanded = stack.pop()
+                if expanded or not node.children:
+                    yield node
+                else:
+                    stack.append((node, True))
+                    stack.extend((child, False) for child in
+                                 reversed(node.children))
+        else:
+            raise ValueError('unknown traversal strategy ' + repr(strategy))
+
+    def iter_leaves(self):
+        for node in self.traverse('preorder'):
+            if not node.children:
+                yield node
+
+    def get_leaves(self):
+        return list(self.iter_leaves())
+
+
+def Tokens(newick):
+    '''
+    Splits a Newick string into parentheses, commas, colons, the final
+    semicolon and labels. Comments in square brackets are dropped.
+
+    Parameters
+    ----------
+    newick : str
+        Newick string.
+
+    Returns
+    -------
+    tokens : list
+        Tokens of the Newick string.
+
+    '''
+
+    tokens = []
+    label = []
+    k = 0
+    while k < len(newick):
+        character = newick[k]
+        if character == '[':
+            end = newick.find(']', k)
+            if end < 0:
+                raise NewickError('unclosed comment')
+            k = end + 1
+            continue
+        if character == "'":
+            end = newick.find("'", k+1)
+            if end < 0:
+                raise NewickError('unclosed quoted label')
+            label.append(newick[k+1:end])
+            k = end + 1
+            continue
+        if character in '(),:;' or character.isspace():
+            if label:
+                tokens.append(''.join(label))
+                label = []
+            if not character.isspace():
+                tokens.append(character)
+        else:
+            label.append(character)
+        k = k + 1
+
+    if label:
+        tokens.append(''.join(label))
+
+    return tokens
+
+
+def ReadNewick(newick):
+    '''
+    Reads a tree in Newick format with node names and branch lengths.
+
+    Parameters
+    ----------
+    newick : str
+        Newick string.
+
+    Returns
+    -------
+    tree : TreeNode
+        Root of the tree.
+
+    '''
+
+    tokens = Tokens(newick)
+    if not tokens or tokens[-1] != ';':
+        raise NewickError('Newick string does not end with ;')
+
+    #an opening parenthesis adds a child and descends into it, names and
+    #branch lengths belong to the current node
+    root = TreeNode(dist=0.0)
+    node = root
+    k = 0
+    while k < len(tokens) - 1:
+        token = tokens[k]
+        if token == '(':
+            node = node.add_child()
+        elif token == ',':
+            if node.up is None:
+                raise NewickError('unexpected , at the root')
+            node = node.up.add_child()
+        elif token == ')':
+            node = node.up
+            if node is None:
+                raise NewickError('unbalanced parentheses')
+        elif token == ':':
+            k = k + 1
+            try:
+                node.dist = float(tokens[k])
+            except (IndexError, ValueError):
+                raise NewickError('branch length is not a number')
+        elif token == ';':
+            raise NewickError('unexpected ; inside the tree')
+        else:
+            node.name = token
+        k = k + 1
+
+    if node is not root:
+        raise NewickError('unbalanced parentheses')
+
+    return root
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+
+import numpy as np
+
+from dollo_parsimony.ArrayTree import ArrayTree
+from dollo_parsimony.AlignmentKernels import UnitCostScheme, WeightedScheme
+from dollo_parsimony.AlignmentKernels import WavefrontMatrices, TraceBackMoves
+from dollo_parsimony.AlignmentKernels import WideScore
+from dollo_parsimony.AlignmentKernels import MergeSets, MergeAlignments
+from dollo_parsimony.LinearSpace import LinearSpaceMoves, ForwardScore
+from dollo_parsimony.LinearSpace import BLOCK_CELLS
+from dollo_parsimony.BandedAlignment import BandedMoves
+from dollo_parsimony.MemoryPlanner import ChooseStrategy
+from dollo_parsimony.Instrumentation import RECORDERS, Record
+from dollo_parsimony.ProgressiveAlignment import InitalizeSets, EditScript
+from dollo_parsimony.ProgressiveAlignment import ComposeAlignment
+
+
+def MakeScheme(cost_matrix=None, free_gap_extension=False):
+    '''
+    Builds the scoring scheme of an aligner inside a worker process, the
+    schemes themselves can not be sent to the workers.
+
+    Parameters
+    ----------
+    cost_matrix : double dictionary, optional
+        cost matrix of the weighted aligners, None for the unit cost
+        aligners.
+    free_gap_extension : bool, optional
+        Extending a gap with the same move again costs nothing.
+
+    Returns
+    -------
+    scheme : AlignmentScheme
+        Scoring scheme of the aligner.
+
+    '''
+
+    if cost_matrix is None:
+        return UnitCostScheme(free_gap_extension)
+
+    return WeightedScheme(cost_matrix, free_gap_extension)
+
+
+def AlignProfiles(left, right, scheme_args, strategy='full', score_only=False,
+                  profile=True, keep_alignment=True, block_cells=BLOCK_CELLS):
+    '''
+    Aligns the profiles of two sibling subtrees. Runs in a worker process and
+    gives the same score, sets and alignment as the serial aligners.
+
+    Parameters
+    ----------
+    left : tuple
+        Nucleotide sets and alignment of the left child, the alignment is
+        only needed with keep_alignment.
+    right : tuple
+        Nucleotide sets and alignment of the right child, the alignment is
+        only needed with keep_alignment.
+    scheme_args : tuple
+        Arguments of MakeScheme.
+    strategy : str, optional
+        'full', 'banded', 'compressed' or 'linear'.
+    score_only : bool, optional
+        Only find the parsimony score and the nucleotide sets.
+    profile : bool, optional
+        Find the nucleotide sets of the alignment, in score only mode.
+    keep_alignment : bool, optional
+        Return the alignment of the profiles instead of its edit script.
+    block_cells : int, optional
+        Largest matrix which is solved with a full trace back matrix by the
+        compressed and linear strategies, and largest band of the banded
+        strategy.
+
+    Returns
+    -------
+    parsimony_score : numpy.float64
+        parsimony score of the alignment of the two profiles
+    pars_sets : numpy.ndarray
+        Nucleotide sets of the alignment, None if not needed.
+    align : numpy.ndarray or tuple
+        Alignment of the two profiles or its edit script, None in score
+        only mode.
+
+    '''
+
+    scheme = MakeScheme(*scheme_args)
+    left_sets, left_alignment = left
+    right_sets, right_alignment = right
+
+    if score_only and not profile:
+        return ForwardScore(left_sets, right_sets, scheme), None, None
+
+    if strategy == 'banded' and not score_only:
+        parsimony_score, moves = BandedMoves(left_sets, right_sets, scheme,
+                                             block_cells)[:2]
+    elif score_only or strategy != 'full':
+        parsimony_score, moves = LinearSpaceMoves(left_sets, right_sets,
+                                                  scheme, block_cells)
+    else:
+        S, T = WavefrontMatrices(left_sets, right_sets, scheme)
+        parsimony_score = WideScore(S[len(left_sets)][len(right_sets)])
+        moves = TraceBackMoves(T, len(left_sets), len(right_sets))
+
+    pars_sets = MergeSets(moves, left_sets, right_sets)
+    if score_only:
+        return parsimony_score, pars_sets, None
+    if not keep_alignment:
+        return parsimony_score, pars_sets, EditScript(moves)
+
+    align = MergeAlignments(moves, left_alignment, right_alignment)
+
+    return parsimony_score, pars_sets, align
+
+
+def ParallelAlign(tree, initialize, scheme_args, workers=None,
+                  strategy='full', score_only=False, keep_alignments=False,
+                  memory_budget=None):
+    '''
+    Runs a progressive aligner with the alignments of independent subtrees
+    in a process pool. A node is sent to the pool as soon as both of its
+    children are aligned. The score, the alignment and the features added to
+    the tree are the same as with the serial aligner.
+
+    Parameters
+    ----------
+    tree : PhyloNode or PhyloTree
+        Phylogenetic Tree with ungapped sequences at the leaves
+    initialize : function
+        Initializes the nucleotide sets and the alignment at a leaf.
+    scheme_args : tuple
+        Arguments of MakeScheme.
+    workers : int, optional
+        Number of worker processes, by default the number of cores.
+    strategy : str, optional
+        'full', 'banded', 'compressed' or 'linear', the fastest strategy
+        which may be chosen with a memory budget.
+    score_only : bool, optional
+        Only find the parsimony score, the alignment is not built.
+    keep_alignments : bool, optional
+        Keep the alignment of every internal node. By default the workers
+        only return the edit scripts of the internal nodes and the alignment
+        is built once at the root.
+    memory_budget : int, optional
+        Largest number of bytes of the alignments in all workers together,
+        None for no limit. The strategy of every node is chosen before it is
+        sent to a worker, with an equal share of the budget per worker.
+
+    Returns
+    -------
+    parsimony_score : numpy.float64
+        parsimony score for the alignment on the tree
+    alignment : numpy.ndarray
+        Multiple sequence alignment for the given tree as a uint8 matrix of
+        characters, see AlignmentStrings, None if score_only
+
+    '''
+
+    #the process pool is only loaded when it is used
+    from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+    if workers is None:
+        workers = os.cpu_count()
+
+    array_tree = ArrayTree(tree)
+    nodes = array_tree.nodes
+    waiting = np.zeros(len(array_tree), dtype=int)
+    itemsize = np.dtype(MakeScheme(*scheme_args).dtype).itemsize
+    if memory_budget is not None:
+        memory_budget = memory_budget // workers
+    scores = {}
+    running = {}
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+
+        def Submit(k):
+            left, right = [nodes[child] for child in array_tree.children[k]]
+            #the alignments of the children are only sent if they are merged
+            alignments = [getattr(child, 'alignment', None)
+                          if keep_alignments else None
+                          for child in (left, right)]
+            n, m = len(left.parsimony_sets), len(right.parsimony_sets)
+            node_strategy, block_cells, strategy_bytes = ChooseStrategy(
+                n, m, memory_budget, itemsize,
+                'linear' if score_only else strategy)
+            #the root of score only mode keeps no profile
+            if RECORDERS and (k != 0 or not score_only):
+                Record('PlanNode', node = nodes[k], strategy = node_strategy,
+                       cells = (n+1) * (m+1), bytes = strategy_bytes)
+            future = pool.submit(
+                AlignProfiles,
+                (left.parsimony_sets, alignments[0]),
+                (right.parsimony_sets, alignments[1]),
+                scheme_args, node_strategy, score_only, k != 0,
+                keep_alignments, block_cells)
+            running[future] = k
+
+        def Done(k):
+            parent = array_tree.parent[k]
+            if parent < 0:
+                return
+            waiting[parent] += 1
+            if waiting[parent] == 2:
+                Submit(parent)
+
+        for k in array_tree.leaves:
+            if score_only:
+                InitalizeSets(nodes[k])
+            else:
+                initialize(nodes[k])
+            Done(k)
+
+        while running:
+            finished, pending = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                k = running.pop(future)
+                pars_score, pars_sets, align = future.result()
+                scores[k] = pars_score
+                if pars_sets is not None:
+                    nodes[k].add_features(parsimony_sets = pars_sets)
+                if align is not None and keep_alignments:
+                    nodes[k].add_features(alignment = align)
+                elif align is not None:
+                    nodes[k].add_features(edit_script = align)
+                Done(k)
+
+    #sum in postorder as the serial aligners do
+    parsimony_score = 0
+    for k in array_tree.internal_postorder:
+        parsimony_score = parsimony_score + scores[k]
+
+    if score_only:
+        return parsimony_score, None
+
+    if not keep_alignments:
+        tree.add_features(alignment = ComposeAlignment(tree))
+
+    return parsimony_score, tree.alignment
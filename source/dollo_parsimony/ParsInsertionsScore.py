@@ -6,8 +6,16 @@ Created on Thu May 27 14:06:20 2021
 @author: claraiglhaut
 """
 
+import numpy as np
+
+from dollo_parsimony.ParsimonySets import characters, GAP, EncodeSequence
+from dollo_parsimony.ParsimonySets import EncodeCharacters
+from dollo_parsimony.ArrayTree import ArrayTree
+from dollo_parsimony.InsertionPoints import InsertionPointArrays
+from dollo_parsimony.ColumnShards import ShardedSiteScores
+from dollo_parsimony.SitePatterns import CompressedSiteScores
+from dollo_parsimony.Instrumentation import Phases
 
-characters = ['A', 'T', 'C', 'G', '-']
 
 def ParsInsertionsLeaf(leaf):
     '''
@@ -24,12 +32,10 @@ def ParsInsertionsLeaf(leaf):
 
     '''
     
-    pars_sets = []
-    for character in leaf.sequence:
-        pars_sets.append(set(character))
+    pars_sets = EncodeSequence(leaf.sequence)
     leaf.add_features(parsimony_sets = pars_sets)
     
-    pars_scores = [0]*len(leaf.sequence)
+    pars_scores = np.zeros(len(leaf.sequence), dtype=int)
     leaf.add_features(parsimony_scores = pars_scores)    
 
   
@@ -56,43 +62,202 @@ def ParsInsertionsInternal(tree, i):
     right_set = tree.children[1].parsimony_sets[i]
     right_score  = tree.children[1].parsimony_scores[i]
     
-    if left_set == set('-') and right_set == set('-'):
-        tree.parsimony_sets[i] = set('-')
+    if left_set == GAP and right_set == GAP:
+        tree.parsimony_sets[i] = GAP
         tree.parsimony_scores[i] = left_score + right_score
         
-    elif (left_set == set('-') and right_set != set('-')):
+    elif (left_set == GAP and right_set != GAP):
         if tree.insertion_flags[i]:
-            tree.parsimony_sets[i] = set('-')
+            tree.parsimony_sets[i] = GAP
             tree.parsimony_scores[i] = left_score + right_score
         else: 
             tree.parsimony_sets[i] = right_set
             tree.parsimony_scores[i] = left_score + right_score + 1
         
-    elif (left_set != set('-') and right_set == set('-')):
+    elif (left_set != GAP and right_set == GAP):
         if tree.insertion_flags[i]:
-            tree.parsimony_sets[i] = set('-')
+            tree.parsimony_sets[i] = GAP
             tree.parsimony_scores[i] = left_score + right_score
         else: 
             tree.parsimony_sets[i] = left_set
             tree.parsimony_scores[i] = left_score + right_score + 1
         
-    elif not left_set.intersection(right_set):
-        tree.parsimony_sets[i] = left_set.union(right_set)
+    elif not left_set & right_set:
+        tree.parsimony_sets[i] = left_set | right_set
         tree.parsimony_scores[i] = left_score + right_score + 1
     else:
-        tree.parsimony_sets[i] = left_set.intersection(right_set)
+        tree.parsimony_sets[i] = left_set & right_set
         tree.parsimony_scores[i] = left_score + right_score
-       
 
-def ParsInsertionsScore(tree):
+
+def InternalColumns(left_sets, left_scores, right_sets, right_scores,
+                    ins_flags):
     '''
-    Calculates the parsimony score for the whole tree while accounting for 
+    Parsimony sets and scores of an internal node at all sites from the sets
+    and scores of its children.
+
+    Parameters
+    ----------
+    left_sets : numpy.ndarray
+        Set codes of the left child.
+    left_scores : numpy.ndarray
+        Scores of the left child.
+    right_sets : numpy.ndarray
+        Set codes of the right child.
+    right_scores : numpy.ndarray
+        Scores of the right child.
+    ins_flags : numpy.ndarray
+        Insertion flags of the node.
+
+    Returns
+    -------
+    pars_sets : numpy.ndarray
+        Set codes of the node.
+    pars_scores : numpy.ndarray
+        Scores of the node.
+
+    '''
+    
+    #non empty intersection +0, empty intersection +1
+    intersection = left_sets & right_sets
+    pars_sets = np.where(intersection != 0, intersection, left_sets | right_sets)
+    pars_scores = left_scores + right_scores + (intersection == 0)
+    
+    #exactly one child has a gap, keep the residues of the other child 
+    #unless the residues are inserted on the branch above the child
+    one_gap = (left_sets == GAP) != (right_sets == GAP)
+    residue_sets = np.where(left_sets == GAP, right_sets, left_sets)
+    pars_sets[one_gap] = residue_sets[one_gap]
+    
+    inserted = one_gap & ins_flags
+    pars_sets[inserted] = GAP
+    pars_scores[inserted] = pars_scores[inserted] - 1
+    
+    return pars_sets, pars_scores
+
+
+def ParsInsertionsInternalColumns(tree):
+    '''
+    Creates the parsimony sets and scores for an internal node at all sites 
+    at once. Equivalent to calling ParsInsertionsInternal for every site.
+
+    Parameters
+    ----------
+    tree : PhyloNode or PhlyoTree
+        Internal nodes a tree structue.
+
+    Returns
+    -------
+    None.
+
+    '''
+    
+    left, right = tree.children
+    pars_sets, pars_scores = InternalColumns(
+        left.parsimony_sets, left.parsimony_scores, 
+        right.parsimony_sets, right.parsimony_scores, tree.insertion_flags)
+    
+    tree.parsimony_sets[:] = pars_sets
+    tree.parsimony_scores[:] = pars_scores
+
+
+def ParsInsertionsArrays(array_tree, msa, phases=None):
+    '''
+    Calculates the parsimony sets and scores of every node at every site 
+    while accounting for insertions and deletions.
+
+    Parameters
+    ----------
+    array_tree : ArrayTree
+        Input tree.
+    msa : numpy.ndarray
+        Alignment as a matrix of characters with one row per leaf.
+    phases : Phases, optional
+        Measures the times of the initialisation, the insertion points and
+        the internal pass.
+
+    Returns
+    -------
+    arrays : dict
+        parsimony_sets, parsimony_scores, insertion_flags, has_residue and
+        insertion_points with one row per node.
+
+    '''
+    
+    if phases is None:
+        phases = Phases('ParsInsertionsScore')
+    shape = (len(array_tree), msa.shape[1])
+    children = array_tree.children
+    
+    #sets and scores for leaves
+    pars_sets = np.zeros(shape, dtype=np.uint8)
+    pars_scores = np.zeros(shape, dtype=int)
+    pars_sets[array_tree.leaves] = EncodeCharacters(msa)
+    phases('initialisation')
+    
+    # find insertion points and mark their parents with an insertion flag 
+    # set to True
+    has_residue, ins_points = InsertionPointArrays(array_tree, 
+                                                   pars_sets[array_tree.leaves] != GAP)
+    ins_flags = np.zeros(shape, dtype=bool)
+    internal = array_tree.internal_postorder
+    ins_flags[internal] = (ins_points[children[internal, 0]] | 
+                           ins_points[children[internal, 1]])
+    phases('insertion_points')
+    
+    #find internal sets and scores for all sites in one traversal
+    for k in internal:
+        left, right = children[k]
+        pars_sets[k], pars_scores[k] = InternalColumns(
+            pars_sets[left], pars_scores[left], 
+            pars_sets[right], pars_scores[right], ins_flags[k])
+    phases('internal_pass')
+    phases.Done(nodes = shape[0], sites = shape[1])
+    
+    return dict(parsimony_sets = pars_sets, parsimony_scores = pars_scores,
+                insertion_flags = ins_flags, has_residue = has_residue,
+                insertion_points = ins_points)
+
+
+def ParsInsertionsSiteScores(array_tree, msa):
+    '''
+    Calculates the parsimony score of every site while accounting for 
     insertions and deletions.
 
+    Parameters
+    ----------
+    array_tree : ArrayTree
+        Input tree.
+    msa : numpy.ndarray
+        Alignment as a matrix of characters with one row per leaf.
+
+    Returns
+    -------
+    site_scores : numpy.ndarray
+        parsimony score with insertions of every site.
+
+    '''
+    
+    return ParsInsertionsArrays(array_tree, msa)['parsimony_scores'][0]
+
+
+def ParsInsertionsScore(tree, workers=1, compress=False):
+    '''
+    Calculates the parsimony score for the whole tree while accounting for 
+    insertions and deletions. Adds the parsimony sets, scores and insertion 
+    flags to every node.
+
     Parameters
     ----------
     tree : PhyloNode and PhyloTree
         Input tree with the alignment.
+    workers : int, optional
+        Number of worker processes which score shards of columns, None for 
+        one per core. With more than one worker the features are not added
+        to the tree.
+    compress : bool, optional
+        Only score the unique columns of the alignment. The features are not
+        added to the tree.
 
     Returns
     -------
@@ -101,44 +266,26 @@ def ParsInsertionsScore(tree):
 
     '''
     
-    length_MSA = len(tree.get_leaves()[0].sequence)
+    phases = Phases('ParsInsertionsScore')
+    array_tree = ArrayTree(tree)
+    msa = array_tree.LeafMatrix()
     
-    #empty sets and scores for every node, insertion flags are set to False
-    for node in tree.traverse('postorder'):
-        pars_sets = [set()] * length_MSA
-        pars_scores = [0] * length_MSA
-        ins_flags = [False] * length_MSA
-        node.add_features(parsimony_sets = pars_sets)
-        node.add_features(parsimony_scores = pars_scores)
-        node.add_features(insertion_flags = ins_flags)
+    if compress:
+        # scores and numbers of sites of the unique columns
+        pattern_scores, weights = CompressedSiteScores(
+            array_tree, msa, ParsInsertionsSiteScores, workers=workers)[::2]
+        return int(pattern_scores @ weights)
     
-    #sets and scores for leaves
-    for leaf in tree.iter_leaves():
-        ParsInsertionsLeaf(leaf)
-    
-    # find insertion points and mark them with an insertion flag set to True
-    for i in range(length_MSA):
-        leaf_res = []
-        for leaf in tree.iter_leaves():
-            if leaf.sequence[i] != '-':
-                leaf_res.append(leaf)
-               
-        if len(leaf_res) == 1:
-            ancestor = leaf_res[0]
-        else:
-            ancestor = tree.get_common_ancestor(leaf_res)
-    
-        if not ancestor.is_root():
-            ancestor.up.insertion_flags[i] = True    
-    
-    #find internal sets and scores
-    for i in range(length_MSA):
-        for node in tree.traverse('postorder'):
-            if not node.is_leaf():
-                ParsInsertionsInternal(node, i)
+    if workers == 1:
+        arrays = ParsInsertionsArrays(array_tree, msa, phases)
+        array_tree.AddFeatures(**arrays)
+        site_scores = arrays['parsimony_scores'][0]
+    else:
+        site_scores = ShardedSiteScores(array_tree, msa, 
+                                        ParsInsertionsSiteScores, 
+                                        workers=workers)
     
     # sum the parsimony scores at the root over the whole sequence
-    tree_score = sum(tree.parsimony_scores)
+    tree_score = int(site_scores.sum())
     
     return tree_score
-            
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+
+characters = ['A', 'T', 'C', 'G', '-']
+
+# bit k of a set code marks characters[k] as a member of the set
+GAP = 1 << characters.index('-')
+NUMBER_OF_CODES = 1 << len(characters)
+
+# alignments store characters as bytes, the gap as GAP_BYTE
+GAP_BYTE = ord('-')
+
+# IUPAC ambiguity codes stand for the set of the nucleotides they code for
+AMBIGUITY_CODES = {'R': 'AG', 'Y': 'CT', 'S': 'CG', 'W': 'AT', 'K': 'GT',
+                   'M': 'AC', 'B': 'CGT', 'D': 'AGT', 'H': 'ACT',
+                   'V': 'ACG', 'N': 'ATCG', 'U': 'T'}
+
+ENCODING = np.zeros(256, dtype=np.uint8)
+for bit, character in enumerate(characters):
+    ENCODING[ord(character)] = 1 << bit
+for character, nucleotides in AMBIGUITY_CODES.items():
+    for nucleotide in nucleotides:
+        ENCODING[ord(character)] |= ENCODING[ord(nucleotide)]
+#lowercase characters are encoded as the uppercase ones
+for character in range(ord('a'), ord('z')+1):
+    ENCODING[character] = ENCODING[ord(chr(character).upper())]
+
+# characters contained in each possible set code
+SET_CHARACTERS = [[character for bit, character in enumerate(characters)
+                   if code & (1 << bit)] for code in range(NUMBER_OF_CODES)]
+
+
+def EncodeSequence(sequence):
+    '''
+    Encodes a sequence as an array of set codes, see EncodeCharacters.
+
+    Parameters
+    ----------
+    sequence : str or list
+        Sequence of characters from the alphabet.
+
+    Returns
+    -------
+    codes : numpy.ndarray
+        uint8 array with one set code per site.
+
+    '''
+
+    raw = np.frombuffer(''.join(sequence).encode('latin-1'), dtype=np.uint8)
+
+    return EncodeCharacters(raw)
+
+
+def EncodeCharacters(raw):
+    '''
+    Encodes an array of characters as set codes. The characters A, T, C, G
+    and - are single character sets, the IUPAC ambiguity codes are the sets
+    of their nucleotides, e.g. N is the set of all four nucleotides, and
+    lowercase characters are the same sets as the uppercase ones.
+
+    Parameters
+    ----------
+    raw : numpy.ndarray
+        uint8 array of characters from the alphabet, of any shape.
+
+    Returns
+    -------
+    codes : numpy.ndarray
+        uint8 array with one set code per character.
+
+    '''
+
+    codes = ENCODING[raw]
+
+    if not codes.all():
+        unknown = sorted(set(chr(c) for c in raw[codes == 0]))
+        raise ValueError('characters which are neither nucleotides, IUPAC '
+                         'ambiguity codes nor gaps: ' + ''.join(unknown))
+
+    return codes
+
+
+def EncodeAlignment(sequences):
+    '''
+    Stores aligned sequences as a matrix of one byte per character.
+
+    Parameters
+    ----------
+    sequences : list
+        Sequences of equal length, as strings or lists of characters.
+
+    Returns
+    -------
+    alignment : numpy.ndarray
+        uint8 matrix with one row per sequence.
+
+    '''
+
+    rows = [''.join(sequence).encode('latin-1') for sequence in sequences]
+    if len(set(len(row) for row in rows)) > 1:
+        raise ValueError('the sequences are not aligned')
+
+    alignment = np.frombuffer(b''.join(rows), dtype=np.uint8)
+
+    return alignment.reshape(len(rows), -1 if rows else 0).copy()
+
+
+def AlignmentBytes(alignment):
+    '''
+    View of an alignment as single bytes characters, without a copy.
+
+    Parameters
+    ----------
+    alignment : numpy.ndarray
+        uint8 alignment matrix.
+
+    Returns
+    -------
+    characters : numpy.ndarray
+        Matrix of dtype 'S1' sharing the memory of the alignment.
+
+    '''
+
+    return alignment.view('S1')
+
+
+def AlignmentStrings(alignment):
+    '''
+    Decodes the rows of an alignment into strings.
+
+    Parameters
+    ----------
+    alignment : numpy.ndarray
+        uint8 alignment matrix.
+
+    Returns
+    -------
+    sequences : list
+        Aligned sequence of every row.
+
+    '''
+
+    return [row.tobytes().decode('latin-1') for row in alignment]
+
+
+def DecodeAlignment(alignment):
+    '''
+    Decodes an alignment into a matrix of strings of one character.
+
+    Parameters
+    ----------
+    alignment : numpy.ndarray
+        uint8 alignment matrix.
+
+    Returns
+    -------
+    characters : numpy.ndarray
+        Matrix of dtype '<U1', four bytes per character.
+
+    '''
+
+    return alignment.view('S1').astype(str)
+
+
+def EncodeSet(character_set):
+    '''
+    Encodes a set of characters as an integer bitmask.
+
+    Parameters
+    ----------
+    character_set : set
+        Set of characters from the alphabet.
+
+    Returns
+    -------
+    code : int
+        Set code of the character set.
+
+    '''
+
+    code = 0
+    for character in character_set:
+        code = code | (1 << characters.index(character))
+
+    return code
+
+
+def EncodeSets(character_sets):
+    '''
+    Encodes a list of character sets as an array of set codes.
+
+    Parameters
+    ----------
+    character_sets : list
+        List of sets of characters.
+
+    Returns
+    -------
+    codes : numpy.ndarray
+        uint8 array with one set code per set.
+
+    '''
+
+    return np.array([EncodeSet(s) for s in character_sets], dtype=np.uint8)
+
+
+def DecodeSet(code):
+    '''
+    Decodes a set code into a set of characters.
+
+    Parameters
+    ----------
+    code : int
+        Set code.
+
+    Returns
+    -------
+    character_set : set
+        Set of characters marked in the code.
+
+    '''
+
+    return set(SET_CHARACTERS[int(code)])
+
+
+def DecodeSets(codes):
+    '''
+    Decodes an array of set codes into a list of character sets.
+
+    Parameters
+    ----------
+    codes : numpy.ndarray
+        Array of set codes.
+
+    Returns
+    -------
+    character_sets : list
+        List of sets of characters.
+
+    '''
+
+    return [DecodeSet(code) for code in codes]
@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import time
+
+import numpy as np
+
+from dollo_parsimony.AlignmentKernels import TraceBackMoves, ChildColumns
+from dollo_parsimony.AlignmentKernels import WideScore
+from dollo_parsimony.AlignmentKernels import MergeSets, MergeAlignments
+from dollo_parsimony.LinearSpace import LinearSpaceMoves, ForwardScore
+from dollo_parsimony.LinearSpace import BLOCK_CELLS
+from dollo_parsimony.BandedAlignment import BandedMoves
+from dollo_parsimony.MemoryPlanner import ChooseStrategy
+from dollo_parsimony.Strategies import STRATEGIES
+from dollo_parsimony.ParsimonySets import GAP, GAP_BYTE, EncodeSequence
+from dollo_parsimony.ParsimonySets import EncodeCharacters
+from dollo_parsimony.Instrumentation import RECORDERS, Record
+
+def InitalizeSets(leaf):
+    '''
+    Initializes the nucleotide sets at the leaf nodes without their 
+    alignments.
+
+    Parameters
+    ----------
+    leaf : PhlyoNode or PhyloTree
+        Tree leaves with ungapped sequences
+
+    Returns
+    -------
+    None.
+
+    '''
+
+    codes = EncodeSequence(leaf.sequence)
+    leaf.add_features(parsimony_sets = codes[codes != GAP])
+
+
+def InitalizeSetsAndAlignment(leaf):
+    '''
+    Initializes the nucleotide sets and the alignments at the leaf nodes. 
+    The alignment is a uint8 matrix of the characters of the sequence
+    without its gaps.
+
+    Parameters
+    ----------
+    leaf : PhlyoNode or PhyloTree
+        Tree leaves with ungapped sequences
+
+    Returns
+    -------
+    None.
+
+    '''
+
+    raw = np.frombuffer(''.join(leaf.sequence).encode('latin-1'), dtype=np.uint8)
+    codes = EncodeCharacters(raw)
+    residues = codes != GAP
+    
+    leaf.add_features(parsimony_sets = codes[residues])
+    leaf.add_features(alignment = raw[residues].reshape(1, -1))
+
+
+def TraceBack(T, tree, keep_alignment=True):
+    '''
+    Finds the alignment for the (sub-)tree and adds it to the (sub-)tree root. 
+    Adds the nucleotide sets to the (sub-)tree root. The path is recorded 
+    as moves first and the alignment is gathered from the children's 
+    alignments in one step.
+
+    Parameters
+    ----------
+    T : numpy.ndarray
+        Packed trace back matrix for the alognment, see PackedMoves.
+    tree : PhyloTree or PhyloNode
+        Current (sub-)tree
+    keep_alignment : bool, optional
+        Add the alignment to the (sub-)tree root, otherwise only the edit 
+        script of the moves is added, see ComposeAlignment.
+
+    Returns
+    -------
+    None.
+
+    '''
+    
+    #the alignments have as many columns as the nucleotide sets
+    moves = TraceBackMoves(T, len(tree.children[0].parsimony_sets), 
+                           len(tree.children[1].parsimony_sets))
+    AddMoves(tree, moves, keep_alignment)
+
+
+def AddMoves(tree, moves, keep_alignment=True):
+    '''
+    Adds the nucleotide sets and either the alignment or the edit script of
+    the optimal path to the (sub-)tree root.
+
+    Parameters
+    ----------
+    tree : PhyloTree or PhyloNode
+        Current (sub-)tree
+    moves : numpy.ndarray
+        Moves of the optimal path.
+    keep_alignment : bool, optional
+        Add the alignment, otherwise the edit script.
+
+    Returns
+    -------
+    None.
+
+    '''
+    
+    #get the nucleotide sets from the left and right child
+    left, right = tree.children
+    pars_sets = MergeSets(moves, left.parsimony_sets, right.parsimony_sets)
+    tree.add_features(parsimony_sets = pars_sets)
+    
+    if keep_alignment:
+        align = MergeAlignments(moves, left.alignment, right.alignment)
+        tree.add_features(alignment = align)
+    else:
+        tree.add_features(edit_script = EditScript(moves))
+
+
+def EditScript(moves):
+    '''
+    Run length encoding of the moves of an optimal path.
+
+    Parameters
+    ----------
+    moves : numpy.ndarray
+        Moves of the optimal path.
+
+    Returns
+    -------
+    script : tuple
+        uint8 array of the moves of the runs and int array of their lengths.
+
+    '''
+    
+    #a run starts where the move changes, the moves are never 0
+    moves = np.asarray(moves, dtype=np.uint8)
+    starts = np.flatnonzero(np.diff(moves, prepend=0))
+    runs = np.diff(starts, append=len(moves))
+    
+    return moves[starts], runs
+
+
+def ScriptMoves(script):
+    '''
+    Moves of an optimal path from its edit script.
+
+    Parameters
+    ----------
+    script : tuple
+        Edit script from EditScript.
+
+    Returns
+    -------
+    moves : numpy.ndarray
+        Moves of the optimal path.
+
+    '''
+    
+    codes, runs = script
+    
+    return np.repeat(codes, runs)
+
+
+def ComposeAlignment(tree):
+    '''
+    Builds the alignment of the tree once from the edit scripts of the 
+    internal nodes and the alignments of the leaves. The columns of the 
+    alignment are passed down the tree, every edit script maps the columns 
+    of a node to the columns of its children. The alignment is the same as 
+    the one merged at every node.
+
+    Parameters
+    ----------
+    tree : PhyloTree or PhyloNode
+        Tree with edit scripts at the internal nodes.
+
+    Returns
+    -------
+    alignment : numpy.ndarray
+        Multiple sequence alignment for the given tree as a uint8 matrix of
+        characters.
+
+    '''
+    
+    columns = {tree: np.arange(len(tree.parsimony_sets))}
+    alignment = np.full((len(tree), len(tree.parsimony_sets)), GAP_BYTE, 
+                        dtype=np.uint8)
+    
+    #the leaves come in preorder, as the rows of the merged alignments
+    row = 0
+    for node in tree.traverse('preorder'):
+        node_columns = columns.pop(node)
+        if node.is_leaf():
+            alignment[row, node_columns] = node.alignment[0]
+            row = row + 1
+        else:
+            left_index, right_index = ChildColumns(ScriptMoves(node.edit_script))
+            columns[node.children[0]] = node_columns[left_index >= 0]
+            columns[node.children[1]] = node_columns[right_index >= 0]
+    
+    return alignment
+
+
+def AlignNode(tree, generate_matrices, *args, keep_alignment=True):
+    '''
+    Aligns the alignments of the children of the (sub-)tree root with the 
+    full matrices S and T. Adds the alignment and the nucleotide sets to the
+    (sub-)tree root. Records an 'AlignNode' event if a Recorder is active.
+    The score of the narrow matrix S is returned as a 64 bit number.
+
+    Parameters
+    ----------
+    tree : PhyloTree or PhyloNode
+        Current (sub-)tree
+    generate_matrices : function
+        GenerateMatrices of the aligner.
+    *args
+        Further arguments of generate_matrices.
+    keep_alignment : bool, optional
+        Add the alignment to the (sub-)tree root, otherwise the edit script.
+
+    Returns
+    -------
+    parsimony_score : numpy.float64
+        parsimony score of the alignment for the given tree
+
+    '''
+    
+    if not RECORDERS:
+        parsimony_score, T = generate_matrices(tree, *args)
+        TraceBack(T, tree, keep_alignment)
+        return WideScore(parsimony_score)
+    
+    start = time.perf_counter()
+    parsimony_score, T = generate_matrices(tree, *args)
+    generated = time.perf_counter()
+    TraceBack(T, tree, keep_alignment)
+    done = time.perf_counter()
+    
+    #S has the type of the score and one element per cell
+    cells = ((len(tree.children[0].parsimony_sets) + 1) * 
+             (len(tree.children[1].parsimony_sets) + 1))
+    matrix_bytes = T.nbytes + cells * parsimony_score.itemsize
+    Record('AlignNode', node = tree, generate_seconds = generated - start,
+           traceback_seconds = done - generated, cells = cells, 
+           bytes = matrix_bytes)
+    
+    return WideScore(parsimony_score)
+
+
+def LinearSpaceAlign(tree, scheme, keep_alignment=True,
+                     block_cells=BLOCK_CELLS):
+    '''
+    Aligns the alignments of the children of the (sub-)tree root with memory
+    linear in their lengths instead of the full matrices S and T. Adds the
+    alignment and the nucleotide sets to the (sub-)tree root, they are the
+    same as with GenerateMatrices and TraceBack.
+
+    Parameters
+    ----------
+    tree : PhyloTree or PhyloNode
+        Current (sub-)tree
+    scheme : AlignmentScheme
+        Scoring scheme of the aligner.
+    keep_alignment : bool, optional
+        Add the alignment to the (sub-)tree root, otherwise the edit script.
+    block_cells : int, optional
+        Largest matrix which is solved with a full trace back matrix.
+
+    Returns
+    -------
+    parsimony_score : numpy.float64
+        parsimony score of the alignment for the given tree
+
+    '''
+    
+    left_sets = tree.children[0].parsimony_sets
+    right_sets = tree.children[1].parsimony_sets
+    
+    parsimony_score, moves = LinearSpaceMoves(left_sets, right_sets, scheme,
+                                              block_cells)
+    AddMoves(tree, moves, keep_alignment)
+    
+    return parsimony_score
+
+
+def BandedAlign(tree, scheme, keep_alignment=True, max_cells=None):
+    '''
+    Aligns the alignments of the children of the (sub-)tree root by filling
+    a band around the main diagonals of the matrix, see BandedMoves. Adds 
+    the alignment and the nucleotide sets to the (sub-)tree root, they are 
+    the same as with GenerateMatrices and TraceBack. Records a 'BandedAlign'
+    event with the band if a Recorder is active.
+
+    Parameters
+    ----------
+    tree : PhyloTree or PhyloNode
+        Current (sub-)tree
+    scheme : AlignmentScheme
+        Scoring scheme of the aligner.
+    keep_alignment : bool, optional
+        Add the alignment to the (sub-)tree root, otherwise the edit script.
+    max_cells : int, optional
+        Largest band, and largest block if the matrix is solved without a 
+        band.
+
+    Returns
+    -------
+    parsimony_score : numpy.float64
+        parsimony score of the alignment for the given tree
+
+    '''
+    
+    left_sets = tree.children[0].parsimony_sets
+    right_sets = tree.children[1].parsimony_sets
+    
+    parsimony_score, moves, band = BandedMoves(left_sets, right_sets, scheme,
+                                               max_cells)
+    if RECORDERS:
+        Record('BandedAlign', node = tree, band = band,
+               cells = (len(left_sets)+1) * (len(right_sets)+1))
+    AddMoves(tree, moves, keep_alignment)
+    
+    return parsimony_score
+
+
+def PlannedAlign(tree, scheme, generate_matrices, *args, strategy='full',
+                 memory_budget=None, keep_alignment=True):
+    '''
+    Aligns the alignments of the children of the (sub-)tree root with the 
+    fastest strategy which fits the memory budget, see ChooseStrategy. 
+    Records a 'PlanNode' event with the chosen strategy if a Recorder is 
+    active.
+
+    Parameters
+    ----------
+    tree : PhyloTree or PhyloNode
+        Current (sub-)tree
+    scheme : AlignmentScheme
+        Scoring scheme of the aligner.
+    generate_matrices : function
+        GenerateMatrices of the aligner, used by the full strategy.
+    *args
+        Further arguments of generate_matrices.
+    strategy : str, optional
+        Fastest strategy which may be chosen.
+    memory_budget : int, optional
+        Largest number of bytes of the alignment, None for no limit.
+    keep_alignment : bool, optional
+        Add the alignment to the (sub-)tree root, otherwise the edit script.
+
+    Returns
+    -------
+    parsimony_score : numpy.float64
+        parsimony score of the alignment for the given tree
+
+    '''
+    
+    n = len(tree.children[0].parsimony_sets)
+    m = len(tree.children[1].parsimony_sets)
+    itemsize = np.dtype(scheme.dtype).itemsize
+    
+    strategy, block_cells, strategy_bytes = ChooseStrategy(
+        n, m, memory_budget, itemsize, strategy)
+    if RECORDERS:
+        Record('PlanNode', node = tree, strategy = strategy, 
+               cells = (n+1) * (m+1), bytes = strategy_bytes)
+    
+    if strategy == 'full':
+        return AlignNode(tree, generate_matrices, *args, 
+                         keep_alignment=keep_alignment)
+    if strategy == 'banded':
+        return BandedAlign(tree, scheme, keep_alignment, block_cells)
+    
+    return LinearSpaceAlign(tree, scheme, keep_alignment, block_cells)
+
+
+def ScoreOnlyAlign(tree, scheme, profile=True, memory_budget=None):
+    '''
+    Finds the parsimony score of aligning the children of the (sub-)tree 
+    root without building the alignment. Adds the nucleotide sets to the 
+    (sub-)tree root if they are needed by its parent, otherwise only the 
+    last two anti-diagonals of S are kept.
+
+    Parameters
+    ----------
+    tree : PhyloTree or PhyloNode
+        Current (sub-)tree
+    scheme : AlignmentScheme
+        Scoring scheme of the aligner.
+    profile : bool, optional
+        Add the nucleotide sets of the alignment to the (sub-)tree root.
+    memory_budget : int, optional
+        Largest number of bytes of the alignment, None for no limit.
+
+    Returns
+    -------
+    parsimony_score : numpy.float64
+        parsimony score of the alignment for the given tree
+
+    '''
+    
+    left_sets = tree.children[0].parsimony_sets
+    right_sets = tree.children[1].parsimony_sets
+    
+    if not profile:
+        return ForwardScore(left_sets, right_sets, scheme)
+    
+    n, m = len(left_sets), len(right_sets)
+    strategy, block_cells, strategy_bytes = ChooseStrategy(
+        n, m, memory_budget, np.dtype(scheme.dtype).itemsize, 'linear')
+    if RECORDERS:
+        Record('PlanNode', node = tree, strategy = strategy, 
+               cells = (n+1) * (m+1), bytes = strategy_bytes)
+    parsimony_score, moves = LinearSpaceMoves(left_sets, right_sets, scheme,
+                                              block_cells)
+    tree.add_features(parsimony_sets = MergeSets(moves, left_sets, right_sets))
+    
+    return parsimony_score
+
+
+def ScoreOnlyParsimony(tree, scheme, memory_budget=None):
+    '''
+    Finds the parsimony score of the progressive alignment on the tree 
+    without building the alignments. Internal nodes only keep the 
+    nucleotide sets needed by their parent and the root only keeps the last
+    two anti-diagonals of S. The score is the same as the one of the full 
+    alignment.
+
+    Parameters
+    ----------
+    tree : PhyloTree or PhyloNode
+        Phylogenetic Tree with ungapped sequences at the leaves
+    scheme : AlignmentScheme
+        Scoring scheme of the aligner.
+    memory_budget : int, optional
+        Largest number of bytes of the alignment at a node, None for no 
+        limit.
+
+    Returns
+    -------
+    parsimony_score : numpy.float64
+        parsimony score for the alignment on the tree
+
+    '''
+    
+    parsimony_score = 0
+    for node in tree.traverse('postorder'):
+        if node.is_leaf():
+            InitalizeSets(node)
+        else:
+            pars_score = ScoreOnlyAlign(node, scheme, node is not tree,
+                                        memory_budget)
+            parsimony_score = parsimony_score + pars_score
+    
+    return parsimony_score
+
+
+def CheckStrategy(strategy):
+    '''
+    Raises a ValueError for unknown alignment strategies.
+
+    Parameters
+    ----------
+    strategy : str
+        Alignment strategy.
+
+    Returns
+    -------
+    None.
+
+    '''
+    
+    if strategy not in STRATEGIES:
+        raise ValueError('unknown alignment strategy ' + repr(strategy) + 
+                         ', expected one of ' + ', '.join(STRATEGIES))
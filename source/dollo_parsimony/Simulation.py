@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from dollo_parsimony.Newick import TreeNode
+
+NUCLEOTIDES = np.array(list('ATCG'))
+
+
+def RandomTree(taxa, seed=None):
+    '''
+    Random binary tree, two random subtrees are joined until one tree is
+    left. The leaves are named T0, T1, ... and the branch lengths are
+    exponentially distributed with mean 0.1.
+
+    Parameters
+    ----------
+    taxa : int
+        Number of leaves.
+    seed : int or numpy.random.Generator, optional
+        Seed of the random numbers.
+
+    Returns
+    -------
+    tree : TreeNode
+        Root of the tree.
+
+    '''
+
+    if taxa < 1:
+        raise ValueError('the tree needs at least one leaf')
+    rng = np.random.default_rng(seed)
+
+    subtrees = [TreeNode('T%d' % k, rng.exponential(0.1)) for k in range(taxa)]
+    while len(subtrees) > 1:
+        i, j = sorted(rng.choice(len(subtrees), 2, replace=False))
+        right = subtrees.pop(j)
+        left = subtrees.pop(i)
+        node = TreeNode(dist=rng.exponential(0.1))
+        node.add_child(left)
+        node.add_child(right)
+        subtrees.append(node)
+
+    tree = subtrees[0]
+    tree.dist = 0.0
+
+    return tree
+
+
+def EvolveSequences(tree, length, gap_rate=0.1, substitution_rate=1.0,
+                    seed=None):
+    '''
+    Evolves sequences down the tree with substitutions, insertions and
+    deletions, and adds the true alignment of the sequences to the leaves.
+    Every inserted residue gets a new column, so the columns follow Dollo's
+    law. The rates are per unit of branch length: on a branch of length d a
+    residue is substituted with probability substitution_rate*d, and an
+    insertion or a deletion starts after a residue with probability
+    gap_rate*d/2 each. Indels have geometric lengths with mean 2. Columns
+    without residues at the leaves are removed.
+
+    Parameters
+    ----------
+    tree : TreeNode or PhyloNode
+        Tree, the sequences are added to the leaves.
+    length : int
+        Length of the root sequence.
+    gap_rate : float, optional
+        Rate of insertions and deletions per residue.
+    substitution_rate : float, optional
+        Rate of substitutions per residue.
+    seed : int or numpy.random.Generator, optional
+        Seed of the random numbers.
+
+    Returns
+    -------
+    None.
+
+    '''
+
+    rng = np.random.default_rng(seed)
+
+    #order of all columns, inserted columns are placed after the column of
+    #the residue before them
+    order = list(range(length))
+    root_residues = NUCLEOTIDES[rng.integers(4, size=length)]
+    sequences = {tree: list(zip(range(length), root_residues))}
+
+    for node in tree.traverse('preorder'):
+        if node.is_root():
+            continue
+        substitution = min(1.0, substitution_rate * node.dist)
+        indel = min(1.0, gap_rate * node.dist)
+        evolved = []
+        deleted = 0
+        for column, residue in sequences[node.up]:
+            if deleted:
+                deleted = deleted - 1
+                continue
+            if rng.random() < substitution:
+                residue = NUCLEOTIDES[rng.integers(4)]
+            evolved.append((column, residue))
+
+            event = rng.random()
+            if event < indel / 2:
+                deleted = rng.geometric(0.5)
+            elif event < indel:
+                position = order.index(column) + 1
+                for k in range(rng.geometric(0.5)):
+                    new_column = len(order)
+                    order.insert(position + k, new_column)
+                    evolved.append((new_column, NUCLEOTIDES[rng.integers(4)]))
+        sequences[node] = evolved
+
+    leaves = tree.get_leaves()
+    residues = [dict(sequences[leaf]) for leaf in leaves]
+    columns = [column for column in order
+               if any(column in leaf_residues for leaf_residues in residues)]
+    for leaf, leaf_residues in zip(leaves, residues):
+        leaf.sequence = ''.join([leaf_residues.get(column, '-')
+                                 for column in columns])
+
+
+def SimulateFamily(taxa, length, gap_rate=0.1, substitution_rate=1.0,
+                   seed=None):
+    '''
+    Random tree with a simulated alignment at the leaves. The scores use the
+    alignment, the aligners skip its gaps.
+
+    Parameters
+    ----------
+    taxa : int
+        Number of leaves.
+    length : int
+        Length of the root sequence.
+    gap_rate : float, optional
+        Rate of insertions and deletions per residue.
+    substitution_rate : float, optional
+        Rate of substitutions per residue.
+    seed : int, optional
+        Seed of the random numbers.
+
+    Returns
+    -------
+    tree : TreeNode
+        Tree with the aligned sequences at the leaves.
+
+    '''
+
+    rng = np.random.default_rng(seed)
+    tree = RandomTree(taxa, rng)
+    EvolveSequences(tree, length, gap_rate, substitution_rate, rng)
+
+    return tree
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from dollo_parsimony.ColumnShards import ShardedSiteScores
+
+
+def SitePatterns(msa):
+    '''
+    Collapses the alignment into its unique columns. Equal columns have the
+    same insertion point and the same score, so only the unique columns
+    need to be scored.
+
+    Parameters
+    ----------
+    msa : numpy.ndarray
+        Alignment as a matrix of characters with one row per leaf.
+
+    Returns
+    -------
+    patterns : numpy.ndarray
+        Unique columns with one row per leaf.
+    inverse : numpy.ndarray
+        Unique column of every site.
+    weights : numpy.ndarray
+        Number of sites of every unique column.
+
+    '''
+
+    #every column as one opaque value, which is much faster to sort than the
+    #columns of a matrix
+    columns = np.ascontiguousarray(msa.T)
+    keys = columns.view(np.dtype((np.void, msa.shape[0]))).reshape(-1)
+    unique_keys, inverse, weights = np.unique(keys, return_inverse=True,
+                                              return_counts=True)
+    patterns = unique_keys.view(np.uint8).reshape(-1, msa.shape[0]).T
+
+    return np.ascontiguousarray(patterns), inverse.reshape(-1), weights
+
+
+def CompressedSiteScores(array_tree, msa, site_scores, args=(), workers=1):
+    '''
+    Scores the unique columns of the alignment.
+
+    Parameters
+    ----------
+    array_tree : ArrayTree
+        Input tree.
+    msa : numpy.ndarray
+        Alignment as a matrix of characters with one row per leaf.
+    site_scores : function
+        Scores the columns of an alignment on an ArrayTree.
+    args : tuple, optional
+        Further arguments of site_scores.
+    workers : int, optional
+        Number of worker processes which score shards of the unique columns.
+
+    Returns
+    -------
+    pattern_scores : numpy.ndarray
+        Scores of the unique columns, pattern_scores[inverse] are the scores
+        of the sites.
+    inverse : numpy.ndarray
+        Unique column of every site.
+    weights : numpy.ndarray
+        Number of sites of every unique column.
+
+    '''
+
+    patterns, inverse, weights = SitePatterns(msa)
+
+    if workers == 1:
+        pattern_scores = site_scores(array_tree, patterns, *args)
+    else:
+        pattern_scores = ShardedSiteScores(array_tree, patterns, site_scores,
+                                           args, workers=workers)
+
+    return np.asarray(pattern_scores), inverse, weights
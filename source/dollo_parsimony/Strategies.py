@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Names of the alignment strategies. The module has no dependencies, so the
+command line can offer the strategies without importing numpy.
+"""
+
+# strategies from the fastest to the one with the least memory
+PLANNED_STRATEGIES = ['full', 'compressed', 'linear']
+
+# strategies of the aligners, the banded strategy falls back to the
+# compressed or the linear strategy
+STRATEGIES = ['full', 'banded', 'compressed', 'linear']
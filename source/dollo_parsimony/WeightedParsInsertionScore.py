@@ -8,12 +8,45 @@ Created on Wed Aug 11 16:05:35 2021
 
 import numpy as np
 
+from dollo_parsimony.ArrayTree import ArrayTree
+from dollo_parsimony.InsertionPoints import InsertionPointArrays
+from dollo_parsimony.ColumnShards import ShardedSiteScores
+from dollo_parsimony.SitePatterns import CompressedSiteScores
+from dollo_parsimony.Instrumentation import RECORDERS, Record
+
+
+def CostArray(cost_matrix):
+    '''
+    Converts the cost matrix into an array indexed by the positions of the
+    characters in the cost matrix keys.
+
+    Parameters
+    ----------
+    cost_matrix : double dictionary
+        cost matrix specifying the cost of substitutions, insertions and 
+        deletions.
+
+    Returns
+    -------
+    costs : numpy.ndarray
+        costs[a][b] is cost_matrix[characters[a]][characters[b]].
+
+    '''
+    
+    characters = [key for key in cost_matrix.keys()]
+    costs = np.array([[cost_matrix[character][key] for key in characters] 
+                      for character in characters], dtype=float)
+    
+    return costs
+
 
 def WParsScoreLeaf(leaf, cost_matrix):
     
     '''
     Initializes weighted parsimony scores at the leaves with zero for the 
-    observed residue and infinity everywhere else.
+    observed residue and infinity everywhere else. The scores are stored as
+    an array with one row per site and one column per character of the cost
+    matrix.
 
     Parameters
     ----------
@@ -30,20 +63,45 @@ def WParsScoreLeaf(leaf, cost_matrix):
 
     '''
     
+    raw = np.frombuffer(''.join(leaf.sequence).encode('latin-1'), dtype=np.uint8)
+    leaf.add_features(w_parsimony_scores = LeafScores(raw, cost_matrix))
+
+
+def LeafScores(raw, cost_matrix):
+    '''
+    Weighted parsimony scores of observed characters, zero for the observed
+    character and infinity everywhere else.
+
+    Parameters
+    ----------
+    raw : numpy.ndarray
+        uint8 array of characters, of any shape.
+    cost_matrix : double dictionary
+        cost matrix specifying the cost of substitutions, insertions and 
+        deletions.
+
+    Returns
+    -------
+    w_pars_scores : numpy.ndarray
+        Scores with an extra last axis with one entry per character of the
+        cost matrix.
+
+    '''
+    
     characters = [key for key in cost_matrix.keys()]
     
-    for i in range(len(leaf.sequence)):
-        w_site_scores = {}
-        for character in characters:
-            if leaf.sequence[i] == character:
-                w_site_scores[character] = 0
-            else:
-                w_site_scores[character] = np.inf
-            
-            leaf.w_parsimony_scores[i] = w_site_scores
+    #characters outside of the cost matrix get the extra last column
+    states = np.full(256, len(characters))
+    for k, character in enumerate(characters):
+        states[ord(character)] = k
+    
+    w_pars_scores = np.full(raw.shape + (len(characters)+1,), np.inf)
+    np.put_along_axis(w_pars_scores, states[raw][..., None], 0, axis=-1)
+    
+    return w_pars_scores[..., :len(characters)]
 
 
-def WParsScoreInternal(tree, cost_matrix, i):
+def WParsScoreInternal(tree, cost_matrix, i, costs=None):
     
     '''
     Calculates the weightes parsimony score at site i for the given trees 
@@ -58,6 +116,9 @@ def WParsScoreInternal(tree, cost_matrix, i):
         deletions.
     i : int.
         Index for the associated sequence of the node.
+    costs : numpy.ndarray, optional
+        Cost array of the cost matrix from CostArray, so that it is not
+        built again for every site.
 
     Returns
     -------
@@ -65,34 +126,153 @@ def WParsScoreInternal(tree, cost_matrix, i):
 
     '''
     
-    characters = [key for key in cost_matrix.keys()]
-    left_scores = tree.children[0].w_parsimony_scores[i]
-    
-    right_scores = tree.children[1].w_parsimony_scores[i]
-    
-    w_site_scores = {}
-    
-    for character in characters:
-        min_score_left = np.inf
-        min_score_right = np.inf
-        for key in characters:
-            if left_scores[key] + cost_matrix[character][key] < min_score_left:
-                min_score_left = left_scores[key] + cost_matrix[character][key]
-                
-            if right_scores[key] + cost_matrix[character][key] < min_score_right:
-                min_score_right = right_scores[key] + cost_matrix[character][key]
-            
-        w_site_scores[character] = min_score_left + min_score_right
-    
-    tree.w_parsimony_scores[i] = w_site_scores
-    print(tree.w_parsimony_scores[i])
+    if costs is None:
+        costs = CostArray(cost_matrix)
+    
+    MinPlusScores(tree.children[0].w_parsimony_scores[i:i+1],
+                  tree.children[1].w_parsimony_scores[i:i+1], costs,
+                  out=tree.w_parsimony_scores[i:i+1])
+    
+    if RECORDERS:
+        Record('WeightedInternalScores', node = tree, site = i, 
+               w_parsimony_scores = tree.w_parsimony_scores[i])
+
+
+def MinPlusScores(left_scores, right_scores, costs, out=None):
+    '''
+    Weighted parsimony scores of a node at all sites from the scores of its
+    children.
+
+    Parameters
+    ----------
+    left_scores : numpy.ndarray
+        Scores of the left child, one row per site.
+    right_scores : numpy.ndarray
+        Scores of the right child, one row per site.
+    costs : numpy.ndarray
+        Cost array from CostArray.
+    out : numpy.ndarray, optional
+        Array for the scores of the node.
+
+    Returns
+    -------
+    w_pars_scores : numpy.ndarray
+        Scores of the node, one row per site.
+
+    '''
+    
+    if out is None:
+        out = np.empty(left_scores.shape)
+    
+    #min-plus product with the cost matrix, one character at a time 
+    for k in range(len(costs)):
+        out[:, k] = ((left_scores + costs[k]).min(axis=1) + 
+                     (right_scores + costs[k]).min(axis=1))
+    
+    return out
         
         
-def WeightedParsWithInsertionScore(tree, cost_matrix):
+def WeightedArrays(array_tree, msa, cost_matrix):
     '''
-    Calculates the weighted parsimony score for the whole tree while accounting 
+    Calculates the weighted parsimony scores of every node at every site 
+    while accounting for insertions and deletions.
+
+    Parameters
+    ----------
+    array_tree : ArrayTree
+        Input tree.
+    msa : numpy.ndarray
+        Alignment as a matrix of characters with one row per leaf.
+    cost_matrix : double dictionary
+        cost matrix specifying the cost of substitutions, insertions and 
+        deletions.
+
+    Returns
+    -------
+    arrays : dict
+        w_parsimony_scores, insertion_flags, has_residue and 
+        insertion_points with one row per node.
+    site_scores : numpy.ndarray
+        Weighted parsimony score of every site.
+
+    '''
+    
+    costs = CostArray(cost_matrix)
+    children = array_tree.children
+    leaves = array_tree.leaves
+    w_pars_scores = np.empty((len(array_tree), msa.shape[1], len(costs)))
+    
+    #scores for leaves
+    w_pars_scores[leaves] = LeafScores(msa, cost_matrix)
+    if RECORDERS:
+        for k in leaves:
+            Record('WeightedLeafScores', node = array_tree.nodes[k], 
+                   w_parsimony_scores = w_pars_scores[k])
+    
+    #internal scores for all sites in one traversal
+    for k in array_tree.internal_postorder:
+        left, right = children[k]
+        MinPlusScores(w_pars_scores[left], w_pars_scores[right], costs,
+                      out=w_pars_scores[k])
+    
+    #find most parsimonious insertion points and collect their scores, 
+    #the root is used for sites without residues
+    has_residue, ins_points = InsertionPointArrays(array_tree, 
+                                                   msa != ord('-'))
+    
+    #sites without residues have no insertion point and get the root
+    sites = np.arange(msa.shape[1])
+    ins_nodes = ins_points.argmax(axis=0)
+    ancestor_scores = w_pars_scores[ins_nodes, sites]
+    
+    #set weighted parsimony scores for nodes without residues and 
+    #mark them as insertions, the subtree of the insertion point is the 
+    #interval of the preorder from the insertion point to its subtree_end
+    nodes = np.arange(len(array_tree))[:, None]
+    ins_flags = ((nodes < ins_nodes) | 
+                 (nodes >= array_tree.subtree_end[ins_nodes]))
+    np.copyto(w_pars_scores, ancestor_scores, where=ins_flags[..., None])
+    
+    arrays = dict(w_parsimony_scores = w_pars_scores, 
+                  insertion_flags = ins_flags, has_residue = has_residue,
+                  insertion_points = ins_points)
+    
+    #minimal scores of the insertion points
+    return arrays, ancestor_scores.min(axis=1)
+
+
+def WeightedSiteScores(array_tree, msa, cost_matrix):
+    '''
+    Calculates the weighted parsimony score of every site while accounting 
     for insertions and deletions.
 
+    Parameters
+    ----------
+    array_tree : ArrayTree
+        Input tree.
+    msa : numpy.ndarray
+        Alignment as a matrix of characters with one row per leaf.
+    cost_matrix : double dictionary
+        cost matrix specifying the cost of substitutions, insertions and 
+        deletions.
+
+    Returns
+    -------
+    site_scores : numpy.ndarray
+        Weighted parsimony score of every site.
+
+    '''
+    
+    return WeightedArrays(array_tree, msa, cost_matrix)[1]
+
+
+def WeightedParsWithInsertionScore(tree, cost_matrix, workers=1, 
+                                   compress=False):
+    '''
+    Calculates the weighted parsimony score for the whole tree while accounting 
+    for insertions and deletions. Adds the weighted parsimony scores and the
+    insertion flags to every node.
+
     Parameters
     ----------
     tree : PhyloNode
@@ -100,6 +280,13 @@ def WeightedParsWithInsertionScore(tree, cost_matrix):
     cost_matrix : double dictionary
         cost matrix specifying the cost of substitutions, insertions and 
         deletions.
+    workers : int, optional
+        Number of worker processes which score shards of columns, None for 
+        one per core. With more than one worker the features are not added
+        to the tree.
+    compress : bool, optional
+        Only score the unique columns of the alignment. The features are not
+        added to the tree.
 
     Returns
     -------
@@ -108,57 +295,24 @@ def WeightedParsWithInsertionScore(tree, cost_matrix):
 
     '''
     
-    tree_score = 0
-    length_MSA = len(tree.get_leaves()[0].sequence)
+    array_tree = ArrayTree(tree)
+    msa = array_tree.LeafMatrix()
     
-    #initilaize scores for every node, insertion flags are set to zero
-    for node in tree.traverse('postorder'):
-        w_pars_scores = [{}]*length_MSA
-        ins_flags = [False]*length_MSA
-        
-        node.add_features(w_parsimony_scores = w_pars_scores)
-        node.add_features(insertion_flags = ins_flags)
-        
-    #scores for leaves
-    for leaf in tree.iter_leaves():
-        WParsScoreLeaf(leaf, cost_matrix)
-        print(leaf.w_parsimony_scores)
-        
-        
-    #find most parsimonious insertion points
-    for i in range(length_MSA):
-        leaf_res = []
-        for leaf in tree.iter_leaves():
-            if leaf.sequence[i] != '-':
-                leaf_res.append(leaf)
-                
-        if len(leaf_res) == 1:
-            ancestor = leaf_res[0]
-        else:
-            ancestor = tree.get_common_ancestor(leaf_res)
-            
-        #calculate internal weightes parsimony scores for nodes with residues   
-        for node in ancestor.traverse('postorder'):
-            if not node.is_leaf():
-                WParsScoreInternal(node, cost_matrix, i)
-             
-        #set weighted parsimony scores for nodes without residues and 
-        #mark them as insertions
-        for node in tree.traverse('postorder'):
-            if node not in ancestor.get_descendants() and (node != ancestor):
-                node.w_parsimony_scores[i] = ancestor.w_parsimony_scores[i]
-                node.insertion_flags[i] = True
-                print(i, node)
-        
-        
-        min_key = min(tree.w_parsimony_scores[i].keys(), 
-                      key=(lambda k: tree.w_parsimony_scores[i][k]))
-        tree_score += tree.w_parsimony_scores[i][min_key]
-            
+    if compress:
+        #scores and numbers of sites of the unique columns
+        pattern_scores, weights = CompressedSiteScores(
+            array_tree, msa, WeightedSiteScores, (cost_matrix,), 
+            workers=workers)[::2]
+        return float(pattern_scores @ weights)
+    
+    if workers == 1:
+        arrays, site_scores = WeightedArrays(array_tree, msa, cost_matrix)
+        array_tree.AddFeatures(**arrays)
+    else:
+        site_scores = ShardedSiteScores(array_tree, msa, WeightedSiteScores, 
+                                        (cost_matrix,), workers=workers)
+    
+    #sum the minimal scores of the insertion points over the whole sequence
+    tree_score = sum(site_scores.tolist())
         
     return tree_score
-        
-        
-
-
-
@@ -0,0 +1,8 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+
+from dollo_parsimony.CommandLine import Main
+
+sys.exit(Main())
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import pytest
+import numpy as np
+
+from ete3 import PhyloNode
+
+from dollo_parsimony.AlignmentKernels import UnitCostScheme, WeightedScheme
+from dollo_parsimony.AlignmentKernels import WavefrontMatrices, TraceBackMoves
+from dollo_parsimony.AlignmentKernels import CompileCostMatrix, ScoreDtype, Boundaries
+from dollo_parsimony.AlignmentKernels import PackMoves, UnpackMoves, MoveAt, WideScore
+from dollo_parsimony.ParsimonySets import EncodeSets, DecodeSet
+from dollo_parsimony.WeightedParsAlign import cost_matrix
+from dollo_parsimony import ParsAlign, ParsAlignFreeGapExtension
+from dollo_parsimony import WeightedParsAlign, WeightedParsAlignFreeGapExtension
+
+
+def CellByCell(left_sets, right_sets, free_gap_extension):
+    # cell by cell fill of the unit cost matrices
+    n, m = len(left_sets), len(right_sets)
+    S = np.zeros((n+1, m+1), dtype=int)
+    T = np.zeros((n+1, m+1), dtype=int)
+    for i in range(1, n+1):
+        S[i][0] = 1 if free_gap_extension else i
+        T[i][0] = 3
+    for j in range(1, m+1):
+        S[0][j] = 1 if free_gap_extension else j
+        T[0][j] = 2
+    for i in range(1, n+1):
+        for j in range(1, m+1):
+            score_intersection = S[i-1][j-1] + (not left_sets[i-1] & right_sets[j-1])
+            free_left = free_gap_extension and T[i][j-1] == 2
+            free_right = free_gap_extension and T[i-1][j] == 3
+            score_gap_left = S[i][j-1] + (0 if free_left else 1)
+            score_gap_right = S[i-1][j] + (0 if free_right else 1)
+            S[i][j] = min(score_intersection, score_gap_left, score_gap_right)
+            order = [(score_intersection, 1)]
+            if free_gap_extension:
+                order += [(score_gap_right, 3), (score_gap_left, 2)]
+            else:
+                order += [(score_gap_left, 2), (score_gap_right, 3)]
+            T[i][j] = [move for score, move in order if score == S[i][j]][0]
+    return S, T
+
+@pytest.mark.parametrize("free_gap_extension", [False, True])
+
+def test_wavefront_unit_cost(free_gap_extension):
+    rng = np.random.default_rng(1)
+    for n, m in [(0, 3), (4, 0), (1, 1), (7, 3), (5, 12), (20, 20)]:
+        left_sets = rng.integers(1, 16, size=n).astype(np.uint8)
+        right_sets = rng.integers(1, 16, size=m).astype(np.uint8)
+        S, T = WavefrontMatrices(left_sets, right_sets, UnitCostScheme(free_gap_extension))
+        expected_S, expected_T = CellByCell(left_sets, right_sets, free_gap_extension)
+        assert (S == expected_S).all(), "wrong score matrix"
+        assert (UnpackMoves(T, n, m) == expected_T).all(), "wrong trace back matrix"
+        assert S.dtype == np.int8 and T.nbytes == (n+1) * (m//4+1), "matrices not narrow"
+
+
+def test_wavefront_weighted():
+    left_sets = EncodeSets([set('A'), set('CT')])
+    right_sets = EncodeSets([set('G')])
+    S, T = WavefrontMatrices(left_sets, right_sets, WeightedScheme(cost_matrix))
+
+    # the weighted boundary holds the gap cost of the single set
+    assert list(S[:, 0]) == [0, 10, 10], "wrong first column"
+    # A matched with G costs 1, C or T matched with G cost 1.5
+    assert S[1][1] == 1, "wrong substitution score"
+    assert S[2][1] == 11, "wrong gap score"
+    assert list(UnpackMoves(T, 2, 1)[:, 1]) == [2, 1, 3], "wrong trace back matrix"
+
+
+def test_compiled_cost_tables():
+    tables = CompileCostMatrix(cost_matrix)
+    sets = [DecodeSet(code) for code in range(1, 32)]
+
+    for left_set in sets:
+        left_code = EncodeSets([left_set])[0]
+        gap_cost = min(cost_matrix[character]['-'] for character in left_set)
+        boundary_cost = min(cost_matrix['-'][character] for character in left_set)
+        assert tables.gap_cost[left_code] == gap_cost, "wrong gap cost"
+        assert tables.boundary_cost[left_code] == boundary_cost, "wrong boundary cost"
+
+        for right_set in sets:
+            right_code = EncodeSets([right_set])[0]
+            intersection = left_set & right_set
+            if intersection:
+                pair_cost = min(cost_matrix[a][b] for a in intersection for b in intersection)
+            else:
+                pair_cost = min(cost_matrix[a][b] for a in left_set for b in right_set)
+            assert tables.pair_cost[left_code, right_code] == pair_cost, "wrong pair cost"
+
+    assert CompileCostMatrix(dict(cost_matrix)) is tables, "cost tables not cached"
+
+
+@pytest.mark.parametrize("T,n,m,expected_moves",
+    [([[0,2],[3,1]], 1, 1, [1]),
+     ([[0,2,2],[3,1,2]], 1, 2, [1,2]),
+     ([[0,2],[3,1],[3,1]], 2, 1, [3,1]),
+     ([[0,2,2],[3,3,3]], 1, 2, [2,2,3])])
+
+def test_trace_back_moves(T, n, m, expected_moves):
+    assert list(TraceBackMoves(PackMoves(T), n, m)) == expected_moves, "wrong moves"
+
+
+def test_packed_moves():
+    rng = np.random.default_rng(2)
+    for n, m in [(0, 0), (3, 0), (0, 5), (7, 9), (4, 4)]:
+        moves = rng.integers(0, 4, size=(n+1, m+1))
+        T = PackMoves(moves)
+        assert T.dtype == np.uint8 and T.shape == (n+1, m//4 + 1), "wrong packed shape"
+        assert (UnpackMoves(T, n, m) == moves).all(), "wrong unpacked moves"
+        assert all(MoveAt(T, i, j) == moves[i, j] for i in range(n+1) for j in range(m+1)), \
+            "wrong move of a cell"
+
+
+@pytest.mark.parametrize("length,dtype", [(10, np.int8), (100, np.int16), (40000, np.int32)])
+
+def test_score_dtype(length, dtype):
+    scheme = UnitCostScheme()
+    left_sets = np.ones(length, dtype=np.uint8)
+    right_sets = np.full(length, 2, dtype=np.uint8)
+    top, left = Boundaries(left_sets, right_sets, scheme)
+    gaps = scheme.gap_cost(left_sets)
+    assert ScoreDtype(scheme, top, left, gaps, gaps) == dtype, "wrong score type"
+    assert ScoreDtype(WeightedScheme(cost_matrix), top, left, gaps, gaps) == float, \
+        "weighted scores narrowed"
+
+    with pytest.raises(OverflowError):
+        ScoreDtype(scheme, (np.array([np.iinfo(np.int64).max]), None), left, gaps, gaps)
+
+
+def test_wide_score():
+    S = WavefrontMatrices(np.ones(100, dtype=np.uint8), np.full(100, 2, dtype=np.uint8),
+                          UnitCostScheme())[0]
+    score = WideScore(S[100][100])
+    assert S.dtype == np.int16 and score.dtype == np.int64, "score not widened"
+    assert sum([score] * 1000) == 100 * 1000, "sum of scores overflows"
+
+
+@pytest.mark.parametrize("generate_matrices,args",
+    [(ParsAlign.GenerateMatrices, ()),
+     (ParsAlignFreeGapExtension.GenerateMatricesFreeGapE, ()),
+     (WeightedParsAlign.GenerateMatrices, (cost_matrix,)),
+     (WeightedParsAlignFreeGapExtension.GenerateMatricesFreeGapE, (cost_matrix,))])
+
+def test_generate_matrices_wide_score(generate_matrices, args):
+    node = PhyloNode(newick='(A:1,B:1):1;')
+    node.children[0].parsimony_sets = np.ones(200, dtype=np.uint8)
+    node.children[1].parsimony_sets = np.full(200, 2, dtype=np.uint8)
+    parsimony_score = generate_matrices(node, *args)[0]
+
+    assert parsimony_score > 127, "wrong score"
+    assert parsimony_score.dtype in (np.int64, np.float64), "score not widened"
+    #the sum of the node scores as in the progressive loop of the baseline
+    total = 0
+    for k in range(4):
+        total = total + parsimony_score
+    assert total == 4 * parsimony_score.item(), "sum of scores overflows"
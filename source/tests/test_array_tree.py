@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import pickle
+import pytest
+
+from ete3 import PhyloTree
+
+from dollo_parsimony.ArrayTree import ArrayTree
+from dollo_parsimony.ParsInsertionsScore import ParsInsertionsScore
+
+@pytest.mark.parametrize("newick",
+    ['test_data/test_tree', 'test_data/test_tree1', 'test_data/test_tree2',
+     'test_data/test_MSA_tree'])
+
+def test_array_tree(newick):
+    tree = PhyloTree(newick=newick)
+    array_tree = ArrayTree(tree)
+    nodes = array_tree.nodes
+
+    assert nodes == list(tree.traverse('preorder')), "nodes not in preorder"
+    assert [nodes[k] for k in array_tree.postorder] == list(tree.traverse('postorder')), \
+        "wrong postorder"
+    assert [nodes[k] for k in array_tree.leaves] == tree.get_leaves(), "wrong leaves"
+    for k, node in enumerate(nodes):
+        expected = [nodes.index(child) for child in node.children] or [-1, -1]
+        assert list(array_tree.children[k]) == expected, "wrong children"
+        if not node.is_root():
+            assert nodes[array_tree.parent[k]] is node.up, "wrong parent"
+        subtree = list(node.traverse('preorder'))
+        assert nodes[k:array_tree.subtree_end[k]] == subtree, "wrong subtree interval"
+
+
+def test_pickled_without_nodes():
+    array_tree = ArrayTree(PhyloTree(newick='test_data/test_tree'))
+    copy = pickle.loads(pickle.dumps(array_tree))
+
+    assert copy.nodes is None, "ete3 nodes pickled"
+    assert array_tree.nodes is not None, "nodes removed from the original"
+    assert (copy.postorder == array_tree.postorder).all(), "wrong postorder after pickling"
+
+
+def test_features_are_rows():
+    tree = PhyloTree(newick='test_data/test_tree', alignment='test_data/test_sequence.txt')
+    ParsInsertionsScore(tree)
+    nodes = list(tree.traverse('preorder'))
+
+    # the features of all nodes share one array
+    assert nodes[0].parsimony_scores.base is nodes[-1].parsimony_scores.base, \
+        "features not backed by one array"
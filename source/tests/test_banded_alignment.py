@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import pytest
+import numpy as np
+
+from dollo_parsimony.AlignmentKernels import UnitCostScheme, WeightedScheme
+from dollo_parsimony.AlignmentKernels import WavefrontMatrices, TraceBackMoves
+from dollo_parsimony.BandedAlignment import BandedMoves
+from dollo_parsimony.Instrumentation import Recorder
+from dollo_parsimony.ParsAlign import ParsAlign
+from dollo_parsimony.ParsAlignFreeGapExtension import ParsAlignFreeGapE
+from dollo_parsimony.WeightedParsAlign import WeightedParsAlign, cost_matrix
+from dollo_parsimony.WeightedParsAlignFreeGapExtension import WeightedParsAlignFreeGapE
+from dollo_parsimony.Simulation import SimulateFamily
+
+
+@pytest.mark.parametrize("scheme,message",
+    [(UnitCostScheme(), "unit cost"),
+     (UnitCostScheme(free_gap_extension=True), "free gap extension"),
+     (WeightedScheme(cost_matrix), "weighted"),
+     (WeightedScheme(cost_matrix, free_gap_extension=True), "weighted free gap extension")])
+
+def test_same_path_as_full_matrices(scheme, message):
+    rng = np.random.default_rng(5)
+    for k in range(80):
+        n, m = rng.integers(0, 30, size=2)
+        left_sets = rng.integers(1, 32, size=n).astype(np.uint8)
+        right_sets = rng.integers(1, 32, size=m).astype(np.uint8)
+
+        S, T = WavefrontMatrices(left_sets, right_sets, scheme)
+        # narrow first bands are widened several times
+        score, moves, band = BandedMoves(left_sets, right_sets, scheme, width=1)
+
+        assert score == S[n][m], "wrong score for " + message
+        assert np.array_equal(moves, TraceBackMoves(T, n, m)), "wrong path for " + message
+
+
+@pytest.mark.parametrize("scheme", [UnitCostScheme(), WeightedScheme(cost_matrix)])
+
+def test_band_of_similar_sequences(scheme):
+    rng = np.random.default_rng(7)
+    left_sets = (1 << rng.integers(0, 4, size=300)).astype(np.uint8)
+    right_sets = np.delete(left_sets, [40, 41, 200])
+    right_sets[[10, 100, 250]] = 5
+
+    S, T = WavefrontMatrices(left_sets, right_sets, scheme)
+    score, moves, band = BandedMoves(left_sets, right_sets, scheme, width=4)
+
+    assert band is not None, "no exact band for similar sequences"
+    assert band[1] - band[0] < 40, "band too wide for similar sequences"
+    assert score == S[300][297], "wrong score in the band"
+    assert np.array_equal(moves, TraceBackMoves(T, 300, 297)), "wrong path in the band"
+
+    # a band larger than max_cells is solved without a band
+    fallback = BandedMoves(left_sets, right_sets, scheme, max_cells=1000)
+    assert fallback[2] is None, "band larger than max_cells"
+    assert fallback[0] == score and np.array_equal(fallback[1], moves), "wrong fallback"
+
+
+def test_band_of_width_zero():
+    rng = np.random.default_rng(11)
+    left_sets = (1 << rng.integers(0, 4, size=20)).astype(np.uint8)
+    right_sets = np.concatenate((left_sets[10:], left_sets[:10]))
+
+    S, T = WavefrontMatrices(left_sets, right_sets, UnitCostScheme())
+    score, moves, band = BandedMoves(left_sets, right_sets, UnitCostScheme(), width=0)
+
+    assert score == S[20][20], "wrong score from a band of width 0"
+    assert np.array_equal(moves, TraceBackMoves(T, 20, 20)), "wrong path from a band of width 0"
+
+
+@pytest.mark.parametrize("align",
+    [ParsAlign, ParsAlignFreeGapE, WeightedParsAlign, WeightedParsAlignFreeGapE])
+@pytest.mark.parametrize("workers,memory_budget", [(1, None), (2, None), (1, 20000)])
+
+def test_banded_strategy(align, workers, memory_budget):
+    expected = align(SimulateFamily(6, 60, seed=3))
+    tree = SimulateFamily(6, 60, seed=3)
+
+    with Recorder() as recorder:
+        parsimony_score, alignment = align(tree, strategy='banded', workers=workers,
+                                           memory_budget=memory_budget)
+    plans = [data for event, data in recorder.events if event == 'PlanNode']
+
+    assert parsimony_score == expected[0], "wrong score with the banded strategy"
+    assert np.array_equal(alignment, expected[1]), "wrong alignment with the banded strategy"
+    assert all(data['strategy'] == 'banded' for data in plans), "wrong strategy"
+    if workers == 1:
+        bands = [data['band'] for event, data in recorder.events if event == 'BandedAlign']
+        assert len(bands) == len(tree) - 1, "wrong number of banded nodes"
+
+
+@pytest.mark.parametrize("align",
+    [ParsAlign, ParsAlignFreeGapE, WeightedParsAlign, WeightedParsAlignFreeGapE])
+
+def test_strategy_is_second_argument(align):
+    expected = align(SimulateFamily(4, 30, seed=1))
+    parsimony_score, alignment = align(SimulateFamily(4, 30, seed=1), 'banded')
+
+    assert alignment is not None, "strategy taken as score_only"
+    assert parsimony_score == expected[0], "wrong score with a positional strategy"
+    assert np.array_equal(alignment, expected[1]), "wrong alignment with a positional strategy"
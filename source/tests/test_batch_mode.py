@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import io
+import json
+
+import pytest
+
+from ete3 import PhyloTree
+
+from dollo_parsimony.BatchMode import FindPairs, ReadManifest, RunBatch
+from dollo_parsimony.ParsInsertionsScore import ParsInsertionsScore
+from dollo_parsimony.ParsAlign import ParsAlign
+from dollo_parsimony.ParsimonySets import AlignmentStrings
+
+pairs = [('test_data/test_MSA_tree', 'test_data/test_MSA_sequence'),
+         ('test_data/test_tree2', 'test_data/test_sequence2'),
+         ('test_data/test_MSA_tree', 'test_data/test_MSA_sequence3')]
+
+
+def test_find_pairs():
+    found = FindPairs('test_data')
+    assert ('test_data/test_MSA_tree1', 'test_data/test_MSA_sequence1') in found, "missing pair"
+    assert all('tree' in tree and 'sequence' in sequences for tree, sequences in found), "wrong pair"
+
+
+def test_read_manifest(tmp_path):
+    manifest = tmp_path / 'manifest'
+    manifest.write_text('# families\n\nt1 s1\nsub/t2\ts2\n')
+    assert ReadManifest(str(manifest)) == [(str(tmp_path / 't1'), str(tmp_path / 's1')),
+                                           (str(tmp_path / 'sub/t2'), str(tmp_path / 's2'))], "wrong pairs"
+
+    manifest.write_text('t1 s1 x\n')
+    with pytest.raises(ValueError):
+        ReadManifest(str(manifest))
+
+
+@pytest.mark.parametrize("workers,chunksize", [(1, None), (2, None), (2, 1)])
+
+def test_batch_scores(workers, chunksize):
+    output = io.StringIO()
+    failed = RunBatch(pairs[:2], 'insertions', {'compress': False}, output, workers, chunksize)
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+
+    assert failed == 0, "wrong number of failed families"
+    scores = {(result['tree'], result['sequences']): result['score'] for result in results}
+    for tree, sequences in pairs[:2]:
+        expected = ParsInsertionsScore(PhyloTree(newick=tree, alignment=sequences))
+        assert scores[tree, sequences] == expected, "wrong score"
+
+
+def test_batch_alignments():
+    output = io.StringIO()
+    options = {'score_only': False, 'strategy': 'full'}
+    failed = RunBatch(pairs + [('test_data/test_tree1', 'test_data/test_sequence1')],
+                      'align', options, output, 2)
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+
+    assert failed == 1, "wrong number of failed families"
+    assert len(results) == len(pairs) + 1, "wrong number of results"
+    for result in results:
+        if 'error' in result:
+            assert result['tree'] == 'test_data/test_tree1', "wrong failed family"
+            continue
+        tree = PhyloTree(newick=result['tree'], alignment=result['sequences'])
+        score, alignment = ParsAlign(tree)
+        assert result['score'] == score, "wrong score"
+        names = [leaf.name for leaf in tree.iter_leaves()]
+        assert result['alignment'] == dict(zip(names, AlignmentStrings(alignment))), "wrong alignment"
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+
+def test_batch_malformed_tree(tmp_path, workers):
+    tree = tmp_path / 'bad_tree'
+    tree.write_text('((A,B),(C,D);')
+    sequences = tmp_path / 'bad_sequence'
+    sequences.write_text('>A\nAT\n>B\nA\n>C\nT\n>D\nAT\n')
+
+    output = io.StringIO()
+    failed = RunBatch([(str(tree), str(sequences))] + pairs[:1], 'insertions',
+                      {'compress': False}, output, workers)
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+
+    assert failed == 1, "wrong number of failed families"
+    assert len(results) == 2, "wrong number of results"
+    errors = [result for result in results if 'error' in result]
+    assert errors[0]['tree'] == str(tree), "wrong failed family"
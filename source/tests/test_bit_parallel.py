@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+from dollo_parsimony.BitParallel import MatchVectors, BitParallelScore
+from dollo_parsimony.AlignmentKernels import UnitCostScheme, WavefrontMatrices
+from dollo_parsimony.LinearSpace import ForwardScore
+from dollo_parsimony.ParsimonySets import NUMBER_OF_CODES
+
+
+def test_match_vectors():
+    sets = np.array([1, 2, 4, 8, 16, 3, 12, 31], dtype=np.uint8)
+    vectors = MatchVectors(sets)
+
+    for code in range(NUMBER_OF_CODES):
+        expected = sum(1 << i for i in range(len(sets)) if sets[i] & code)
+        assert vectors[code] == expected, "wrong match vector"
+
+
+@pytest.mark.parametrize("n,m,seed", [(0, 0, 0), (0, 5, 1), (7, 0, 2), (1, 1, 3),
+                                      (63, 64, 4), (64, 65, 5), (130, 40, 6), (200, 300, 7)])
+
+def test_bit_parallel_score(n, m, seed):
+    rng = np.random.default_rng(seed)
+    left_sets = rng.integers(1, NUMBER_OF_CODES, n).astype(np.uint8)
+    right_sets = (1 << rng.integers(0, 5, m)).astype(np.uint8)
+    S = WavefrontMatrices(left_sets, right_sets, UnitCostScheme())[0]
+
+    assert BitParallelScore(left_sets, right_sets) == S[n][m], "wrong score"
+    assert BitParallelScore(right_sets, left_sets) == S[n][m], "wrong score of the swapped alignments"
+
+
+def test_forward_score():
+    rng = np.random.default_rng(8)
+    left_sets = (1 << rng.integers(0, 4, 90)).astype(np.uint8)
+    right_sets = (1 << rng.integers(0, 4, 70)).astype(np.uint8)
+
+    for free_gap_extension in [False, True]:
+        scheme = UnitCostScheme(free_gap_extension)
+        S = WavefrontMatrices(left_sets, right_sets, scheme)[0]
+        assert scheme.edit_distance != free_gap_extension, "wrong edit distance flag"
+        assert ForwardScore(left_sets, right_sets, scheme) == S[-1][-1], "wrong score"
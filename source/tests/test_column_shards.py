@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import pytest
+import numpy as np
+
+from ete3 import PhyloTree
+
+from dollo_parsimony.ArrayTree import ArrayTree
+from dollo_parsimony.ColumnShards import ShardedSiteScores
+from dollo_parsimony.ParsInsertionsScore import ParsInsertionsScore
+from dollo_parsimony.ParsInsertionsScore import ParsInsertionsSiteScores
+from dollo_parsimony.WeightedParsInsertionScore import WeightedParsWithInsertionScore
+from dollo_parsimony.WeightedParsAlign import cost_matrix
+
+@pytest.mark.parametrize("newick,alignment",
+    [('test_data/test_tree','test_data/test_sequence.txt'),
+     ('test_data/test_tree1','test_data/test_sequence2'),
+     ('test_data/test_tree2','test_data/test_sequence4')])
+
+def test_sharded_scores(newick, alignment):
+    serial = ParsInsertionsScore(PhyloTree(newick=newick, alignment=alignment))
+    sharded = ParsInsertionsScore(PhyloTree(newick=newick, alignment=alignment), workers=2)
+    assert sharded == serial, "wrong sharded parsimony score"
+
+    serial = WeightedParsWithInsertionScore(PhyloTree(newick=newick, alignment=alignment), 
+                                            cost_matrix)
+    sharded = WeightedParsWithInsertionScore(PhyloTree(newick=newick, alignment=alignment), 
+                                             cost_matrix, workers=2)
+    assert sharded == serial, "wrong sharded weighted parsimony score"
+
+
+def test_sharded_site_scores():
+    array_tree = ArrayTree(PhyloTree(newick='test_data/test_tree2', 
+                                     alignment='test_data/test_sequence4'))
+    msa = array_tree.LeafMatrix()
+    # more shards than columns
+    site_scores = ShardedSiteScores(array_tree, msa, ParsInsertionsSiteScores, 
+                                    workers=2, shards=1000)
+    assert (site_scores == ParsInsertionsSiteScores(array_tree, msa)).all(), \
+        "wrong site scores"
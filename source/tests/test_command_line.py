@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from ete3 import PhyloTree
+
+from dollo_parsimony.CommandLine import Main
+from dollo_parsimony.Newick import ReadNewick, NewickError
+from dollo_parsimony.ParsInsertionsScore import ParsInsertionsScore
+from dollo_parsimony.WeightedParsInsertionScore import WeightedParsWithInsertionScore
+from dollo_parsimony.ParsAlign import ParsAlign
+from dollo_parsimony.ParsimonySets import AlignmentStrings
+from dollo_parsimony.WeightedParsAlignFreeGapExtension import WeightedParsAlignFreeGapE
+from dollo_parsimony.WeightedParsAlign import cost_matrix
+
+@pytest.mark.parametrize("newick",
+    ['(((A:1,B:1):1,C:1):1,D:3);', '((A:1,B:1),(C:1,D:3));',
+     "(A,('B c':0.5,C)x:2[&&NHX:S=human])root;", 'A;'])
+
+def test_read_newick(newick):
+    tree = ReadNewick(newick)
+    expected = PhyloTree(newick, format=1, quoted_node_names=True)
+
+    for strategy in ['preorder', 'postorder']:
+        nodes = [(node.name, node.dist) for node in tree.traverse(strategy)]
+        expected_nodes = [(node.name, node.dist) for node in expected.traverse(strategy)]
+        assert nodes == expected_nodes, "wrong " + strategy + " traversal"
+
+
+@pytest.mark.parametrize("newick", ['((A,B);', '(A,B))', '(A,B)', '(A:x,B);'])
+
+def test_newick_errors(newick):
+    with pytest.raises(NewickError):
+        ReadNewick(newick)
+
+
+@pytest.mark.parametrize("command,expected",
+    [('insertions', lambda tree: ParsInsertionsScore(tree)),
+     ('weighted-insertions', lambda tree: WeightedParsWithInsertionScore(tree, cost_matrix)),
+     ('align', lambda tree: ParsAlign(tree)[0]),
+     ('weighted-align-free-gap-extension', lambda tree: WeightedParsAlignFreeGapE(tree)[0])])
+
+def test_command_score(command, expected, capsys):
+    newick, alignment = 'test_data/test_tree', 'test_data/test_sequence.txt'
+    score = expected(PhyloTree(newick=newick, alignment=alignment))
+    capsys.readouterr()
+
+    assert Main([command, newick, alignment]) == 0, "wrong exit status"
+    output = capsys.readouterr().out.split('\n')
+    assert output[0] == str(score), "wrong score"
+
+
+def test_command_alignment(capsys):
+    newick, alignment = 'test_data/test_MSA_tree', 'test_data/test_MSA_sequence3'
+    tree = PhyloTree(newick=newick, alignment=alignment)
+    score, expected = ParsAlign(tree)
+
+    Main(['align', newick, alignment, '--strategy', 'linear'])
+    output = capsys.readouterr().out.split()
+    rows = output[2::2]
+    assert output[0] == str(score), "wrong score"
+    assert output[1::2] == ['>' + leaf.name for leaf in tree.iter_leaves()], "wrong names"
+    assert rows == AlignmentStrings(expected), "wrong alignment"
+
+
+def test_command_memory_budget(capsys):
+    newick, alignment = 'test_data/test_MSA_tree', 'test_data/test_MSA_sequence3'
+    score, expected = ParsAlign(PhyloTree(newick=newick, alignment=alignment))
+
+    Main(['align', newick, alignment, '--memory-budget', '1M'])
+    captured = capsys.readouterr()
+    assert captured.out.split()[0] == str(score), "wrong score"
+    assert captured.err.split() == ['plan', 'full=3', 'banded=0', 'compressed=0', 'linear=0', 'bytes=168'], \
+        "wrong plan"
+
+    with pytest.raises(SystemExit):
+        Main(['align', newick, alignment, '--memory-budget', '100'])
+
+
+def test_command_errors(tmp_path):
+    sequences = tmp_path / 'sequences'
+    sequences.write_text('>A\nAT\n>B\nA\n')
+    newick = tmp_path / 'tree'
+    newick.write_text('(A,B,C);')
+
+    with pytest.raises(SystemExit):
+        Main(['insertions', str(newick), str(sequences)])
+
+    newick.write_text('(A,B);')
+    with pytest.raises(SystemExit):
+        Main(['insertions', str(newick), str(sequences)])
+
+
+def test_command_malformed_tree(tmp_path, capsys):
+    sequences = tmp_path / 'sequences'
+    sequences.write_text('>A\nAT\n>B\nA\n>C\nT\n>D\nAT\n')
+    newick = tmp_path / 'tree'
+    newick.write_text('((A,B),(C,D);')
+
+    with pytest.raises(SystemExit):
+        Main(['insertions', str(newick), str(sequences)])
+    assert 'Parentheses do not match' in capsys.readouterr().err, "wrong error"
+
+
+def test_lazy_imports():
+    code = ('import sys; from dollo_parsimony.CommandLine import Main; '
+            'print("numpy" in sys.modules); '
+            'Main(["insertions", "test_data/test_tree", "test_data/test_sequence.txt"]); '
+            'print("ete3" in sys.modules)')
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    output = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True,
+                            text=True, check=True).stdout.split()
+
+    assert output[0] == 'False', "numpy imported before a command runs"
+    assert output[2] == 'False', "ete3 imported for a Newick tree"
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+from ete3 import PhyloTree
+
+from dollo_parsimony.ProgressiveAlignment import EditScript, ScriptMoves
+from dollo_parsimony.ParsAlign import ParsAlign
+from dollo_parsimony.ParsAlignFreeGapExtension import ParsAlignFreeGapE
+from dollo_parsimony.WeightedParsAlign import WeightedParsAlign
+from dollo_parsimony.WeightedParsAlignFreeGapExtension import WeightedParsAlignFreeGapE
+
+
+@pytest.mark.parametrize("moves", [[], [1], [2, 2, 2], [1, 2, 2, 3, 1, 1, 3, 3, 3, 2]])
+
+def test_edit_script(moves):
+    codes, runs = EditScript(np.array(moves, dtype=np.uint8))
+
+    assert runs.sum() == len(moves), "wrong length of the runs"
+    assert (codes[1:] != codes[:-1]).all(), "adjacent runs with the same move"
+    assert np.array_equal(ScriptMoves((codes, runs)), moves), "wrong moves from the script"
+
+
+@pytest.mark.parametrize("align,kwargs",
+    [(ParsAlign, {}), (ParsAlign, {'strategy': 'linear'}),
+     (ParsAlignFreeGapE, {}), (ParsAlignFreeGapE, {'strategy': 'linear'}),
+     (WeightedParsAlign, {}), (WeightedParsAlignFreeGapE, {})])
+@pytest.mark.parametrize("newick,alignment",
+    [('test_data/test_MSA_tree','test_data/test_MSA_sequence3'),
+     ('test_data/test_tree','test_data/test_sequence.txt'),
+     ('test_data/test_tree2','test_data/test_sequence3')])
+
+def test_compose_alignment(align, kwargs, newick, alignment):
+    kept = align(PhyloTree(newick=newick, alignment=alignment),
+                 keep_alignments=True, **kwargs)
+    tree = PhyloTree(newick=newick, alignment=alignment)
+    parsimony_score, composed = align(tree, **kwargs)
+
+    assert parsimony_score == kept[0], "wrong score with edit scripts"
+    assert composed.dtype == np.uint8, "wrong dtype of the composed alignment"
+    assert np.array_equal(composed, kept[1]), "wrong composed alignment"
+    for node in tree.iter_descendants():
+        if not node.is_leaf():
+            assert not hasattr(node, 'alignment'), "alignment kept at an internal node"
+            assert ScriptMoves(node.edit_script).size >= len(node.children[0].parsimony_sets), \
+                "wrong edit script"
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import pytest
+import numpy as np
+
+from ete3 import PhyloTree
+
+from dollo_parsimony.IncrementalParsScore import IncrementalParsScore, RescoreAfterMove
+from dollo_parsimony.ParsInsertionsScore import ParsInsertionsScore
+
+
+def RandomTree(number_of_leaves, length, rng):
+    tree = PhyloTree()
+    tree.populate(number_of_leaves)
+    for leaf in tree.iter_leaves():
+        residues = rng.choice(list('ACGT'), size=length)
+        gaps = rng.random(length) < 0.4
+        leaf.sequence = ''.join(np.where(gaps, '-', residues))
+    return tree
+
+
+def Rescored(tree):
+    copy = tree.copy('deepcopy')
+    return ParsInsertionsScore(copy)
+
+
+def test_initial_score():
+    rng = np.random.default_rng(5)
+    for k in range(5):
+        tree = RandomTree(12, 30, rng)
+        assert IncrementalParsScore(tree) == Rescored(tree), "wrong initial score"
+
+
+def test_nni():
+    rng = np.random.default_rng(6)
+    tree = RandomTree(16, 40, rng)
+    IncrementalParsScore(tree)
+
+    for k in range(20):
+        internal = [node for node in tree.traverse() 
+                    if not node.is_leaf() and not node.is_root()]
+        node = internal[rng.integers(len(internal))]
+        parent = node.up
+        sibling = node.get_sisters()[0]
+        child = node.children[rng.integers(2)]
+
+        # swap a child of the node with the sibling of the node
+        child.detach()
+        sibling.detach()
+        node.add_child(sibling)
+        parent.add_child(child)
+
+        assert RescoreAfterMove(tree, [node, parent]) == Rescored(tree), "wrong score after NNI"
+
+
+def test_spr():
+    rng = np.random.default_rng(7)
+    tree = RandomTree(16, 40, rng)
+    IncrementalParsScore(tree)
+
+    for k in range(20):
+        candidates = [node for node in tree.traverse() 
+                      if not node.is_root() and not node.up.is_root()]
+        pruned = candidates[rng.integers(len(candidates))]
+
+        # prune the subtree and remove its parent
+        parent = pruned.up
+        grandparent = parent.up
+        pruned.detach()
+        sibling = parent.children[0]
+        parent.detach()
+        sibling.detach()
+        grandparent.add_child(sibling)
+
+        # regraft on a branch outside of the pruned subtree
+        targets = [node for node in tree.traverse() if not node.is_root()]
+        target = targets[rng.integers(len(targets))]
+        above = target.up
+        target.detach()
+        regrafted = above.add_child()
+        regrafted.add_child(target)
+        regrafted.add_child(pruned)
+
+        assert RescoreAfterMove(tree, [grandparent, regrafted]) == Rescored(tree), \
+            "wrong score after SPR"
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from ete3 import PhyloTree
+
+from dollo_parsimony.ArrayTree import ArrayTree
+from dollo_parsimony.InsertionPoints import InsertionPointArrays
+
+@pytest.mark.parametrize("newick,alignment",
+    [('test_data/test_tree','test_data/test_sequence.txt'),
+     ('test_data/test_tree','test_data/test_sequence1'),
+     ('test_data/test_tree1','test_data/test_sequence2'),
+     ('test_data/test_tree2','test_data/test_sequence3'),
+     ('test_data/test_tree2','test_data/test_sequence4')])
+
+def test_common_ancestor(newick, alignment):
+    tree = PhyloTree(newick=newick, alignment=alignment)
+    array_tree = ArrayTree(tree)
+    has_residue, insertion_points = InsertionPointArrays(
+        array_tree, array_tree.LeafMatrix() != ord('-'))
+
+    for i in range(insertion_points.shape[1]):
+        leaf_res = [leaf for leaf in tree.iter_leaves() if leaf.sequence[i] != '-']
+        if len(leaf_res) == 1:
+            expected = leaf_res[0]
+        else:
+            expected = tree.get_common_ancestor(leaf_res)
+
+        assert insertion_points[:, i].sum() == 1, \
+            "not exactly one insertion point at site " + str(i)
+        assert array_tree.nodes[insertion_points[:, i].argmax()] is expected, \
+            "wrong insertion point at site " + str(i)
+
+
+def test_site_without_residues():
+    tree = PhyloTree('((A:1,B:1):1,C:1);')
+    for leaf, sequence in zip(tree.iter_leaves(), ['A-', 'C-', '--']):
+        leaf.sequence = sequence
+    array_tree = ArrayTree(tree)
+    has_residue, insertion_points = InsertionPointArrays(
+        array_tree, array_tree.LeafMatrix() != ord('-'))
+
+    assert not insertion_points[:, 1].any(), "insertion point for a site without residues"
+    assert not has_residue[:, 1].any(), "residue at a site without residues"
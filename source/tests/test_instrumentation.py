@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+from ete3 import PhyloTree
+
+from dollo_parsimony.Instrumentation import Recorder, RECORDERS
+from dollo_parsimony.ParsInsertionsScore import ParsInsertionsScore
+from dollo_parsimony.WeightedParsInsertionScore import WeightedParsWithInsertionScore
+from dollo_parsimony.ParsAlign import ParsAlign
+from dollo_parsimony.WeightedParsAlign import WeightedParsAlign, cost_matrix
+
+
+@pytest.mark.parametrize("aligner", [ParsAlign, WeightedParsAlign])
+
+def test_align_node_events(aligner):
+    newick, alignment = 'test_data/test_MSA_tree', 'test_data/test_MSA_sequence3'
+    score, expected = aligner(PhyloTree(newick=newick, alignment=alignment))
+
+    tree = PhyloTree(newick=newick, alignment=alignment)
+    with Recorder() as recorder:
+        parsimony_score, align = aligner(tree)
+
+    assert parsimony_score == score, "wrong score with a recorder"
+    assert np.array_equal(align, expected), "wrong alignment with a recorder"
+    assert not RECORDERS, "recorder still active"
+
+    internal = [node for node in tree.traverse('postorder') if not node.is_leaf()]
+    assert [event for event, data in recorder.events] == ['PlanNode', 'AlignNode'] * len(internal), "wrong events"
+    plans = [data for event, data in recorder.events if event == 'PlanNode']
+    events = [(event, data) for event, data in recorder.events if event == 'AlignNode']
+    for node, data in zip(internal, plans):
+        assert data['node'] is node and data['strategy'] == 'full', "wrong plan"
+    for node, (event, data) in zip(internal, events):
+        left, right = [len(child.parsimony_sets) for child in node.children]
+        assert data['node'] is node, "wrong node"
+        assert data['cells'] == (left + 1) * (right + 1), "wrong number of cells"
+        assert data['bytes'] > data['cells'], "wrong matrix bytes"
+        assert data['generate_seconds'] >= 0 and data['traceback_seconds'] >= 0, "wrong times"
+
+    summary = recorder.Summary()['AlignNode']
+    assert summary['count'] == len(internal), "wrong count"
+    assert summary['cells'] == sum(data['cells'] for event, data in events), "wrong total cells"
+
+
+def test_phase_events():
+    tree = PhyloTree(newick='test_data/test_MSA_tree', alignment='test_data/test_MSA_sequence')
+    events = []
+    with Recorder(lambda event, data: events.append(event), keep=False) as recorder:
+        ParsInsertionsScore(tree)
+
+    assert recorder.events == [], "events kept"
+    assert events == ['ParsInsertionsScore'], "wrong events"
+
+    with Recorder() as recorder:
+        ParsInsertionsScore(tree)
+    data = recorder.events[0][1]
+    assert set(data) == {'initialisation_seconds', 'insertion_points_seconds',
+                         'internal_pass_seconds', 'nodes', 'sites'}, "wrong phases"
+    assert data['sites'] == len(tree.get_leaves()[0].sequence), "wrong number of sites"
+
+
+def test_weighted_events(capsys):
+    tree = PhyloTree(newick='test_data/test_MSA_tree', alignment='test_data/test_MSA_sequence')
+    WeightedParsWithInsertionScore(tree, cost_matrix)
+    assert capsys.readouterr().out == '', "weighted score writes to stdout"
+
+    with Recorder() as recorder:
+        WeightedParsWithInsertionScore(tree, cost_matrix)
+
+    leaves = tree.get_leaves()
+    assert [data['node'] for event, data in recorder.events] == leaves, "wrong nodes"
+    for leaf, (event, data) in zip(leaves, recorder.events):
+        assert event == 'WeightedLeafScores', "wrong event"
+        assert np.array_equal(data['w_parsimony_scores'], leaf.w_parsimony_scores), "wrong scores"
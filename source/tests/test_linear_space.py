@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import pytest
+import numpy as np
+
+from ete3 import PhyloTree
+
+from dollo_parsimony.AlignmentKernels import UnitCostScheme, WeightedScheme
+from dollo_parsimony.AlignmentKernels import WavefrontMatrices, TraceBackMoves
+from dollo_parsimony.LinearSpace import LinearSpaceMoves
+from dollo_parsimony.ParsAlign import ParsAlign
+from dollo_parsimony.ParsAlignFreeGapExtension import ParsAlignFreeGapE
+from dollo_parsimony.WeightedParsAlign import cost_matrix
+
+@pytest.mark.parametrize("scheme,message",
+    [(UnitCostScheme(), "unit cost"),
+     (UnitCostScheme(free_gap_extension=True), "free gap extension"),
+     (WeightedScheme(cost_matrix), "weighted"),
+     (WeightedScheme(cost_matrix, free_gap_extension=True), "weighted free gap extension")])
+
+def test_same_path_as_full_matrices(scheme, message):
+    rng = np.random.default_rng(3)
+    for k in range(50):
+        n, m = rng.integers(0, 30, size=2)
+        left_sets = rng.integers(1, 16, size=n).astype(np.uint8)
+        right_sets = rng.integers(1, 16, size=m).astype(np.uint8)
+
+        S, T = WavefrontMatrices(left_sets, right_sets, scheme)
+        # tiny blocks force several levels of splitting
+        score, moves = LinearSpaceMoves(left_sets, right_sets, scheme, block_cells=8)
+
+        assert score == S[n][m], "wrong score for " + message
+        assert (moves == TraceBackMoves(T, n, m)).all(), "wrong path for " + message
+
+@pytest.mark.parametrize("align", [ParsAlign, ParsAlignFreeGapE])
+
+def test_linear_strategy(align):
+    full = align(PhyloTree(newick='test_data/test_MSA_tree', alignment='test_data/test_MSA_sequence3'))
+    linear = align(PhyloTree(newick='test_data/test_MSA_tree', alignment='test_data/test_MSA_sequence3'),
+                   strategy='linear')
+
+    assert full[0] == linear[0], "wrong score for the linear strategy"
+    assert (full[1] == linear[1]).all(), "wrong alignment for the linear strategy"
+
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError):
+        ParsAlign(PhyloTree('(A:1,B:1);'), strategy='quadratic')
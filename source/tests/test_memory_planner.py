@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+from dollo_parsimony.CommandLine import MemorySize
+from dollo_parsimony.Instrumentation import Recorder
+from dollo_parsimony.MemoryPlanner import PLANNED_STRATEGIES, StrategyBytes, ChooseStrategy
+from dollo_parsimony.MemoryPlanner import PlanAlignment, PlanSummary
+from dollo_parsimony.ParsAlign import ParsAlign
+from dollo_parsimony.ParsAlignFreeGapExtension import ParsAlignFreeGapE
+from dollo_parsimony.WeightedParsAlign import WeightedParsAlign
+from dollo_parsimony.WeightedParsAlignFreeGapExtension import WeightedParsAlignFreeGapE
+from dollo_parsimony.Simulation import SimulateFamily
+
+
+def test_choose_strategy():
+    full = StrategyBytes(60, 50, 'full')
+    compressed = StrategyBytes(60, 50, 'compressed')
+    linear = StrategyBytes(60, 50, 'linear', block_cells=100)
+    assert full > compressed > linear, "wrong order of the strategies"
+
+    assert ChooseStrategy(60, 50)[0] == 'full', "wrong strategy without a budget"
+    assert ChooseStrategy(60, 50, full)[0] == 'full', "wrong strategy with a large budget"
+    assert ChooseStrategy(60, 50, full - 1)[0] == 'compressed', "wrong strategy below full"
+    assert ChooseStrategy(60, 50, strategy='linear')[0] == 'linear', "faster strategy chosen"
+
+    strategy, block_cells, strategy_bytes = ChooseStrategy(60, 50, compressed - 1)
+    assert strategy == 'linear' and strategy_bytes <= compressed - 1, "wrong linear strategy"
+    assert 2 * 51 <= block_cells < 61 * 51, "wrong blocks of the linear strategy"
+
+    with pytest.raises(MemoryError):
+        ChooseStrategy(60, 50, 100)
+    assert ChooseStrategy(60, 50, compressed, strategy='banded') == \
+        ('banded', 61 * 51, compressed), "wrong banded strategy"
+    assert ChooseStrategy(60, 50, compressed - 1, strategy='banded')[:2] == \
+        ('banded', block_cells), "wrong band of the banded strategy"
+    with pytest.raises(ValueError):
+        ChooseStrategy(60, 50, strategy='diagonal')
+
+
+def CheckBudget(align, memory_budget, workers, strategy):
+    # every node is aligned with the fastest strategy within the budget
+    expected = align(SimulateFamily(6, 60, seed=3))
+    tree = SimulateFamily(6, 60, seed=3)
+
+    with Recorder() as recorder:
+        parsimony_score, alignment = align(tree, workers=workers,
+                                           memory_budget=memory_budget)
+    chosen = [data for event, data in recorder.events if event == 'PlanNode']
+
+    assert parsimony_score == expected[0], "wrong score with a memory budget"
+    assert np.array_equal(alignment, expected[1]), "wrong alignment with a memory budget"
+    assert len(chosen) == len(tree) - 1, "wrong number of planned nodes"
+    assert all(data['bytes'] <= memory_budget // workers for data in chosen), "budget exceeded"
+    assert PlanSummary(chosen)[strategy] > 0, "strategy not chosen"
+    for data in chosen:
+        n, m = [len(child.parsimony_sets) for child in data['node'].children]
+        faster = PLANNED_STRATEGIES[:PLANNED_STRATEGIES.index(data['strategy'])]
+        assert all(StrategyBytes(n, m, other) > memory_budget // workers for other in faster), \
+            "faster strategy within the budget"
+
+
+@pytest.mark.parametrize("align",
+    [ParsAlign, ParsAlignFreeGapE, WeightedParsAlign, WeightedParsAlignFreeGapE])
+@pytest.mark.parametrize("memory_budget,workers,strategy",
+    [(70000, 1, 'full'), (20000, 1, 'compressed'), (40000, 2, 'compressed')])
+
+def test_memory_budget(align, memory_budget, workers, strategy):
+    CheckBudget(align, memory_budget, workers, strategy)
+
+
+# the unit cost alignments with the free gap extension are longer
+@pytest.mark.parametrize("align,memory_budget",
+    [(ParsAlign, 7250), (ParsAlignFreeGapE, 9500), (WeightedParsAlign, 7250),
+     (WeightedParsAlignFreeGapE, 7250)])
+
+def test_linear_budget(align, memory_budget):
+    CheckBudget(align, memory_budget, 1, 'linear')
+
+
+def test_plan_alignment():
+    tree = SimulateFamily(6, 60, seed=3)
+    plan = PlanAlignment(tree, 40000)
+    with Recorder() as recorder:
+        ParsAlign(tree, memory_budget=40000)
+    chosen = [data for event, data in recorder.events if event == 'PlanNode']
+
+    assert [entry['node'] for entry in plan] == [data['node'] for data in chosen], "wrong nodes"
+    assert all(entry['bytes'] <= 40000 for entry in plan), "plan exceeds the budget"
+    assert all(entry['cells'] >= data['cells'] for entry, data in zip(plan, chosen)), \
+        "plan below the actual cells"
+    summary = PlanSummary(plan)
+    assert summary['full'] + summary['compressed'] + summary['linear'] == len(plan), "wrong summary"
+    assert summary['bytes'] == max(entry['bytes'] for entry in plan), "wrong peak bytes"
+
+
+def test_score_only_budget():
+    expected = ParsAlign(SimulateFamily(6, 60, seed=4))[0]
+
+    assert ParsAlign(SimulateFamily(6, 60, seed=4), score_only=True,
+                     memory_budget=7000)[0] == expected, "wrong score with a memory budget"
+    with pytest.raises(MemoryError):
+        ParsAlign(SimulateFamily(6, 60, seed=4), memory_budget=100)
+
+
+@pytest.mark.parametrize("text,size", [('4096', 4096), ('2K', 2048), ('512M', 512 << 20),
+                                       ('1.5g', 3 << 29), ('1GB', 1 << 30)])
+
+def test_memory_size(text, size):
+    assert MemorySize(text) == size, "wrong memory size"
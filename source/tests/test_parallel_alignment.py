@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from ete3 import PhyloTree
+
+from dollo_parsimony.ParsAlign import ParsAlign
+from dollo_parsimony.ParsAlignFreeGapExtension import ParsAlignFreeGapE
+from dollo_parsimony.WeightedParsAlign import WeightedParsAlign
+from dollo_parsimony.WeightedParsAlignFreeGapExtension import WeightedParsAlignFreeGapE
+
+@pytest.mark.parametrize("align",
+    [ParsAlign, ParsAlignFreeGapE, WeightedParsAlign, WeightedParsAlignFreeGapE])
+@pytest.mark.parametrize("score_only", [False, True])
+
+def test_parallel_alignment(align, score_only):
+    newick, alignment = 'test_data/test_MSA_tree', 'test_data/test_MSA_sequence3'
+    serial = align(PhyloTree(newick=newick, alignment=alignment), score_only=score_only)
+    tree = PhyloTree(newick=newick, alignment=alignment)
+    parallel = align(tree, score_only=score_only, workers=2)
+
+    assert parallel[0] == serial[0], "wrong parallel score"
+    if score_only:
+        assert parallel[1] is None, "alignment built in score only mode"
+    else:
+        assert (parallel[1] == serial[1]).all(), "wrong parallel alignment"
+        for node in tree.iter_descendants():
+            if node.is_leaf():
+                assert node.alignment.shape == (1, len(node.parsimony_sets)), "wrong alignment at a leaf"
+            else:
+                assert not hasattr(node, 'alignment'), "alignment kept at an internal node"
+                assert hasattr(node, 'edit_script'), "no edit script at an internal node"
+
+        tree = PhyloTree(newick=newick, alignment=alignment)
+        kept = align(tree, workers=2, keep_alignments=True)
+        assert (kept[1] == serial[1]).all(), "wrong parallel alignment with kept alignments"
+        for node in tree.traverse():
+            assert node.alignment.shape[0] == len(node), "wrong alignment at a node"
+
+
+def test_parallel_linear_strategy():
+    newick, alignment = 'test_data/test_MSA_tree', 'test_data/test_MSA_sequence3'
+    serial = ParsAlign(PhyloTree(newick=newick, alignment=alignment))
+    parallel = ParsAlign(PhyloTree(newick=newick, alignment=alignment),
+                         strategy='linear', workers=2)
+
+    assert parallel[0] == serial[0], "wrong parallel score"
+    assert (parallel[1] == serial[1]).all(), "wrong parallel alignment"
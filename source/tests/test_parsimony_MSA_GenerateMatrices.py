@@ -8,6 +8,8 @@ Created on Sun Apr 11 17:31:16 2021
 from ete3 import PhyloNode
 import pytest
 from dollo_parsimony.ParsAlign import GenerateMatrices
+from dollo_parsimony.AlignmentKernels import UnpackMoves
+from dollo_parsimony.ParsimonySets import EncodeSets
 
 characters = characters = ['A', 'T', 'C', 'G']
 
@@ -20,9 +22,10 @@ characters = characters = ['A', 'T', 'C', 'G']
 def test_GenerateMatrices(child0_pars_set, child1_pars_set, expected_score, expected_T, message):
     newick = '(A:1,B:1):1;'
     node = PhyloNode(newick=newick)
-    node.children[0].parsimony_sets = child0_pars_set
-    node.children[1].parsimony_sets = child1_pars_set
+    node.children[0].parsimony_sets = EncodeSets(child0_pars_set)
+    node.children[1].parsimony_sets = EncodeSets(child1_pars_set)
     pars_score, T = GenerateMatrices(node)
     
     assert pars_score == expected_score, 'wrong score for' + message
-    assert (T == expected_T).all(), 'wrong trace back matrix for' + message
+    n, m = len(child0_pars_set), len(child1_pars_set)
+    assert (UnpackMoves(T, n, m) == expected_T).all(), 'wrong trace back matrix for' + message
@@ -10,6 +10,7 @@ import pytest
 from ete3 import PhyloNode
 import numpy as np
 from dollo_parsimony.ParsAlign import InitalizeSetsAndAlignment
+from dollo_parsimony.ParsimonySets import DecodeSets, DecodeAlignment
 
 
 characters = ['A', 'T', 'C', 'G']
@@ -26,5 +27,6 @@ def test_initial(sequence, expected_set, expected_alignment, message):
     InitalizeSetsAndAlignment(node)
     assert len(node.sequence) == len(node.parsimony_sets), 'wrong number of sets for' + message
     assert len(node.alignment) == 1, 'wrong size of alignment for one sequence with' + message
-    assert node.parsimony_sets == expected_set, 'wrong sets for' + message 
-    assert (node.alignment == expected_alignment).all()
+    assert DecodeSets(node.parsimony_sets) == expected_set, 'wrong sets for' + message 
+    assert node.alignment.dtype == np.uint8, 'wrong type of alignment for' + message
+    assert (DecodeAlignment(node.alignment) == expected_alignment).all()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import pytest
+import numpy as np
+
+from ete3 import PhyloNode
+
+from dollo_parsimony.ParsInsertionsScore import ParsInsertionsInternal
+from dollo_parsimony.ParsInsertionsScore import ParsInsertionsInternalColumns
+from dollo_parsimony.ParsimonySets import GAP
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+
+def test_columns_match_per_site(seed):
+    rng = np.random.default_rng(seed)
+    length = 200
+
+    # residue sets never contain the gap, so draw either the gap or a
+    # non-empty set of nucleotides
+    def random_sets():
+        residues = rng.integers(1, GAP, size=length).astype(np.uint8)
+        return np.where(rng.random(length) < 0.3, GAP, residues).astype(np.uint8)
+
+    newick = '(A:1,B:1):1;'
+    per_site = PhyloNode(newick=newick)
+    columns = PhyloNode(newick=newick)
+    flags = rng.random(length) < 0.5
+
+    for tree in (per_site, columns):
+        tree.parsimony_sets = np.zeros(length, dtype=np.uint8)
+        tree.parsimony_scores = np.zeros(length, dtype=int)
+        tree.insertion_flags = flags
+
+    for k in range(2):
+        sets = random_sets()
+        scores = rng.integers(0, 5, size=length)
+        for tree in (per_site, columns):
+            tree.children[k].parsimony_sets = sets
+            tree.children[k].parsimony_scores = scores
+
+    for i in range(length):
+        ParsInsertionsInternal(per_site, i)
+    ParsInsertionsInternalColumns(columns)
+
+    assert (columns.parsimony_sets == per_site.parsimony_sets).all(), "wrong sets"
+    assert (columns.parsimony_scores == per_site.parsimony_scores).all(), "wrong scores"
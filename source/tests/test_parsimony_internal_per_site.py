@@ -12,6 +12,7 @@ from ete3 import PhyloNode
 
 from dollo_parsimony.ParsInsertionsScore import ParsInsertionsInternal
 from dollo_parsimony.ParsInsertionsScore import characters
+from dollo_parsimony.ParsimonySets import EncodeSet, DecodeSet
 
 @pytest.mark.parametrize("ch0_score,ch0_set,ch1_score,ch1_set,exp_score,exp_set, insertion, message",
     [(0,set('-'),0,set('-'),0,set('-'),False,"two gap sets with 0 score"),
@@ -35,17 +36,17 @@ def test(ch0_score, ch0_set, ch1_score, ch1_set, exp_score, exp_set, insertion,
     tree = PhyloNode(newick=newick)
     
     tree.parsimony_scores = [0]
-    tree.parsimony_sets = [set()]
+    tree.parsimony_sets = [0]
     tree.insertion_flags = [insertion]
     tree.children[0].parsimony_scores = [ch0_score]
-    tree.children[0].parsimony_sets = [ch0_set]
+    tree.children[0].parsimony_sets = [EncodeSet(ch0_set)]
     tree.children[1].parsimony_scores = [ch1_score]
-    tree.children[1].parsimony_sets = [ch1_set]
+    tree.children[1].parsimony_sets = [EncodeSet(ch1_set)]
     
     ParsInsertionsInternal(tree, 0)
     
     assert tree.parsimony_scores[0] == exp_score, "wrong score for " + message
-    assert tree.parsimony_sets[0] == exp_set, "wrong char set for " + message
+    assert DecodeSet(tree.parsimony_sets[0]) == exp_set, "wrong char set for " + message
     
 
     
@@ -4,6 +4,7 @@ from ete3 import PhyloNode
 
 from dollo_parsimony.ParsInsertionsScore import ParsInsertionsLeaf
 from dollo_parsimony.ParsInsertionsScore import characters
+from dollo_parsimony.ParsimonySets import DecodeSet
 
 @pytest.mark.parametrize("sequence,expected_set,message",
     [(characters[0],set(characters[0]),"one char"),
@@ -17,10 +18,10 @@ def test_one_char(sequence, expected_set, message):
     assert len(node.parsimony_scores) == len(node.sequence), "wrong number of scores for " + message
     assert len(node.parsimony_sets) == len(node.sequence), "wrong number of sets for " + message
     assert node.parsimony_scores[0] == 0, "wrong score for " + message
-    assert node.parsimony_sets[0] == expected_set, "wrong set for " + message
+    assert DecodeSet(node.parsimony_sets[0]) == expected_set, "wrong set for " + message
 
 @pytest.mark.parametrize("sequence,message",
-    [(str(characters),"multiple chars"),
+    [(''.join(characters),"multiple chars"),
     (str(characters[0]*200),"multiple chars try two")])
 
 def test_multiple_chars(sequence, message):
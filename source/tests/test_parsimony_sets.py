@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import pytest
+import numpy as np
+
+from dollo_parsimony.ParsimonySets import characters, GAP
+from dollo_parsimony.ParsimonySets import EncodeSequence, EncodeSet, DecodeSet
+from dollo_parsimony.ParsimonySets import EncodeAlignment, DecodeAlignment
+from dollo_parsimony.ParsimonySets import AlignmentBytes, AlignmentStrings
+from dollo_parsimony.ParsAlign import ParsAlign
+from dollo_parsimony.ParsAlignFreeGapExtension import ParsAlignFreeGapE
+from dollo_parsimony.ParsInsertionsScore import ParsInsertionsScore
+from dollo_parsimony.Simulation import SimulateFamily
+
+@pytest.mark.parametrize("character_set,message",
+    [(set(characters[0]),"one character"),
+     (set(characters[1:3]),"two characters"),
+     (set('-'),"gap"),
+     (set(characters),"all characters")])
+
+def test_round_trip(character_set, message):
+    assert DecodeSet(EncodeSet(character_set)) == character_set, "wrong decoded set for " + message
+
+
+def test_set_operations():
+    left = set(characters[0:2])
+    right = set(characters[1:4])
+    assert DecodeSet(EncodeSet(left) & EncodeSet(right)) == left.intersection(right), "wrong intersection"
+    assert DecodeSet(EncodeSet(left) | EncodeSet(right)) == left.union(right), "wrong union"
+
+
+def test_encode_sequence():
+    codes = EncodeSequence('AT-G')
+    assert codes.dtype == np.uint8, "wrong dtype for encoded sequence"
+    assert list(codes) == [EncodeSet('A'), EncodeSet('T'), GAP, EncodeSet('G')], "wrong codes for sequence"
+
+
+@pytest.mark.parametrize("sequence,expected",
+    [('atcg-', ['A', 'T', 'C', 'G', '-']), ('N', ['ATCG']), ('n', ['ATCG']),
+     ('Ry', ['AG', 'CT']), ('U', ['T'])])
+
+def test_ambiguity_codes(sequence, expected):
+    codes = EncodeSequence(sequence)
+    assert [DecodeSet(code) for code in codes] == [set(nucleotides) for nucleotides in expected], \
+        "wrong sets of " + sequence
+
+
+@pytest.mark.parametrize("align", [ParsAlign, ParsAlignFreeGapE])
+
+def test_lowercase_sequences(align):
+    expected = align(SimulateFamily(5, 40, seed=2))
+    tree = SimulateFamily(5, 40, seed=2)
+    for leaf in tree.iter_leaves():
+        leaf.sequence = ''.join(leaf.sequence).lower()
+    parsimony_score, alignment = align(tree)
+
+    assert parsimony_score == expected[0], "wrong score of lowercase sequences"
+    assert [row.upper() for row in AlignmentStrings(alignment)] == AlignmentStrings(expected[1]), \
+        "wrong alignment of lowercase sequences"
+
+    tree = SimulateFamily(5, 40, seed=2)
+    score = ParsInsertionsScore(tree)
+    for leaf in tree.iter_leaves():
+        leaf.sequence = ''.join(leaf.sequence).lower()
+    assert ParsInsertionsScore(tree) == score, "wrong insertion score of lowercase sequences"
+
+
+def test_unknown_character():
+    with pytest.raises(ValueError):
+        EncodeSequence('AXG')
+
+
+def test_alignment_encoding():
+    sequences = ['AT-G', 'A--C', list('GGTA')]
+    alignment = EncodeAlignment(sequences)
+    assert alignment.dtype == np.uint8 and alignment.shape == (3, 4), "wrong alignment matrix"
+    assert AlignmentStrings(alignment) == ['AT-G', 'A--C', 'GGTA'], "wrong decoded strings"
+    assert (DecodeAlignment(alignment) == np.array([list(row) for row in ['AT-G', 'A--C', 'GGTA']])).all(), "wrong decoded characters"
+
+    view = AlignmentBytes(alignment)
+    assert view.base is alignment and view[0, 2] == b'-', "bytes view is not a view"
+
+    with pytest.raises(ValueError):
+        EncodeAlignment(['AT', 'A'])
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from ete3 import PhyloTree
+
+from dollo_parsimony.ParsAlign import ParsAlign
+from dollo_parsimony.ParsAlignFreeGapExtension import ParsAlignFreeGapE
+from dollo_parsimony.WeightedParsAlign import WeightedParsAlign
+from dollo_parsimony.WeightedParsAlignFreeGapExtension import WeightedParsAlignFreeGapE
+
+@pytest.mark.parametrize("align",
+    [ParsAlign, ParsAlignFreeGapE, WeightedParsAlign, WeightedParsAlignFreeGapE])
+@pytest.mark.parametrize("newick,alignment",
+    [('test_data/test_MSA_tree','test_data/test_MSA_sequence3'),
+     ('test_data/test_tree','test_data/test_sequence.txt'),
+     ('test_data/test_tree2','test_data/test_sequence3')])
+
+def test_score_only(align, newick, alignment):
+    full = align(PhyloTree(newick=newick, alignment=alignment))
+    tree = PhyloTree(newick=newick, alignment=alignment)
+    parsimony_score, align_only = align(tree, score_only=True)
+
+    assert parsimony_score == full[0], "wrong score in score only mode"
+    assert align_only is None, "alignment built in score only mode"
+    assert not any(hasattr(node, 'alignment') for node in tree.traverse()), \
+        "alignment stored in score only mode"
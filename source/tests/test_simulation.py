@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from dollo_parsimony.Simulation import RandomTree, SimulateFamily
+
+
+@pytest.mark.parametrize("taxa", [1, 2, 7, 40])
+
+def test_random_tree(taxa):
+    tree = RandomTree(taxa, seed=taxa)
+    names = sorted(leaf.name for leaf in tree.iter_leaves())
+
+    assert names == sorted('T%d' % k for k in range(taxa)), "wrong leaves"
+    assert all(len(node.children) in (0, 2) for node in tree.traverse()), "tree is not binary"
+
+
+@pytest.mark.parametrize("taxa,length,gap_rate", [(4, 50, 0.5), (16, 200, 0.1), (30, 100, 0.0)])
+
+def test_simulate_family(taxa, length, gap_rate):
+    tree = SimulateFamily(taxa, length, gap_rate, seed=1)
+    same = SimulateFamily(taxa, length, gap_rate, seed=1)
+    sequences = [leaf.sequence for leaf in tree.iter_leaves()]
+
+    assert sequences == [leaf.sequence for leaf in same.iter_leaves()], "seed does not fix the family"
+    assert len(set(len(sequence) for sequence in sequences)) == 1, "sequences are not aligned"
+    assert all(any(sequence[k] != '-' for sequence in sequences)
+               for k in range(len(sequences[0]))), "column without residues"
+    if gap_rate == 0:
+        assert len(sequences[0]) == length and '-' not in ''.join(sequences), "gaps without indels"
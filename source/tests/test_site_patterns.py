@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from ete3 import PhyloTree
+
+from dollo_parsimony.ArrayTree import ArrayTree
+from dollo_parsimony.SitePatterns import SitePatterns, CompressedSiteScores
+from dollo_parsimony.ParsInsertionsScore import ParsInsertionsScore
+from dollo_parsimony.ParsInsertionsScore import ParsInsertionsSiteScores
+from dollo_parsimony.WeightedParsInsertionScore import WeightedParsWithInsertionScore
+from dollo_parsimony.WeightedParsAlign import cost_matrix
+
+
+def test_site_patterns():
+    tree = PhyloTree('((A:1,B:1):1,C:1);')
+    for leaf, sequence in zip(tree.iter_leaves(), ['AA-CA-', 'TTGCTG', '--G---']):
+        leaf.sequence = sequence
+    patterns, inverse, weights = SitePatterns(ArrayTree(tree).LeafMatrix())
+
+    assert patterns.shape == (3, 4), "wrong number of patterns"
+    assert sorted(weights) == [1, 1, 1, 3], "wrong weights"
+    for i in range(6):
+        column = ''.join(leaf.sequence[i] for leaf in tree.iter_leaves())
+        assert patterns[:, inverse[i]].tobytes().decode() == column, \
+            "wrong pattern of site " + str(i)
+
+
+@pytest.mark.parametrize("newick,alignment",
+    [('test_data/test_tree','test_data/test_sequence.txt'),
+     ('test_data/test_tree1','test_data/test_sequence2'),
+     ('test_data/test_tree2','test_data/test_sequence3'),
+     ('test_data/test_tree2','test_data/test_sequence4')])
+
+def test_compressed_scores(newick, alignment):
+    array_tree = ArrayTree(PhyloTree(newick=newick, alignment=alignment))
+    msa = array_tree.LeafMatrix()
+    pattern_scores, inverse, weights = CompressedSiteScores(array_tree, msa, 
+                                                            ParsInsertionsSiteScores)
+    site_scores = ParsInsertionsSiteScores(array_tree, msa)
+
+    assert (pattern_scores[inverse] == site_scores).all(), "wrong site scores"
+    assert (pattern_scores*weights).sum() == site_scores.sum(), "wrong weighted sum"
+
+    serial = ParsInsertionsScore(PhyloTree(newick=newick, alignment=alignment))
+    compressed = ParsInsertionsScore(PhyloTree(newick=newick, alignment=alignment), compress=True)
+    assert compressed == serial, "wrong compressed parsimony score"
+
+    serial = WeightedParsWithInsertionScore(PhyloTree(newick=newick, alignment=alignment), 
+                                            cost_matrix)
+    compressed = WeightedParsWithInsertionScore(PhyloTree(newick=newick, alignment=alignment), 
+                                                cost_matrix, compress=True)
+    assert compressed == serial, "wrong compressed weighted parsimony score"
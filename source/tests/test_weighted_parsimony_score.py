@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import pytest
+import numpy as np
+
+from ete3 import PhyloTree
+
+from dollo_parsimony.WeightedParsInsertionScore import WeightedParsWithInsertionScore
+from dollo_parsimony.WeightedParsInsertionScore import WParsScoreLeaf
+from dollo_parsimony.WeightedParsInsertionScore import WParsScoreInternal
+from dollo_parsimony.WeightedParsInsertionScore import MinPlusScores, CostArray
+from dollo_parsimony.WeightedParsAlign import cost_matrix
+
+@pytest.mark.parametrize("sequences,score,message",
+    [(['A', 'A', 'A'], 0, "same residue everywhere"),
+     (['A', 'G', '-'], 1, "substitution below the insertion point"),
+     (['A', '-', 'A'], 10, "deletion below the insertion point"),
+     (['-', '-', 'T'], 0, "single residue")])
+
+def test_weighted_score(sequences, score, message):
+    tree = PhyloTree('((A:1,B:1):1,C:1);')
+    for leaf, sequence in zip(tree.iter_leaves(), sequences):
+        leaf.sequence = sequence
+    assert WeightedParsWithInsertionScore(tree, cost_matrix) == score, "wrong score for " + message
+
+
+def test_columns_match_per_site():
+    tree = PhyloTree('((A:1,B:1):1,C:1);')
+    for leaf, sequence in zip(tree.iter_leaves(), ['ACGT-A', 'AGGTCC', 'T-G-CA']):
+        leaf.sequence = sequence
+        WParsScoreLeaf(leaf, cost_matrix)
+
+    internal = tree.children[0]
+    columns = MinPlusScores(internal.children[0].w_parsimony_scores,
+                            internal.children[1].w_parsimony_scores, CostArray(cost_matrix))
+    internal.add_feature('w_parsimony_scores', np.zeros(columns.shape))
+    for i in range(len(columns)):
+        WParsScoreInternal(internal, cost_matrix, i)
+    assert np.array_equal(columns, internal.w_parsimony_scores), "wrong scores"
+
+    internal.w_parsimony_scores[:] = 0
+    costs = CostArray(cost_matrix)
+    for i in range(len(columns)):
+        WParsScoreInternal(internal, cost_matrix, i, costs)
+    assert np.array_equal(columns, internal.w_parsimony_scores), "wrong scores with a cost array"
+
+
+def test_insertion_flags():
+    tree = PhyloTree('(((A:1,B:1):1,C:1):1,(D:1,E:1):1);')
+    for leaf, sequence in zip(tree.iter_leaves(), ['AC-T-', '-CGT-', 'A--T-', '--GA-', 'T--A-']):
+        leaf.sequence = sequence
+    WeightedParsWithInsertionScore(tree, cost_matrix)
+
+    for i in range(5):
+        leaf_res = [leaf for leaf in tree.iter_leaves() if leaf.sequence[i] != '-']
+        if len(leaf_res) == 0:
+            ancestor = tree
+        elif len(leaf_res) == 1:
+            ancestor = leaf_res[0]
+        else:
+            ancestor = tree.get_common_ancestor(leaf_res)
+        inside = [ancestor] + ancestor.get_descendants()
+        for node in tree.traverse():
+            assert node.insertion_flags[i] == (node not in inside), \
+                "wrong insertion flag at site " + str(i)